@@ -0,0 +1,87 @@
+import heapq
+import math
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from django.conf import settings
+from .catalog import component_catalog, ComponentCatalog
+from .index import compatibility_index, CompatibilityIndex
+from apps.components.models import CompatibilityLink
+
+# Confidence of each usable link status, same as CompatibilityService basic link results
+LINK_CONFIDENCE = {
+    'compatible': 0.8,
+    'compatible_with_adapter': 0.6,
+}
+
+class AdapterPathFinder:
+    """
+    Finds the most confident chain of compatibility links joining two components
+    Dijkstra over the link adjacency cached in the compatibility index, with each link
+    weighted by -log(confidence) so the cheapest path has the highest product of
+    confidences. not_compatible links and inactive components are never followed.
+    The search gives up after max_hops links or max_visited expanded components.
+    """
+
+    def __init__(self, index: Optional[CompatibilityIndex] = None, catalog: Optional[ComponentCatalog] = None,
+                 max_hops: Optional[int] = None, max_visited: Optional[int] = None):
+        self.index = index or compatibility_index
+        self.catalog = catalog or component_catalog
+        self.max_hops = max_hops or getattr(settings, 'COMPATIBILITY_ADAPTER_MAX_HOPS', 4)
+        self.max_visited = max_visited or getattr(settings, 'COMPATIBILITY_ADAPTER_MAX_VISITED', 10000)
+
+    def find_path(self, source_id: UUID, target_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Returns {'component_ids', 'links', 'confidence', 'adapter_required'} for the best
+        path, or None when no path exists within the bounds
+        """
+        if source_id == target_id:
+            return None
+
+        # Labels are (component, hops) so a cheap path that used up the hop budget
+        # never hides a slightly costlier one with hops to spare
+        best_cost = {(source_id, 0): 0.0}
+        previous: Dict[tuple, tuple] = {}
+        heap = [(0.0, 0, source_id)]
+        expanded = set()
+
+        while heap and len(expanded) < self.max_visited:
+            cost, hops, component_id = heapq.heappop(heap)
+            if (component_id, hops) in expanded:
+                continue
+            expanded.add((component_id, hops))
+            if component_id == target_id:
+                return self._path((target_id, hops), previous, cost)
+            if hops >= self.max_hops:
+                continue
+
+            for other_id, link in self.index.link_edges(component_id):
+                confidence = LINK_CONFIDENCE.get(link.status)
+                if confidence is None or self.catalog.get(other_id) is None:
+                    continue
+                label = (other_id, hops + 1)
+                other_cost = cost - math.log(confidence)
+                if other_cost < best_cost.get(label, math.inf):
+                    best_cost[label] = other_cost
+                    previous[label] = ((component_id, hops), link)
+                    heapq.heappush(heap, (other_cost, hops + 1, other_id))
+
+        return None
+
+    def _path(self, label: tuple, previous: Dict[tuple, tuple], cost: float) -> Dict[str, Any]:
+        component_ids = [label[0]]
+        links: List[CompatibilityLink] = []
+        while label in previous:
+            label, link = previous[label]
+            component_ids.append(label[0])
+            links.append(link)
+        component_ids.reverse()
+        links.reverse()
+
+        return {
+            'component_ids': component_ids,
+            'links': links,
+            'confidence': round(math.exp(-cost), 4),
+            'adapter_required': any(
+                link.adapter_required or link.status == 'compatible_with_adapter' for link in links
+            ),
+        }
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class CompatibilityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.compatibility'
\ No newline at end of file
+    name = 'apps.compatibility'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,130 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import close_old_connections
+from .models import CompatibilityCheck
+
+logger = logging.getLogger(__name__)
+
+class AuditLogWriter:
+    """
+    Buffered writer for CompatibilityCheck audit rows
+    Checks are queued in-process and written with bulk_create by a background
+    thread once the batch is full or the flush interval has passed, so the
+    insert no longer holds up the response. The queue is bounded: when it is
+    full new records are dropped and counted instead of blocking the request.
+    Note that created_at is set when a batch is written, not when it was queued.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 max_queue_size: Optional[int] = None):
+        self.batch_size = batch_size or getattr(settings, 'COMPATIBILITY_AUDIT_BATCH_SIZE', 200)
+        self.flush_interval = flush_interval or getattr(settings, 'COMPATIBILITY_AUDIT_FLUSH_INTERVAL', 2.0)
+        max_queue_size = max_queue_size or getattr(settings, 'COMPATIBILITY_AUDIT_MAX_QUEUE', 10000)
+
+        self._queue: "queue.Queue[CompatibilityCheck]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, check: CompatibilityCheck) -> bool:
+        """Queue a check for writing; returns False if it had to be dropped"""
+        if not getattr(settings, 'COMPATIBILITY_AUDIT_ASYNC', True):
+            self._write([check])
+            return True
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(check)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Compatibility audit queue full, {dropped} check records dropped so far")
+            return False
+
+    def flush(self):
+        """Write everything currently queued"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def shutdown(self):
+        """Stop the background thread and write whatever is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 2)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='compatibility-audit', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch: List[CompatibilityCheck] = []
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stop.is_set():
+            timeout = max(deadline - time.monotonic(), 0)
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write_in_worker(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+        if batch:
+            self._write_in_worker(batch)
+
+    def _write_in_worker(self, batch: List[CompatibilityCheck]):
+        # The worker thread's connection outlives any request, so recycle it like a request
+        # would; never done in _write, which also runs on request threads (sync mode)
+        close_old_connections()
+        try:
+            self._write(batch)
+        finally:
+            close_old_connections()
+
+    def _write(self, batch: List[CompatibilityCheck]):
+        with self._write_lock:
+            try:
+                CompatibilityCheck.objects.bulk_create(batch)
+                self.written += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} compatibility check records: {str(e)}")
+
+audit_writer = AuditLogWriter()
+atexit.register(audit_writer.shutdown)
@@ -0,0 +1,88 @@
+import uuid
+from typing import Any, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from django.conf import settings
+from django.core.cache import cache
+
+# Results are invalidated by model signals, so the TTL only bounds how long
+# writes that bypass the ORM (e.g. the scraper) can stay invisible
+DEFAULT_RESULT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+def result_cache_key(component_a_id: UUID, component_b_id: UUID) -> str:
+    """Cache key for the result of an unordered component pair"""
+    return f"compatibility_{min(component_a_id, component_b_id)}_{max(component_a_id, component_b_id)}"
+
+def component_version_key(component_id: UUID) -> str:
+    """Cache key holding the current version token of a component"""
+    return f"component_version_{component_id}"
+
+def get_cached_result(component_a_id: UUID, component_b_id: UUID) -> Tuple[Optional[Dict[str, Any]], Dict[UUID, str]]:
+    """
+    Look up a cached result and the current component versions in a single round trip
+    Returns (result, versions); result is None on a miss or when either component
+    changed since the result was stored
+    """
+    result_key = result_cache_key(component_a_id, component_b_id)
+    version_keys = {component_version_key(component_a_id): component_a_id,
+                    component_version_key(component_b_id): component_b_id}
+    found = cache.get_many([result_key, *version_keys])
+
+    versions = {component_id: found.get(key) for key, component_id in version_keys.items()}
+    missing = [component_id for component_id, version in versions.items() if version is None]
+    if missing:
+        versions.update(_init_versions(missing))
+        return None, versions
+
+    entry = found.get(result_key)
+    if not entry or entry.get('versions') != _pair_versions(component_a_id, component_b_id, versions):
+        return None, versions
+    return entry['result'], versions
+
+def get_component_versions(component_ids: Iterable[UUID]) -> Dict[UUID, str]:
+    """Current version tokens for a set of components"""
+    component_ids = list(component_ids)
+    found = cache.get_many([component_version_key(component_id) for component_id in component_ids])
+    versions = {component_id: found.get(component_version_key(component_id)) for component_id in component_ids}
+    missing = [component_id for component_id, version in versions.items() if version is None]
+    if missing:
+        versions.update(_init_versions(missing))
+    return versions
+
+def set_cached_results(entries: Iterable[Tuple[UUID, UUID, Dict[str, Any]]], versions: Dict[UUID, str],
+                       timeout: Optional[int] = None):
+    """Store results tagged with the component versions they were computed from"""
+    if timeout is None:
+        timeout = getattr(settings, 'COMPATIBILITY_CACHE_TIMEOUT', DEFAULT_RESULT_CACHE_TIMEOUT)
+    cache.set_many({
+        result_cache_key(component_a_id, component_b_id): {
+            'versions': _pair_versions(component_a_id, component_b_id, versions),
+            'result': result,
+        }
+        for component_a_id, component_b_id, result in entries
+    }, timeout)
+
+def bump_component_version(component_id: UUID):
+    """Invalidate every cached result involving a component"""
+    cache.set(component_version_key(component_id), uuid.uuid4().hex, None)
+
+def bump_component_versions(component_ids: Iterable[UUID]):
+    """Invalidate every cached result involving any of the given components"""
+    cache.set_many({
+        component_version_key(component_id): uuid.uuid4().hex
+        for component_id in set(component_ids) if component_id is not None
+    }, None)
+
+def _pair_versions(component_a_id: UUID, component_b_id: UUID, versions: Dict[UUID, str]) -> Tuple[str, str]:
+    low, high = sorted((component_a_id, component_b_id))
+    return versions[low], versions[high]
+
+def _init_versions(component_ids) -> Dict[UUID, str]:
+    # Versions are random tokens rather than counters, so a version key that was
+    # evicted can never make an older result look current again
+    versions = {}
+    for component_id in component_ids:
+        key = component_version_key(component_id)
+        # add() keeps a token another worker set in the meantime
+        cache.add(key, uuid.uuid4().hex, None)
+        versions[component_id] = cache.get(key)
+    return versions
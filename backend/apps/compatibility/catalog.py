@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from uuid import UUID
+from django.conf import settings
+from django.core.cache import cache
+from apps.components.models import Component
+
+# Shared version stamp so every worker reloads after a component changed
+CATALOG_VERSION_KEY = 'component_catalog_version'
+
+# Component fields needed to evaluate a pair
+CATALOG_FIELDS = ['id', 'brand', 'model', 'type', 'speed', 'specs']
+
+class ComponentCatalog:
+    """
+    In-memory copy of the active components, grouped by type
+    Loaded once per worker and reloaded when the shared version changes. Scraper
+    writes bypass the model signals, so the copy is also reloaded after max_age seconds
+    """
+
+    def __init__(self, check_interval: Optional[float] = None, max_age: Optional[float] = None):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._by_id: Optional[Dict[UUID, Component]] = None
+        self._by_type: Dict[str, List[Component]] = {}
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    def get(self, component_id: UUID) -> Optional[Component]:
+        """Get an active component by id"""
+        self._ensure_fresh()
+        return self._by_id.get(component_id)
+
+    def of_type(self, component_type: str) -> List[Component]:
+        """Every active component of a type"""
+        self._ensure_fresh()
+        return self._by_type.get(component_type, [])
+
+    def reload(self):
+        """Reload the whole catalog from the database"""
+        with self._lock:
+            self._load(cache.get(CATALOG_VERSION_KEY))
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        interval = self.check_interval
+        if interval is None:
+            interval = getattr(settings, 'COMPATIBILITY_INDEX_CHECK_INTERVAL', 5.0)
+        if self._by_id is not None and now - self._checked_at < interval:
+            return
+
+        max_age = self.max_age
+        if max_age is None:
+            max_age = getattr(settings, 'COMPATIBILITY_CATALOG_MAX_AGE', 300.0)
+        with self._lock:
+            shared_version = cache.get(CATALOG_VERSION_KEY)
+            if self._by_id is None or shared_version != self._version or now - self._loaded_at >= max_age:
+                self._load(shared_version)
+            self._checked_at = now
+
+    def _load(self, version):
+        by_id = {}
+        by_type = defaultdict(list)
+        for component in Component.objects.filter(is_active=True).only(*CATALOG_FIELDS).iterator(chunk_size=2000):
+            by_id[component.id] = component
+            by_type[component.type].append(component)
+
+        self._by_id, self._by_type = by_id, dict(by_type)
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+def publish_catalog_change():
+    """Make every worker reload its catalog on its next check"""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 1, None)
+
+component_catalog = ComponentCatalog()
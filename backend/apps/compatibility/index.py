@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from uuid import UUID
+from django.conf import settings
+from django.core.cache import cache
+from .models import CompatibilityRule
+from apps.components.models import CompatibilityLink
+
+# Shared version stamp so every worker notices writes made by the others
+INDEX_VERSION_KEY = 'compatibility_index_version'
+
+Pair = FrozenSet[UUID]
+
+class CompatibilityIndex:
+    """
+    In-memory index of active compatibility rules and links, keyed by unordered component pair
+    Built once per worker and kept up to date by model signals
+    """
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._rules: Optional[Dict[Pair, Tuple[CompatibilityRule, ...]]] = None
+        self._links: Optional[Dict[Pair, Tuple[CompatibilityLink, ...]]] = None
+        self._rule_pairs: Dict[UUID, Pair] = {}
+        self._link_pairs: Dict[UUID, Pair] = {}
+        self._adjacency = None
+        self._changes = 0
+        self._version = None
+        self._checked_at = 0.0
+
+    def get_rule(self, component_a_id: UUID, component_b_id: UUID) -> Optional[CompatibilityRule]:
+        """Get the active explicit rule between two components"""
+        self._ensure_fresh()
+        rules = self._rules.get(frozenset((component_a_id, component_b_id)))
+        return rules[0] if rules else None
+
+    def get_link(self, component_a_id: UUID, component_b_id: UUID) -> Optional[CompatibilityLink]:
+        """Get the basic compatibility link between two components"""
+        self._ensure_fresh()
+        links = self._links.get(frozenset((component_a_id, component_b_id)))
+        return links[0] if links else None
+
+    def partners(self, component_id: UUID) -> FrozenSet[UUID]:
+        """Ids of every component joined to the given one by an active rule or a link"""
+        return self._graph()[0].get(component_id, frozenset())
+
+    def link_edges(self, component_id: UUID) -> Tuple[Tuple[UUID, CompatibilityLink], ...]:
+        """(other component id, link) for every link touching a component, in either direction"""
+        return self._graph()[1].get(component_id, ())
+
+    def _graph(self):
+        """Adjacency lists derived from the pair maps, rebuilt lazily after a write"""
+        self._ensure_fresh()
+        graph = self._adjacency
+        if graph is not None:
+            return graph
+
+        with self._lock:
+            changes = self._changes
+            pairs = [*self._rules, *self._links]
+            links = [link for entries in self._links.values() for link in entries]
+
+        partners = defaultdict(set)
+        for pair in pairs:
+            if len(pair) == 2:
+                component_a_id, component_b_id = tuple(pair)
+                partners[component_a_id].add(component_b_id)
+                partners[component_b_id].add(component_a_id)
+
+        link_edges = defaultdict(list)
+        for link in links:
+            if link.source_id != link.target_id:
+                link_edges[link.source_id].append((link.target_id, link))
+                link_edges[link.target_id].append((link.source_id, link))
+
+        graph = (
+            {node_id: frozenset(ids) for node_id, ids in partners.items()},
+            {node_id: tuple(edges) for node_id, edges in link_edges.items()},
+        )
+        with self._lock:
+            # Don't keep an adjacency that a concurrent write already outdated
+            if changes == self._changes:
+                self._adjacency = graph
+        return graph
+
+    def rebuild(self):
+        """Reload the whole index from the database"""
+        with self._lock:
+            self._build(cache.get(INDEX_VERSION_KEY))
+
+    def update_rule(self, rule: CompatibilityRule):
+        """Add, replace or drop a rule after it was saved"""
+        with self._lock:
+            if self._rules is None:
+                return
+            self._discard(self._rules, self._rule_pairs, rule.id)
+            if rule.is_active:
+                self._insert(self._rules, self._rule_pairs, rule,
+                             frozenset((rule.component_a_id, rule.component_b_id)))
+            self._publish_change()
+
+    def remove_rule(self, rule: CompatibilityRule):
+        """Drop a rule after it was deleted"""
+        with self._lock:
+            if self._rules is None:
+                return
+            self._discard(self._rules, self._rule_pairs, rule.id)
+            self._publish_change()
+
+    def update_link(self, link: CompatibilityLink):
+        """Add or replace a link after it was saved"""
+        with self._lock:
+            if self._links is None:
+                return
+            self._discard(self._links, self._link_pairs, link.id)
+            self._insert(self._links, self._link_pairs, link,
+                         frozenset((link.source_id, link.target_id)))
+            self._publish_change()
+
+    def update_links(self, links: Iterable[CompatibilityLink]):
+        """update_link for a batch, announced to other workers once"""
+        with self._lock:
+            if self._links is None:
+                return
+            for link in links:
+                self._discard(self._links, self._link_pairs, link.id)
+                self._insert(self._links, self._link_pairs, link,
+                             frozenset((link.source_id, link.target_id)))
+            self._publish_change()
+
+    def remove_link(self, link: CompatibilityLink):
+        """Drop a link after it was deleted"""
+        with self._lock:
+            if self._links is None:
+                return
+            self._discard(self._links, self._link_pairs, link.id)
+            self._publish_change()
+
+    def _ensure_fresh(self):
+        """Build the index on first use and reload it when another worker changed it"""
+        now = time.monotonic()
+        interval = self.check_interval
+        if interval is None:
+            interval = getattr(settings, 'COMPATIBILITY_INDEX_CHECK_INTERVAL', 5.0)
+        if self._rules is not None and now - self._checked_at < interval:
+            return
+
+        with self._lock:
+            shared_version = cache.get(INDEX_VERSION_KEY)
+            if self._rules is None or shared_version != self._version:
+                self._build(shared_version)
+            self._checked_at = now
+
+    def _build(self, version):
+        rules: Dict[Pair, Tuple[CompatibilityRule, ...]] = {}
+        rule_pairs: Dict[UUID, Pair] = {}
+        for rule in CompatibilityRule.objects.filter(is_active=True):
+            self._insert(rules, rule_pairs, rule, frozenset((rule.component_a_id, rule.component_b_id)))
+
+        links: Dict[Pair, Tuple[CompatibilityLink, ...]] = {}
+        link_pairs: Dict[UUID, Pair] = {}
+        for link in CompatibilityLink.objects.all():
+            self._insert(links, link_pairs, link, frozenset((link.source_id, link.target_id)))
+
+        self._rules, self._rule_pairs = rules, rule_pairs
+        self._links, self._link_pairs = links, link_pairs
+        self._adjacency = None
+        self._changes += 1
+        self._version = version
+
+    @staticmethod
+    def _insert(entries, pairs, obj, pair):
+        # Tuples are replaced rather than mutated so lock-free readers never see a partial update
+        entries[pair] = entries.get(pair, ()) + (obj,)
+        pairs[obj.id] = pair
+
+    @staticmethod
+    def _discard(entries, pairs, obj_id):
+        pair = pairs.pop(obj_id, None)
+        if pair is None:
+            return
+        remaining = tuple(obj for obj in entries.get(pair, ()) if obj.id != obj_id)
+        if remaining:
+            entries[pair] = remaining
+        else:
+            entries.pop(pair, None)
+
+    def _publish_change(self):
+        """Bump the shared version so other workers reload, without reloading this one"""
+        self._adjacency = None
+        self._changes += 1
+        try:
+            new_version = cache.incr(INDEX_VERSION_KEY)
+        except ValueError:
+            new_version = 1
+            cache.set(INDEX_VERSION_KEY, new_version, None)
+
+        if self._version is None or new_version == self._version + 1:
+            self._version = new_version
+
+compatibility_index = CompatibilityIndex()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+from apps.compatibility.matrix import CompatibilityMatrixBuilder
+
+class Command(BaseCommand):
+    help = "Materialize compatibility results into the compatibility_matrix table (incremental by default)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every plausible pair')
+        parser.add_argument('--since', help='ISO timestamp; defaults to the previous run')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk upsert')
+
+    def handle(self, *args, **options):
+        builder = CompatibilityMatrixBuilder(batch_size=options['batch_size'])
+
+        if options['full']:
+            written = builder.build()
+        else:
+            since = parse_datetime(options['since']) if options['since'] else None
+            written = builder.refresh(since)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} compatibility matrix rows"))
@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.compatibility.cache import bump_component_versions
+from apps.compatibility.matrix import mark_components_stale
+from apps.components.models import Component
+
+LAST_RUN_KEY = 'compatibility_cache_invalidated_at'
+
+class Command(BaseCommand):
+    help = (
+        "Invalidate cached compatibility results and matrix rows for components changed outside "
+        "the ORM (e.g. by the scraper), which model signals never see"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='ISO timestamp; defaults to the previous run')
+        parser.add_argument('--all', action='store_true', help='Invalidate every component')
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        queryset = Component.objects.all()
+
+        if not options['all']:
+            since = parse_datetime(options['since']) if options['since'] else cache.get(LAST_RUN_KEY)
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+
+        count = 0
+        batch = []
+        for component_id in queryset.values_list('id', flat=True).iterator(chunk_size=2000):
+            batch.append(component_id)
+            if len(batch) >= 2000:
+                bump_component_versions(batch)
+                mark_components_stale(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            bump_component_versions(batch)
+            mark_components_stale(batch)
+            count += len(batch)
+
+        cache.set(LAST_RUN_KEY, started_at, None)
+        self.stdout.write(self.style.SUCCESS(f"Invalidated cached results and matrix rows for {count} components"))
@@ -0,0 +1,224 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import combinations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+from django.db.models import F, Max, Q
+from django.utils import timezone
+from .models import CompatibilityRule, CompatibilityMatrixEntry
+from .services import CompatibilityService, ORDERED_TYPE_PAIRS, RELEVANT_TYPE_PAIRS
+from apps.components.models import Component, CompatibilityLink
+
+# Namespace for the pair-derived primary keys of matrix rows
+MATRIX_NAMESPACE = uuid.UUID('6f1c1d2e-4b7a-4f0e-9a51-3c2a8d5e7b90')
+
+# Component fields needed to evaluate a pair
+EVALUATION_FIELDS = ['id', 'brand', 'model', 'type', 'speed', 'specs']
+
+def matrix_entry_id(component_a_id: UUID, component_b_id: UUID) -> UUID:
+    """Primary key of the matrix row for an unordered component pair"""
+    low, high = sorted((component_a_id, component_b_id))
+    return uuid.uuid5(MATRIX_NAMESPACE, f"{low}:{high}")
+
+def get_materialized_result(component_a_id: UUID, component_b_id: UUID) -> Optional[Dict[str, Any]]:
+    """
+    Look up a precomputed result by primary key
+    Returns None when the pair has no fresh row or either component is inactive
+    A row computed before either component was last updated is not fresh either, so writes
+    that bypass the signals (e.g. the scraper's) are never answered from an outdated row
+    """
+    entry = CompatibilityMatrixEntry.objects.filter(
+        Q(computed_at__gte=F('component_low__updated_at')),
+        Q(computed_at__gte=F('component_high__updated_at')),
+        pk=matrix_entry_id(component_a_id, component_b_id),
+        is_stale=False,
+        component_low__is_active=True,
+        component_high__is_active=True
+    ).values('status', 'confidence', 'explanation', 'source', 'adapter_required').first()
+
+    if entry is None:
+        return None
+
+    result = {
+        'status': entry['status'],
+        'confidence': float(entry['confidence']),
+        'explanation': entry['explanation'],
+        'source': entry['source'],
+    }
+    if entry['adapter_required']:
+        result['adapter_required'] = True
+    return result
+
+def mark_pairs_stale(pairs: Iterable[Tuple[UUID, UUID]]):
+    """Flag the rows of the given pairs so online checks stop trusting them"""
+    entry_ids = [matrix_entry_id(a_id, b_id) for a_id, b_id in pairs if a_id and b_id]
+    if entry_ids:
+        CompatibilityMatrixEntry.objects.filter(pk__in=entry_ids).update(is_stale=True)
+
+def mark_component_stale(component_id: UUID):
+    """Flag every row involving a component"""
+    CompatibilityMatrixEntry.objects.filter(
+        Q(component_low=component_id) | Q(component_high=component_id)
+    ).update(is_stale=True)
+
+def mark_components_stale(component_ids: Iterable[UUID]):
+    """Flag every row involving any of the given components"""
+    component_ids = list(component_ids)
+    if component_ids:
+        CompatibilityMatrixEntry.objects.filter(
+            Q(component_low__in=component_ids) | Q(component_high__in=component_ids)
+        ).update(is_stale=True)
+
+class CompatibilityMatrixBuilder:
+    """
+    Materializes CompatibilityService results into the compatibility_matrix table
+    Only pairs of related component types (see RELEVANT_TYPE_PAIRS) and pairs with
+    an explicit rule or link are evaluated
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.service = CompatibilityService()
+        self.related_types = defaultdict(set)
+        for type_a, type_b in ORDERED_TYPE_PAIRS:
+            self.related_types[type_a].add(type_b)
+            self.related_types[type_b].add(type_a)
+
+    def build(self) -> int:
+        """Recompute every plausible pair"""
+        started_at = timezone.now()
+        components = self._load_components()
+        return self._write(self._all_pairs(components), components, started_at)
+
+    def refresh(self, since: Optional[datetime] = None) -> int:
+        """
+        Recompute only what changed since the previous run: stale rows, pairs of
+        rules and links edited since then, and every pair of a component that was
+        created or updated since then (this also catches raw SQL writes from the scraper)
+        """
+        started_at = timezone.now()
+        if since is None:
+            since = CompatibilityMatrixEntry.objects.aggregate(last_run=Max('computed_at'))['last_run']
+        if since is None:
+            return self.build()
+
+        components = self._load_components()
+        changed_ids = set(
+            Component.objects.filter(is_active=True, updated_at__gte=since).values_list('id', flat=True)
+        )
+
+        explicit_pairs = set()
+        explicit_pairs.update(
+            CompatibilityRule.objects.filter(updated_at__gte=since).values_list('component_a_id', 'component_b_id')
+        )
+        explicit_pairs.update(
+            CompatibilityLink.objects.filter(created_at__gte=since).values_list('source_id', 'target_id')
+        )
+        explicit_pairs.update(
+            CompatibilityMatrixEntry.objects.filter(is_stale=True).values_list('component_low_id', 'component_high_id')
+        )
+
+        return self._write(self._changed_pairs(components, changed_ids, explicit_pairs), components, started_at)
+
+    def _load_components(self) -> Dict[UUID, Component]:
+        return {
+            component.id: component
+            for component in Component.objects.filter(is_active=True).only(*EVALUATION_FIELDS).iterator(chunk_size=2000)
+        }
+
+    def _all_pairs(self, components: Dict[UUID, Component]) -> Iterator[Tuple[Component, Component]]:
+        by_type = defaultdict(list)
+        for component in components.values():
+            by_type[component.type].append(component)
+
+        # Each unordered type pair is visited once, so these pairs never repeat
+        for type_a, type_b in ORDERED_TYPE_PAIRS:
+            if type_a == type_b:
+                yield from combinations(by_type[type_a], 2)
+                continue
+            for component_a in by_type[type_a]:
+                for component_b in by_type[type_b]:
+                    yield component_a, component_b
+
+        # Explicit pairs between unrelated types are the only ones not covered above
+        explicit_pairs = set(
+            CompatibilityRule.objects.filter(is_active=True).values_list('component_a_id', 'component_b_id')
+        )
+        explicit_pairs.update(CompatibilityLink.objects.values_list('source_id', 'target_id'))
+        for pair in self._resolve_pairs(components, explicit_pairs):
+            if frozenset((pair[0].type, pair[1].type)) not in RELEVANT_TYPE_PAIRS:
+                yield pair
+
+    def _changed_pairs(self, components: Dict[UUID, Component], changed_ids: Set[UUID],
+                       explicit_pairs: Set[Tuple[UUID, UUID]]) -> Iterator[Tuple[Component, Component]]:
+        by_type = defaultdict(list)
+        for component in components.values():
+            by_type[component.type].append(component)
+
+        seen = set()
+        for component_id in changed_ids:
+            component = components.get(component_id)
+            if component is None:
+                continue
+            for related_type in self.related_types[component.type]:
+                for partner in by_type[related_type]:
+                    pair = frozenset((component.id, partner.id))
+                    if partner is not component and pair not in seen:
+                        seen.add(pair)
+                        yield component, partner
+
+        for component_a, component_b in self._resolve_pairs(components, explicit_pairs):
+            pair = frozenset((component_a.id, component_b.id))
+            if pair not in seen:
+                seen.add(pair)
+                yield component_a, component_b
+
+    def _resolve_pairs(self, components: Dict[UUID, Component],
+                       id_pairs: Iterable[Tuple[UUID, UUID]]) -> Iterator[Tuple[Component, Component]]:
+        seen = set()
+        for a_id, b_id in id_pairs:
+            pair = frozenset((a_id, b_id))
+            if a_id == b_id or pair in seen or a_id not in components or b_id not in components:
+                continue
+            seen.add(pair)
+            yield components[a_id], components[b_id]
+
+    def _write(self, pairs: Iterable[Tuple[Component, Component]], components: Dict[UUID, Component],
+               computed_at: datetime) -> int:
+        written = 0
+        batch: List[CompatibilityMatrixEntry] = []
+        for component_a, component_b in pairs:
+            batch.append(self._entry(component_a, component_b, computed_at))
+            if len(batch) >= self.batch_size:
+                written += self._flush(batch)
+                batch = []
+        if batch:
+            written += self._flush(batch)
+        return written
+
+    def _entry(self, component_a: Component, component_b: Component, computed_at: datetime) -> CompatibilityMatrixEntry:
+        result = self.service.check_compatibility(component_a, component_b)
+        low, high = sorted((component_a.id, component_b.id))
+        return CompatibilityMatrixEntry(
+            id=matrix_entry_id(low, high),
+            component_low_id=low,
+            component_high_id=high,
+            status=result['status'],
+            confidence=round(result['confidence'], 2),
+            explanation=result['explanation'],
+            source=result.get('source', ''),
+            adapter_required=bool(result.get('adapter_required', False)),
+            is_stale=False,
+            computed_at=computed_at
+        )
+
+    def _flush(self, batch: List[CompatibilityMatrixEntry]) -> int:
+        CompatibilityMatrixEntry.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=['status', 'confidence', 'explanation', 'source',
+                           'adapter_required', 'is_stale', 'computed_at']
+        )
+        return len(batch)
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0003_component_is_active'),
+        ('compatibility', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompatibilityMatrixEntry',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('compatible', 'Compatible'), ('conditional', 'Conditional/Uncertain'), ('incompatible', 'Incompatible')], max_length=20)),
+                ('confidence', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('explanation', models.TextField()),
+                ('source', models.CharField(max_length=30)),
+                ('adapter_required', models.BooleanField(default=False)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField()),
+                ('component_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matrix_high', to='components.component')),
+                ('component_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matrix_low', to='components.component')),
+            ],
+            options={
+                'db_table': 'compatibility_matrix',
+                'indexes': [models.Index(fields=['component_high'], name='compatibili_compone_4c44a4_idx'), models.Index(fields=['is_stale'], name='compatibili_is_stal_ce0dd9_idx'), models.Index(fields=['computed_at'], name='compatibili_compute_c39e7c_idx')],
+                'unique_together': {('component_low', 'component_high')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compatibility', '0002_compatibility_matrix'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compatibilitycheck',
+            index=models.Index(fields=['created_at', 'id'], name='check_created_keyset_idx'),
+        ),
+    ]
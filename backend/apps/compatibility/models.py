@@ -67,7 +67,39 @@ class CompatibilityCheck(models.Model):
         indexes = [
             models.Index(fields=['created_at']),
             models.Index(fields=['result_status']),
+            # Keyset pagination of the newest-first check history
+            models.Index(fields=['created_at', 'id'], name='check_created_keyset_idx'),
         ]
     
     def __str__(self):
-        return f"Check: {self.component_a} + {self.component_b} = {self.result_status}"
\ No newline at end of file
+        return f"Check: {self.component_a} + {self.component_b} = {self.result_status}"
+
+
+class CompatibilityMatrixEntry(models.Model):
+    """Precomputed compatibility result for an unordered component pair"""
+    # Derived from the pair (see apps.compatibility.matrix.matrix_entry_id) so lookups hit the primary key
+    id = models.UUIDField(primary_key=True, editable=False)
+    component_low = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='matrix_low')
+    component_high = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='matrix_high')
+    
+    status = models.CharField(max_length=20, choices=COMPATIBILITY_STATUS)
+    confidence = models.DecimalField(max_digits=3, decimal_places=2)
+    explanation = models.TextField()
+    source = models.CharField(max_length=30)
+    adapter_required = models.BooleanField(default=False)
+    
+    # Set when a rule, link or component change makes the row out of date
+    is_stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'compatibility_matrix'
+        unique_together = ['component_low', 'component_high']
+        indexes = [
+            models.Index(fields=['component_high']),
+            models.Index(fields=['is_stale']),
+            models.Index(fields=['computed_at']),
+        ]
+    
+    def __str__(self):
+        return f"Matrix: {self.component_low} + {self.component_high} = {self.status}"
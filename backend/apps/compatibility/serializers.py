@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import CompatibilityRule, CompatibilityCheck
+from apps.components.models import COMPONENT_TYPES
 from apps.components.serializers import ComponentSerializer
 
 class CompatibilityRuleSerializer(serializers.ModelSerializer):
@@ -43,3 +44,34 @@ class CompatibilityResultSerializer(serializers.Serializer):
     confidence = serializers.DecimalField(max_digits=3, decimal_places=2)
     explanation = serializers.CharField()
     processing_time_ms = serializers.IntegerField(required=False)
+
+class BuildCompatibilityRequestSerializer(serializers.Serializer):
+    """Serializer for whole-build compatibility check requests"""
+    component_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=2,
+        max_length=50
+    )
+
+class BuildPairResultSerializer(CompatibilityResultSerializer):
+    """Serializer for one pair of a whole-build compatibility check"""
+    component_a_id = serializers.UUIDField()
+    component_b_id = serializers.UUIDField()
+    source = serializers.CharField()
+    adapter_required = serializers.BooleanField(required=False)
+
+class BuildSolveRequestSerializer(serializers.Serializer):
+    """Serializer for partial-build solve requests"""
+    component_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=len(COMPONENT_TYPES)
+    )
+    slots = serializers.ListField(
+        child=serializers.ChoiceField(choices=COMPONENT_TYPES),
+        required=False
+    )
+
+class AdapterPathRequestSerializer(CompatibilityCheckRequestSerializer):
+    """Serializer for adapter path search requests"""
+    max_hops = serializers.IntegerField(min_value=1, max_value=6, required=False)
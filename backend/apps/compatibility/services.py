@@ -1,7 +1,22 @@
-from typing import Dict, List, Any
-from django.db import models
+from itertools import combinations
+from typing import Dict, List, Any, Iterable, Tuple
+from django.db.models import Q
 from .models import CompatibilityRule
-from apps.components.models import Component, CompatibilityLink
+from .index import compatibility_index
+from .spec_rules import SPEC_RULES, get_spec_engine
+from apps.components.models import Component, CompatibilityLink, LINK_TYPE_COMPONENTS
+
+def _ordered_type_pairs() -> List[Tuple[str, str]]:
+    pairs = {}
+    for types in [*LINK_TYPE_COMPONENTS.values(), *(rule['types'] for rule in SPEC_RULES if rule['types'] is not None)]:
+        pairs.setdefault(frozenset(types), tuple(types))
+    return list(pairs.values())
+
+# Component type pairs that are worth checking inside a build: those joined by a link type
+# or compared by a spec rule. Each unordered pair appears once as (type_a, type_b); a pair
+# may join a type to itself
+ORDERED_TYPE_PAIRS = _ordered_type_pairs()
+RELEVANT_TYPE_PAIRS = {frozenset(types) for types in ORDERED_TYPE_PAIRS}
 
 class CompatibilityService:
     """Service for checking component compatibility"""
@@ -24,27 +39,72 @@ class CompatibilityService:
         # If no explicit rule, use specification-based checking
         return self._check_specification_compatibility(component_a, component_b)
     
-    def _get_explicit_rule(self, component_a: Component, component_b: Component) -> CompatibilityRule:
-        """Get explicit compatibility rule between two components"""
-        # Check both directions (A->B and B->A)
-        rule = CompatibilityRule.objects.filter(
+    def check_build(self, components: Iterable[Component]) -> List[Tuple[Component, Component, Dict[str, Any]]]:
+        """
+        Check every relevant pair of a bike build
+        Rules and links come from the in-memory index, so only the components
+        themselves need to be loaded from the database
+        """
+        results = []
+        for component_a, component_b in combinations(list(components), 2):
+            explicit_rule = self._get_explicit_rule(component_a, component_b)
+            basic_link = self._get_basic_link(component_a, component_b)
+            if not explicit_rule and not basic_link and \
+                    frozenset((component_a.type, component_b.type)) not in RELEVANT_TYPE_PAIRS:
+                continue
+            
+            result = self._evaluate_pair(component_a, component_b, explicit_rule, basic_link)
+            results.append((component_a, component_b, result))
+        
+        return results
+    
+    def find_compatible(self, component: Component, component_type: str) -> List[Tuple[Component, Dict[str, Any]]]:
+        """
+        Find every active component of a type that is not incompatible with the given one
+        Spec filters are pushed into SQL; components with an explicit rule or link to the
+        given one are always kept so the rule or link can decide. Results are ranked by confidence
+        """
+        spec_filter = get_spec_engine().candidate_filter(component, component_type)
+        
+        explicit_filter = (
+            Q(id__in=CompatibilityRule.objects.filter(is_active=True, component_a=component).values('component_b')) |
+            Q(id__in=CompatibilityRule.objects.filter(is_active=True, component_b=component).values('component_a')) |
+            Q(id__in=CompatibilityLink.objects.filter(source=component).values('target')) |
+            Q(id__in=CompatibilityLink.objects.filter(target=component).values('source'))
+        )
+        
+        candidates = Component.objects.filter(
+            type=component_type,
             is_active=True
-        ).filter(
-            models.Q(component_a=component_a, component_b=component_b) |
-            models.Q(component_a=component_b, component_b=component_a)
-        ).first()
+        ).exclude(id=component.id).filter(spec_filter | explicit_filter)
         
-        return rule
+        matches = []
+        for candidate in candidates:
+            result = self.check_compatibility(component, candidate)
+            if result['status'] != 'incompatible':
+                matches.append((candidate, result))
+        
+        matches.sort(key=lambda match: (-match[1]['confidence'], match[0].brand, match[0].model))
+        return matches
+    
+    def _evaluate_pair(self, component_a: Component, component_b: Component,
+                       explicit_rule: CompatibilityRule, basic_link: CompatibilityLink) -> Dict[str, Any]:
+        """Evaluate a pair whose rule and link have already been looked up"""
+        if explicit_rule:
+            return self._format_explicit_result(explicit_rule)
+        if basic_link:
+            return self._format_basic_link_result(basic_link)
+        return self._check_specification_compatibility(component_a, component_b)
+    
+    def _get_explicit_rule(self, component_a: Component, component_b: Component) -> CompatibilityRule:
+        """Get explicit compatibility rule between two components"""
+        # The index is keyed by unordered pair, so both directions are covered
+        return compatibility_index.get_rule(component_a.id, component_b.id)
     
     def _get_basic_link(self, component_a: Component, component_b: Component) -> CompatibilityLink:
         """Get basic compatibility link between two components"""
-        # Check both directions (source->target and target->source)
-        link = CompatibilityLink.objects.filter(
-            models.Q(source=component_a, target=component_b) |
-            models.Q(source=component_b, target=component_a)
-        ).first()
-        
-        return link
+        # The index is keyed by unordered pair, so both directions are covered
+        return compatibility_index.get_link(component_a.id, component_b.id)
     
     def _format_explicit_result(self, rule: CompatibilityRule) -> Dict[str, Any]:
         """Format explicit rule result"""
@@ -75,26 +135,28 @@ class CompatibilityService:
     
     def _check_specification_compatibility(self, component_a: Component, component_b: Component) -> Dict[str, Any]:
         """Check compatibility based on component specifications"""
-        # Basic spec-based compatibility checking
-        specs_a = component_a.specs or {}
-        specs_b = component_b.specs or {}
+        outcomes = get_spec_engine().evaluate(component_a, component_b)
+        
+        # Any failed rule makes the pair incompatible
+        failures = [outcome for outcome in outcomes if not outcome.passed]
+        if failures:
+            return {
+                'status': 'incompatible',
+                'confidence': max(outcome.confidence for outcome in failures),
+                'explanation': '; '.join(outcome.explanation for outcome in failures),
+                'source': 'spec_analysis',
+                'spec_rules': [outcome.rule for outcome in outcomes]
+            }
         
-        # Simple speed compatibility check
-        if component_a.speed and component_b.speed:
-            if component_a.speed == component_b.speed:
-                return {
-                    'status': 'compatible',
-                    'confidence': 0.7,
-                    'explanation': f"Both components have {component_a.speed} speed compatibility",
-                    'source': 'spec_analysis'
-                }
-            else:
-                return {
-                    'status': 'incompatible',
-                    'confidence': 0.8,
-                    'explanation': f"Speed mismatch: {component_a.speed} vs {component_b.speed}",
-                    'source': 'spec_analysis'
-                }
+        # Each additional matching spec raises confidence a little
+        if outcomes:
+            return {
+                'status': 'compatible',
+                'confidence': round(min(0.9, 0.7 + 0.05 * (len(outcomes) - 1)), 2),
+                'explanation': '; '.join(outcome.explanation for outcome in outcomes),
+                'source': 'spec_analysis',
+                'spec_rules': [outcome.rule for outcome in outcomes]
+            }
         
         # Default uncertain result
         return {
@@ -0,0 +1,126 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import CompatibilityRule
+from .index import compatibility_index
+from .catalog import publish_catalog_change
+from .cache import bump_component_version, bump_component_versions
+from .matrix import mark_pairs_stale, mark_component_stale, mark_components_stale
+from .spec_rules import category_filter, reset_spec_engine
+from apps.components.models import Component, CompatibilityLink
+from apps.components.signals import components_bulk_saved, links_bulk_saved
+from apps.standards.models import StandardDefinition
+
+# Component fields that can change the outcome of a compatibility check
+COMPONENT_CHECK_FIELDS = ['is_active', 'type', 'speed', 'specs']
+
+# Components invalidated per round trip after a standard changed
+INVALIDATION_BATCH_SIZE = 2000
+
+@receiver(pre_save, sender=CompatibilityRule)
+def rule_pre_save(sender, instance, **kwargs):
+    # Remember the previous pair so both old and new results get invalidated
+    instance._previous_pair = CompatibilityRule.objects.filter(pk=instance.pk).values_list(
+        'component_a_id', 'component_b_id'
+    ).first() or ()
+
+@receiver(post_save, sender=CompatibilityRule)
+def rule_saved(sender, instance, **kwargs):
+    compatibility_index.update_rule(instance)
+    bump_component_versions([instance.component_a_id, instance.component_b_id,
+                             *getattr(instance, '_previous_pair', ())])
+    mark_pairs_stale([(instance.component_a_id, instance.component_b_id),
+                      getattr(instance, '_previous_pair', None) or (None, None)])
+
+@receiver(post_delete, sender=CompatibilityRule)
+def rule_deleted(sender, instance, **kwargs):
+    compatibility_index.remove_rule(instance)
+    bump_component_versions([instance.component_a_id, instance.component_b_id])
+    mark_pairs_stale([(instance.component_a_id, instance.component_b_id)])
+
+@receiver(pre_save, sender=CompatibilityLink)
+def link_pre_save(sender, instance, **kwargs):
+    # Remember the previous pair so both old and new results get invalidated
+    instance._previous_pair = CompatibilityLink.objects.filter(pk=instance.pk).values_list(
+        'source_id', 'target_id'
+    ).first() or ()
+
+@receiver(post_save, sender=CompatibilityLink)
+def link_saved(sender, instance, **kwargs):
+    compatibility_index.update_link(instance)
+    bump_component_versions([instance.source_id, instance.target_id,
+                             *getattr(instance, '_previous_pair', ())])
+    mark_pairs_stale([(instance.source_id, instance.target_id),
+                      getattr(instance, '_previous_pair', None) or (None, None)])
+
+@receiver(post_delete, sender=CompatibilityLink)
+def link_deleted(sender, instance, **kwargs):
+    compatibility_index.remove_link(instance)
+    bump_component_versions([instance.source_id, instance.target_id])
+    mark_pairs_stale([(instance.source_id, instance.target_id)])
+
+@receiver(pre_save, sender=Component)
+def component_pre_save(sender, instance, **kwargs):
+    # Remember whether anything a check depends on changes so post_save knows to invalidate
+    previous = Component.objects.filter(pk=instance.pk).values(*COMPONENT_CHECK_FIELDS).first()
+    instance._check_fields_changed = previous is not None and any(
+        previous[field] != getattr(instance, field) for field in COMPONENT_CHECK_FIELDS
+    )
+
+@receiver(post_save, sender=Component)
+def component_saved(sender, instance, created, **kwargs):
+    publish_catalog_change()
+    if not created and getattr(instance, '_check_fields_changed', False):
+        bump_component_version(instance.id)
+        mark_component_stale(instance.id)
+
+@receiver(post_delete, sender=Component)
+def component_deleted(sender, instance, **kwargs):
+    publish_catalog_change()
+    bump_component_version(instance.id)
+
+@receiver(components_bulk_saved, sender=Component)
+def components_bulk_imported(sender, instances, previous, **kwargs):
+    publish_catalog_change()
+    changed = [instance.id for instance in instances if instance.id in previous and any(
+        previous[instance.id][field] != getattr(instance, field) for field in COMPONENT_CHECK_FIELDS
+    )]
+    bump_component_versions(changed)
+    mark_components_stale(changed)
+
+@receiver(links_bulk_saved, sender=CompatibilityLink)
+def links_bulk_imported(sender, instances, **kwargs):
+    compatibility_index.update_links(instances)
+    bump_component_versions({component_id for link in instances
+                             for component_id in (link.source_id, link.target_id)})
+    mark_pairs_stale([(link.source_id, link.target_id) for link in instances])
+
+@receiver(pre_save, sender=StandardDefinition)
+def standard_pre_save(sender, instance, **kwargs):
+    # Remember the previous category so components compared under it get invalidated too
+    instance._previous_category = StandardDefinition.objects.filter(pk=instance.pk).values_list(
+        'category', flat=True
+    ).first()
+
+@receiver(post_save, sender=StandardDefinition)
+@receiver(post_delete, sender=StandardDefinition)
+def standard_changed(sender, instance, **kwargs):
+    reset_spec_engine()
+    # Aliases and compatible_with decide spec matches, so results computed under the old
+    # definition are outdated for every component holding a spec of its category
+    for category in {instance.category, getattr(instance, '_previous_category', None)} - {None}:
+        condition = category_filter(category)
+        if condition is not None:
+            _invalidate_components(Component.objects.filter(condition))
+
+def _invalidate_components(queryset):
+    """Bump the cache versions and mark the matrix rows of every component in a queryset"""
+    batch = []
+    for component_id in queryset.values_list('id', flat=True).iterator(chunk_size=INVALIDATION_BATCH_SIZE):
+        batch.append(component_id)
+        if len(batch) >= INVALIDATION_BATCH_SIZE:
+            bump_component_versions(batch)
+            mark_components_stale(batch)
+            batch = []
+    if batch:
+        bump_component_versions(batch)
+        mark_components_stale(batch)
@@ -0,0 +1,165 @@
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from .catalog import component_catalog, ComponentCatalog
+from .index import compatibility_index
+from .services import CompatibilityService, RELEVANT_TYPE_PAIRS
+from .spec_rules import get_spec_engine
+from apps.components.models import Component, COMPONENT_TYPES
+
+class BuildSolver:
+    """
+    Computes which components can still complete a partial build
+    Every slot (component type) starts with the whole in-memory catalog of its type,
+    chosen slots are fixed to the chosen component, and AC-3 removes every candidate
+    that has no compatible partner left in a constrained slot. Slots are constrained
+    when their types are related (see RELEVANT_TYPE_PAIRS); a chosen component also
+    constrains unrelated slots through its explicit rules and links.
+
+    Revising an arc between two open slots can cost up to |X| * |Y| pair checks, so
+    such arcs are skipped when that product exceeds max_arc_work. Results are then
+    still correct, only less pruned.
+    """
+
+    def __init__(self, catalog: Optional[ComponentCatalog] = None, max_arc_work: Optional[int] = None):
+        self.catalog = catalog or component_catalog
+        self.max_arc_work = max_arc_work or getattr(settings, 'COMPATIBILITY_SOLVER_MAX_ARC_WORK', 250000)
+        self.service = CompatibilityService()
+        self.engine = get_spec_engine()
+        self._spec_results: Dict[Tuple, bool] = {}
+
+    def solve(self, chosen: Iterable[Component], slots: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Returns the feasible components of every open slot, the chosen pairs that
+        conflict with each other, and the open-slot arcs that were too large to revise
+        """
+        start_time = time.time()
+        chosen = list(chosen)
+        chosen_by_type = {component.type: component for component in chosen}
+        if len(chosen_by_type) != len(chosen):
+            raise ValueError("Only one component per type can be chosen")
+
+        if slots is None:
+            slots = [value for value, _ in COMPONENT_TYPES]
+        open_slots = [slot for slot in dict.fromkeys(slots) if slot not in chosen_by_type]
+
+        domains: Dict[str, List[Component]] = {slot: [chosen_by_type[slot]] for slot in chosen_by_type}
+        for slot in open_slots:
+            domains[slot] = list(self.catalog.of_type(slot))
+
+        conflicts = []
+        for index, component_a in enumerate(chosen):
+            for component_b in chosen[index + 1:]:
+                if not self._compatible(component_a, component_b):
+                    conflicts.append((component_a.id, component_b.id))
+
+        neighbours = self._neighbours(domains, set(chosen_by_type))
+        queue = deque((slot, other) for slot in open_slots for other in neighbours[slot])
+        queued = set(queue)
+        skipped_arcs = set()
+
+        while queue:
+            arc = queue.popleft()
+            queued.discard(arc)
+            slot, other = arc
+            if other not in chosen_by_type and len(domains[slot]) * len(domains[other]) > self.max_arc_work:
+                skipped_arcs.add(frozenset(arc))
+                continue
+
+            if self._revise(domains, slot, other, other in chosen_by_type):
+                for neighbour in neighbours[slot]:
+                    if neighbour != other and neighbour not in chosen_by_type and (neighbour, slot) not in queued:
+                        queue.append((neighbour, slot))
+                        queued.add((neighbour, slot))
+
+        return {
+            'slots': {slot: domains[slot] for slot in open_slots},
+            'conflicts': conflicts,
+            'skipped_arcs': sorted(tuple(sorted(arc)) for arc in skipped_arcs),
+            'processing_time_ms': int((time.time() - start_time) * 1000),
+        }
+
+    def _neighbours(self, domains: Dict[str, List[Component]], chosen_slots) -> Dict[str, List[str]]:
+        neighbours = defaultdict(list)
+        for slot in domains:
+            for other in domains:
+                # A type missing from the catalog says nothing about the others
+                if slot == other or not domains[other]:
+                    continue
+                # Explicit rules and links can join any types, but only checking them
+                # against a chosen component is cheap enough to always do
+                if frozenset((slot, other)) in RELEVANT_TYPE_PAIRS or other in chosen_slots:
+                    neighbours[slot].append(other)
+        return neighbours
+
+    def _revise(self, domains: Dict[str, List[Component]], slot: str, other: str, other_chosen: bool) -> bool:
+        """Drop every candidate of slot without a compatible partner in other; returns True if any was dropped"""
+        related = frozenset((slot, other)) in RELEVANT_TYPE_PAIRS
+        partners = domains[other]
+        if other_chosen:
+            # Rules and links are looked up only for the chosen component's known partners
+            chosen = partners[0]
+            explicit = compatibility_index.partners(chosen.id)
+            supported = [
+                candidate for candidate in domains[slot]
+                if (self._compatible(candidate, chosen, related) if candidate.id in explicit
+                    else not related or self._spec_compatible(candidate, chosen))
+            ]
+        else:
+            supported = [
+                candidate for candidate in domains[slot]
+                if self._has_support(candidate, partners, related)
+            ]
+
+        if len(supported) == len(domains[slot]):
+            return False
+        domains[slot] = supported
+        return True
+
+    def _has_support(self, candidate: Component, partners: List[Component], related: bool) -> bool:
+        # Partners with the same signature evaluate identically unless a rule or link
+        # overrides, so one representative per signature is enough for the spec tier
+        explicit = compatibility_index.partners(candidate.id)
+        seen = set()
+        for partner in partners:
+            if partner.id in explicit:
+                if self._compatible(candidate, partner, related):
+                    return True
+                continue
+            signature = self._signature(partner, candidate.type)
+            if signature in seen:
+                continue
+            seen.add(signature)
+            if not related or self._spec_compatible(candidate, partner):
+                return True
+        return False
+
+    def _compatible(self, component_a: Component, component_b: Component, related: bool = True) -> bool:
+        rule = compatibility_index.get_rule(component_a.id, component_b.id)
+        if rule:
+            return rule.status != 'incompatible'
+        link = compatibility_index.get_link(component_a.id, component_b.id)
+        if link:
+            return link.status != 'not_compatible'
+        return not related or self._spec_compatible(component_a, component_b)
+
+    def _spec_compatible(self, component_a: Component, component_b: Component) -> bool:
+        key = (component_a.type, self._signature(component_a, component_b.type),
+               component_b.type, self._signature(component_b, component_a.type))
+        compatible = self._spec_results.get(key)
+        if compatible is None:
+            result = self.service._check_specification_compatibility(component_a, component_b)
+            compatible = result['status'] != 'incompatible'
+            self._spec_results[key] = compatible
+        return compatible
+
+    def _signature(self, component: Component, other_type: str) -> Tuple:
+        # Kept on the instance, so catalog components compute it once per catalog load
+        signatures = component.__dict__.get('_spec_signatures')
+        if signatures is None:
+            signatures = component._spec_signatures = {}
+        signature = signatures.get(other_type)
+        if signature is None:
+            signature = signatures[other_type] = self.engine.signature(component, other_type)
+        return signature
@@ -0,0 +1,352 @@
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from apps.components.models import Component
+from apps.standards.models import StandardDefinition
+
+# Declarative spec rules. Each rule applies to one unordered pair of component
+# types (or to every pair when 'types' is None) and compares one spec on each side.
+#   standard  - both values name the same standard, or standards declared compatible
+#   contains  - the first side lists the second side's value
+#   at_least  - the first side's value is greater than or equal to the second side's
+# A rule is skipped for a pair when either spec is missing or can't be compared.
+SPEC_RULES = [
+    {
+        'name': 'speed',
+        'types': None,
+        'fields': ('speed', 'speed'),
+        'match': 'equal',
+        'confidence': 0.8,
+    },
+    {
+        'name': 'driver_body',
+        'types': ('cassette', 'wheel'),
+        'fields': ('specs.driver_body', 'specs.driver_body'),
+        'match': 'standard',
+        'category': 'driver_body',
+        'confidence': 0.9,
+    },
+    {
+        'name': 'bottom_bracket',
+        'types': ('crankset', 'frame'),
+        'fields': ('specs.spindle_type', 'specs.bottom_bracket'),
+        'match': 'standard',
+        'category': 'bottom_bracket',
+        'confidence': 0.85,
+    },
+    {
+        'name': 'axle',
+        'types': ('wheel', 'frame'),
+        'fields': ('specs.axle', 'specs.axle'),
+        'match': 'standard',
+        'category': 'axle',
+        'confidence': 0.9,
+    },
+    {
+        'name': 'brake_mount',
+        'types': ('brakes', 'frame'),
+        'fields': ('specs.mount_type', 'specs.brake_mount'),
+        'match': 'standard',
+        'category': 'brake_mount',
+        'confidence': 0.85,
+    },
+    {
+        'name': 'rotor_mount',
+        'types': ('brakes', 'wheel'),
+        'fields': ('specs.rotor_mount', 'specs.mount_type'),
+        'match': 'standard',
+        'category': 'mount_type',
+        'confidence': 0.85,
+    },
+    {
+        'name': 'rotor_size',
+        'types': ('brakes', 'wheel'),
+        'fields': ('specs.rotor_size_compatibility', 'specs.rotor_size'),
+        'match': 'contains',
+        'confidence': 0.75,
+    },
+    {
+        'name': 'max_cog',
+        'types': ('derailleur', 'cassette'),
+        'fields': ('specs.max_cog_size', 'specs.max_cog'),
+        'match': 'at_least',
+        'confidence': 0.8,
+    },
+]
+
+# Leading number of a spec value, ignoring a unit suffix such as "51t" or "160mm"
+NUMERIC_PREFIX = re.compile(r'\s*([-+]?\d+(?:\.\d+)?)')
+
+# Spec values a rule treats as missing
+EMPTY_SPEC_VALUES = (None, '', [])
+
+class SpecOutcome(NamedTuple):
+    """Result of one spec rule applied to a pair"""
+    rule: str
+    passed: bool
+    confidence: float
+    explanation: str
+
+Predicate = Callable[[Component, Component], Optional[SpecOutcome]]
+
+class StandardCatalog:
+    """Canonical standard names, aliases and declared compatibilities from StandardDefinition"""
+
+    def __init__(self, definitions):
+        self.canonical: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self.spellings: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.compatible: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+
+        for definition in definitions:
+            specifications = definition.specifications or {}
+            name = definition.name.lower()
+            for spelling in [definition.name, *specifications.get('aliases', [])]:
+                self.canonical[definition.category][str(spelling).lower()] = name
+                self.spellings[definition.category][name].add(str(spelling))
+            for other in specifications.get('compatible_with', []):
+                self.compatible[definition.category][name].add(str(other).lower())
+
+    def normalize(self, category: str, value: Any) -> str:
+        value = str(value).lower()
+        return self.canonical[category].get(value, value)
+
+    def matches(self, category: str, value_a: Any, value_b: Any) -> bool:
+        name_a = self.normalize(category, value_a)
+        name_b = self.normalize(category, value_b)
+        if name_a == name_b:
+            return True
+        compatible = self.compatible[category]
+        return name_b in {self.normalize(category, v) for v in compatible[name_a]} or \
+            name_a in {self.normalize(category, v) for v in compatible[name_b]}
+
+    def equivalent_spellings(self, category: str, value: Any) -> Set[str]:
+        """Every spelling that matches a value, for pushing the comparison into SQL"""
+        name = self.normalize(category, value)
+        names = {name}
+        names.update(self.normalize(category, v) for v in self.compatible[category][name])
+        names.update(
+            other for other, compatible in self.compatible[category].items()
+            if name in {self.normalize(category, v) for v in compatible}
+        )
+        spellings = {str(value)}
+        for other in names:
+            spellings.add(other)
+            spellings.update(self.spellings[category].get(other, ()))
+        return spellings
+
+class SpecRuleEngine:
+    """
+    SPEC_RULES compiled into Python predicates grouped by component type pair
+    A check only runs the predicates registered for its pair plus the ones for every pair
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], standards: StandardCatalog):
+        self.rules = rules
+        self.standards = standards
+        self._by_pair: Dict[FrozenSet[str], List[Predicate]] = defaultdict(list)
+        self._wildcard: List[Predicate] = []
+        self._pushdown: Dict[FrozenSet[str], List[Dict[str, Any]]] = defaultdict(list)
+        self._read_fields: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+        for rule in rules:
+            if rule['types'] is None:
+                self._wildcard.append(self._compile(rule))
+            else:
+                self._by_pair[frozenset(rule['types'])].append(self._compile(rule))
+                if rule['match'] == 'standard':
+                    self._pushdown[frozenset(rule['types'])].append(rule)
+
+    def evaluate(self, component_a: Component, component_b: Component) -> List[SpecOutcome]:
+        """Apply every rule relevant to the pair; rules whose specs are missing are skipped"""
+        predicates = self._by_pair.get(frozenset((component_a.type, component_b.type)), [])
+        outcomes = []
+        for predicate in (*self._wildcard, *predicates):
+            outcome = predicate(component_a, component_b)
+            if outcome is not None:
+                outcomes.append(outcome)
+        return outcomes
+
+    def signature(self, component: Component, other_type: str) -> Tuple[Any, ...]:
+        """
+        The spec values the rules read from a component when it is paired with another type
+        Two pairs with equal signatures on both sides always evaluate to the same outcomes
+        """
+        fields = self._read_fields.get((component.type, other_type))
+        if fields is None:
+            fields = self._fields_read(component.type, other_type)
+            self._read_fields[(component.type, other_type)] = fields
+        return tuple(_freeze(_read_field(component, field)) for field in fields)
+
+    def candidate_filter(self, component: Component, component_type: str) -> Q:
+        """
+        SQL filter equivalent to the standard-matching rules, so candidates that would
+        certainly fail them are never loaded. Candidates without the spec, or holding an
+        empty value for it, are kept as the rule skips them
+        """
+        spec_filter = Q()
+        if component.speed:
+            spec_filter &= Q(speed=component.speed) | Q(speed__isnull=True)
+
+        for rule in self._pushdown.get(frozenset((component.type, component_type)), []):
+            own_field, other_field = rule['fields']
+            if rule['types'][0] != component.type:
+                own_field, other_field = other_field, own_field
+            value = _read_field(component, own_field)
+            if value in EMPTY_SPEC_VALUES:
+                continue
+
+            key = other_field.split('.', 1)[1]
+            matches = Q()
+            for spelling in self.standards.equivalent_spellings(rule['category'], value):
+                matches |= Q(**{f'specs__{key}__iexact': spelling})
+            missing = ~Q(specs__has_key=key)
+            for empty in EMPTY_SPEC_VALUES:
+                missing |= Q(**{f'specs__{key}': empty})
+            spec_filter &= matches | missing
+
+        return spec_filter
+
+    def _fields_read(self, own_type: str, other_type: str) -> Tuple[str, ...]:
+        fields = []
+        for rule in self.rules:
+            if rule['types'] is None:
+                fields.extend(rule['fields'])
+            elif frozenset(rule['types']) == frozenset((own_type, other_type)):
+                if rule['types'][0] == own_type:
+                    fields.append(rule['fields'][0])
+                if rule['types'][1] == own_type:
+                    fields.append(rule['fields'][1])
+        return tuple(dict.fromkeys(fields))
+
+    def _compile(self, rule: Dict[str, Any]) -> Predicate:
+        first_type = rule['types'][0] if rule['types'] else None
+        field_a, field_b = rule['fields']
+        compare = self._comparator(rule)
+        name = rule['name']
+        confidence = rule['confidence']
+
+        def predicate(component_a: Component, component_b: Component) -> Optional[SpecOutcome]:
+            # Orient the pair so the first component matches the rule's first type
+            if first_type is not None and component_a.type != first_type:
+                component_a, component_b = component_b, component_a
+            value_a = _read_field(component_a, field_a)
+            value_b = _read_field(component_b, field_b)
+            if value_a in EMPTY_SPEC_VALUES or value_b in EMPTY_SPEC_VALUES:
+                return None
+            compared = compare(value_a, value_b)
+            if compared is None:
+                return None
+            passed, explanation = compared
+            return SpecOutcome(name, passed, confidence, explanation)
+
+        return predicate
+
+    def _comparator(self, rule: Dict[str, Any]):
+        label = rule['name'].replace('_', ' ')
+        match = rule['match']
+
+        if match == 'equal' and rule['name'] == 'speed':
+            def compare(value_a, value_b):
+                if value_a == value_b:
+                    return True, f"Both components have {value_a} speed compatibility"
+                return False, f"Speed mismatch: {value_a} vs {value_b}"
+        elif match == 'equal':
+            def compare(value_a, value_b):
+                if value_a == value_b:
+                    return True, f"Matching {label}: {value_a}"
+                return False, f"{label.capitalize()} mismatch: {value_a} vs {value_b}"
+        elif match == 'standard':
+            category = rule['category']
+
+            def compare(value_a, value_b):
+                if self.standards.matches(category, value_a, value_b):
+                    return True, f"Compatible {label}: {value_a} / {value_b}"
+                return False, f"{label.capitalize()} mismatch: {value_a} vs {value_b}"
+        elif match == 'contains':
+            def compare(value_a, value_b):
+                values = value_a if isinstance(value_a, (list, tuple)) else [value_a]
+                if _as_number(value_b) in {_as_number(v) for v in values}:
+                    return True, f"Supported {label}: {value_b}"
+                return False, f"Unsupported {label}: {value_b} not in {list(values)}"
+        elif match == 'at_least':
+            def compare(value_a, value_b):
+                number_a, number_b = _as_number(value_a), _as_number(value_b)
+                if number_a is None or number_b is None:
+                    # Not comparable: skip the rule, as for a missing spec
+                    return None
+                if number_a >= number_b:
+                    return True, f"{label.capitalize()} within limit: {value_b} <= {value_a}"
+                return False, f"{label.capitalize()} exceeded: {value_b} > {value_a}"
+        else:
+            raise ValueError(f"Unknown spec rule match '{match}' in rule '{rule['name']}'")
+
+        return compare
+
+def _read_field(component: Component, field: str) -> Any:
+    if field.startswith('specs.'):
+        return (component.specs or {}).get(field[len('specs.'):])
+    return getattr(component, field, None)
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+def _as_number(value: Any) -> Optional[float]:
+    match = NUMERIC_PREFIX.match(str(value))
+    return float(match.group(1)) if match else None
+
+def category_filter(category: str) -> Optional[Q]:
+    """
+    Components holding a spec that the rules compare under a standard category,
+    or None when no rule uses the category
+    """
+    condition = None
+    for rule in SPEC_RULES:
+        if rule.get('category') != category:
+            continue
+        for component_type, field in zip(rule['types'], rule['fields']):
+            if field.startswith('specs.'):
+                holds_spec = Q(type=component_type, specs__has_key=field[len('specs.'):])
+                condition = holds_spec if condition is None else condition | holds_spec
+    return condition
+
+# Shared version stamp so every worker recompiles after a standard changed
+ENGINE_VERSION_KEY = 'spec_rule_engine_version'
+
+_engine: Optional[SpecRuleEngine] = None
+_engine_version = None
+_checked_at = 0.0
+_engine_lock = threading.Lock()
+
+def get_spec_engine() -> SpecRuleEngine:
+    """Compiled engine for this worker, built on first use and rebuilt when standards change"""
+    global _engine, _engine_version, _checked_at
+    now = time.monotonic()
+    interval = getattr(settings, 'COMPATIBILITY_INDEX_CHECK_INTERVAL', 5.0)
+    if _engine is not None and now - _checked_at < interval:
+        return _engine
+
+    with _engine_lock:
+        shared_version = cache.get(ENGINE_VERSION_KEY)
+        if _engine is None or shared_version != _engine_version:
+            standards = StandardCatalog(StandardDefinition.objects.filter(is_active=True))
+            _engine = SpecRuleEngine(SPEC_RULES, standards)
+            _engine_version = shared_version
+        _checked_at = now
+    return _engine
+
+def reset_spec_engine():
+    """Make every worker recompile the engine on its next check (e.g. after a standard changed)"""
+    global _engine
+    with _engine_lock:
+        _engine = None
+        cache.set(ENGINE_VERSION_KEY, uuid.uuid4().hex, None)
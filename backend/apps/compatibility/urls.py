@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CompatibilityRuleViewSet, CompatibilityCheckViewSet, check_compatibility
+from .views import CompatibilityRuleViewSet, CompatibilityCheckViewSet, check_compatibility, check_build_compatibility, solve_build, find_adapter_path
 
 router = DefaultRouter()
 router.register(r'compatibility-rules', CompatibilityRuleViewSet)
@@ -9,4 +9,7 @@ router.register(r'compatibility-checks', CompatibilityCheckViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('compatibility/check/', check_compatibility, name='check_compatibility'),
+    path('compatibility/check-build/', check_build_compatibility, name='check_build_compatibility'),
+    path('compatibility/solve/', solve_build, name='solve_build'),
+    path('compatibility/adapter-path/', find_adapter_path, name='find_adapter_path'),
 ]
\ No newline at end of file
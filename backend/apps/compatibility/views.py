@@ -3,16 +3,26 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.core.cache import cache
-from .models import CompatibilityRule, CompatibilityCheck
+from .models import CompatibilityRule, CompatibilityCheck, COMPATIBILITY_STATUS
 from .serializers import (
     CompatibilityRuleSerializer, 
     CompatibilityCheckSerializer,
     CompatibilityCheckRequestSerializer,
-    CompatibilityResultSerializer
+    CompatibilityResultSerializer,
+    BuildCompatibilityRequestSerializer,
+    BuildPairResultSerializer,
+    BuildSolveRequestSerializer,
+    AdapterPathRequestSerializer
 )
 from .services import CompatibilityService
+from .audit import audit_writer
+from .cache import get_cached_result, get_component_versions, set_cached_results
+from .matrix import get_materialized_result
+from .solver import BuildSolver
+from .adapters import AdapterPathFinder
 from apps.components.models import Component
+from apps.components.pagination import KeysetPagination
+from apps.components.serializers import ComponentSerializer
 
 class CompatibilityRuleViewSet(viewsets.ModelViewSet):
     """ViewSet for managing compatibility rules"""
@@ -30,6 +40,7 @@ class CompatibilityCheckViewSet(viewsets.ReadOnlyModelViewSet):
         'component_a', 'component_b'
     ).order_by('-created_at')
     serializer_class = CompatibilityCheckSerializer
+    pagination_class = KeysetPagination
 
 @api_view(['POST'])
 def check_compatibility(request):
@@ -46,49 +57,235 @@ def check_compatibility(request):
     component_a_id = serializer.validated_data['component_a_id']
     component_b_id = serializer.validated_data['component_b_id']
     
-    # Get components
-    try:
-        component_a = Component.objects.get(id=component_a_id, is_active=True)
-        component_b = Component.objects.get(id=component_b_id, is_active=True)
-    except Component.DoesNotExist:
-        return Response(
-            {'error': 'One or both components not found'}, 
-            status=status.HTTP_404_NOT_FOUND
-        )
-    
-    # Check cache first
-    cache_key = f"compatibility_{min(component_a_id, component_b_id)}_{max(component_a_id, component_b_id)}"
-    cached_result = cache.get(cache_key)
-    
+    # Check cache first, before touching the database
+    cached_result, versions = get_cached_result(component_a_id, component_b_id)
     if cached_result:
         return Response(cached_result)
     
-    # Perform compatibility check
-    compatibility_service = CompatibilityService()
-    result = compatibility_service.check_compatibility(component_a, component_b)
+    # Then the precomputed matrix, which needs no component rows either
+    result = get_materialized_result(component_a_id, component_b_id)
+    if result is None:
+        # Get both components in a single query
+        components = {
+            component.id: component
+            for component in Component.objects.filter(id__in=[component_a_id, component_b_id], is_active=True)
+        }
+        if component_a_id not in components or component_b_id not in components:
+            return Response(
+                {'error': 'One or both components not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Perform compatibility check
+        compatibility_service = CompatibilityService()
+        result = compatibility_service.check_compatibility(
+            components[component_a_id], components[component_b_id]
+        )
     
     processing_time = int((time.time() - start_time) * 1000)
     result['processing_time_ms'] = processing_time
     
-    # Log the check
-    CompatibilityCheck.objects.create(
-        component_a=component_a,
-        component_b=component_b,
+    # Log the check off the request path
+    audit_writer.record(CompatibilityCheck(
+        component_a_id=component_a_id,
+        component_b_id=component_b_id,
         result_status=result['status'],
         result_confidence=result['confidence'],
         result_explanation=result['explanation'],
         processing_time_ms=processing_time,
         user_ip=get_client_ip(request),
         user_agent=request.META.get('HTTP_USER_AGENT', '')
-    )
+    ))
     
-    # Cache the result for 1 hour
-    cache.set(cache_key, result, 3600)
+    # Cache the result, tagged with the component versions it was computed from
+    set_cached_results([(component_a_id, component_b_id, result)], versions)
     
     # Serialize and return result
     result_serializer = CompatibilityResultSerializer(result)
     return Response(result_serializer.data)
 
+@api_view(['POST'])
+def check_build_compatibility(request):
+    """
+    Check compatibility between every relevant pair of a full bike build
+    """
+    start_time = time.time()
+    
+    # Validate request
+    serializer = BuildCompatibilityRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    component_ids = list(dict.fromkeys(serializer.validated_data['component_ids']))
+    
+    # Read versions before the components so a concurrent change can't be cached under its new version
+    versions = get_component_versions(component_ids)
+    
+    # Get all components in a single query
+    components = list(Component.objects.filter(id__in=component_ids, is_active=True))
+    if len(components) != len(component_ids):
+        found_ids = {component.id for component in components}
+        return Response(
+            {
+                'error': 'One or more components not found',
+                'missing_ids': [str(component_id) for component_id in component_ids if component_id not in found_ids]
+            },
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    # Perform compatibility checks for the whole build
+    compatibility_service = CompatibilityService()
+    pair_results = compatibility_service.check_build(components)
+    
+    processing_time = int((time.time() - start_time) * 1000)
+    user_ip = get_client_ip(request)
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    
+    results = []
+    for component_a, component_b, result in pair_results:
+        result['processing_time_ms'] = processing_time
+        results.append({
+            'component_a_id': component_a.id,
+            'component_b_id': component_b.id,
+            **result
+        })
+        audit_writer.record(CompatibilityCheck(
+            component_a=component_a,
+            component_b=component_b,
+            result_status=result['status'],
+            result_confidence=result['confidence'],
+            result_explanation=result['explanation'],
+            processing_time_ms=processing_time,
+            user_ip=user_ip,
+            user_agent=user_agent
+        ))
+    
+    # Share the results with single-pair lookups
+    set_cached_results(
+        [(component_a.id, component_b.id, result) for component_a, component_b, result in pair_results],
+        versions
+    )
+    
+    summary = {value: 0 for value, _ in COMPATIBILITY_STATUS}
+    for result in results:
+        summary[result['status']] += 1
+    
+    return Response({
+        'results': BuildPairResultSerializer(results, many=True).data,
+        'summary': summary,
+        'processing_time_ms': processing_time
+    })
+
+@api_view(['POST'])
+def solve_build(request):
+    """
+    List the components that can still complete a partial build, per open slot
+    """
+    # Validate request
+    serializer = BuildSolveRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    component_ids = list(dict.fromkeys(serializer.validated_data['component_ids']))
+    components = list(Component.objects.filter(id__in=component_ids, is_active=True))
+    if len(components) != len(component_ids):
+        found_ids = {component.id for component in components}
+        return Response(
+            {
+                'error': 'One or more components not found',
+                'missing_ids': [str(component_id) for component_id in component_ids if component_id not in found_ids]
+            },
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    try:
+        solution = BuildSolver().solve(components, serializer.validated_data.get('slots'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'slots': {
+            slot: {
+                'count': len(feasible),
+                'component_ids': [str(component.id) for component in feasible]
+            }
+            for slot, feasible in solution['slots'].items()
+        },
+        'conflicts': [
+            {'component_a_id': str(component_a_id), 'component_b_id': str(component_b_id)}
+            for component_a_id, component_b_id in solution['conflicts']
+        ],
+        'skipped_arcs': solution['skipped_arcs'],
+        'processing_time_ms': solution['processing_time_ms']
+    })
+
+@api_view(['POST'])
+def find_adapter_path(request):
+    """
+    Find the most confident chain of compatibility links joining two components
+    """
+    start_time = time.time()
+    
+    # Validate request
+    serializer = AdapterPathRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    component_a_id = serializer.validated_data['component_a_id']
+    component_b_id = serializer.validated_data['component_b_id']
+    
+    active_ids = set(
+        Component.objects.filter(id__in=[component_a_id, component_b_id], is_active=True).values_list('id', flat=True)
+    )
+    if component_a_id not in active_ids or component_b_id not in active_ids:
+        return Response(
+            {'error': 'One or both components not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    finder = AdapterPathFinder(max_hops=serializer.validated_data.get('max_hops'))
+    path = finder.find_path(component_a_id, component_b_id)
+    if path is None:
+        return Response(
+            {'error': 'No adapter path found between these components'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    # Load every component on the path in a single query
+    components = Component.objects.filter(is_active=True).in_bulk(path['component_ids'])
+    missing_ids = [component_id for component_id in path['component_ids'] if component_id not in components]
+    if missing_ids:
+        # This worker's catalog still had components deleted or deactivated since it was loaded.
+        # Only the local copy is reloaded: the writes that changed them publish the change
+        finder.catalog.reload()
+        return Response(
+            {
+                'error': 'The adapter path goes through components that are no longer available, retry shortly',
+                'missing_ids': [str(component_id) for component_id in missing_ids]
+            },
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return Response({
+        'components': [ComponentSerializer(components[component_id]).data for component_id in path['component_ids']],
+        'links': [
+            {
+                'id': str(link.id),
+                'source_id': str(link.source_id),
+                'target_id': str(link.target_id),
+                'type': link.type,
+                'status': link.status,
+                'adapter_required': link.adapter_required,
+                'notes': link.notes
+            }
+            for link in path['links']
+        ],
+        'hops': len(path['links']),
+        'confidence': path['confidence'],
+        'adapter_required': path['adapter_required'],
+        'processing_time_ms': int((time.time() - start_time) * 1000)
+    })
+
 def get_client_ip(request):
     """Get client IP address from request"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -3,14 +3,14 @@ from .models import Component, CompatibilityLink
 
 @admin.register(Component)
 class ComponentAdmin(admin.ModelAdmin):
-    list_display = ['brand', 'model', 'type', 'speed', 'created_at']
-    list_filter = ['type', 'brand', 'speed', 'created_at']
+    list_display = ['brand', 'model', 'type', 'speed', 'is_active', 'created_at']
+    list_filter = ['type', 'brand', 'speed', 'is_active', 'created_at']
     search_fields = ['brand', 'model']
     readonly_fields = ['id', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('brand', 'model', 'type', 'speed')
+            'fields': ('brand', 'model', 'type', 'speed', 'is_active')
         }),
         ('Specifications', {
             'fields': ('specs',)
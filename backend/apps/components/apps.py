@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ComponentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.components'
\ No newline at end of file
+    name = 'apps.components'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,163 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Set, Tuple
+from django.db import transaction
+from .models import Component, CompatibilityLink
+from .serializers import ComponentBulkSerializer, CompatibilityLinkBulkSerializer
+from .signals import components_bulk_saved, links_bulk_saved
+
+# Rows per INSERT ... ON CONFLICT statement
+BULK_BATCH_SIZE = 1000
+
+COMPONENT_KEY_FIELDS = ['brand', 'model', 'type']
+COMPONENT_UPDATE_FIELDS = ['speed', 'specs', 'image_url', 'product_url', 'is_active']
+LINK_KEY_FIELDS = ['source_id', 'target_id', 'type']
+LINK_UPDATE_FIELDS = ['status', 'adapter_required', 'notes']
+
+# Per-record errors of a batch, by position in the request
+Errors = Dict[int, Dict]
+
+class BulkResult(NamedTuple):
+    created: int
+    updated: int
+
+def validate_components(records: List[Dict]) -> Tuple[List[Dict], Errors]:
+    """Validated rows, or the errors of every invalid record"""
+    return _validate(ComponentBulkSerializer, records)
+
+def validate_links(records: List[Dict]) -> Tuple[List[Dict], Errors]:
+    """
+    Validated rows, or the errors of every invalid record
+    Source and target ids are looked up with one query for the whole batch
+    """
+    rows, errors = _validate(CompatibilityLinkBulkSerializer, records)
+    if errors:
+        return rows, errors
+
+    component_ids = {row[field] for row in rows for field in ('source', 'target')}
+    known = set(Component.objects.filter(id__in=component_ids).values_list('id', flat=True))
+    for index, row in enumerate(rows):
+        missing = {field: [f"Unknown component '{row[field]}'"]
+                   for field in ('source', 'target') if row[field] not in known}
+        if missing:
+            errors[index] = missing
+    return rows, errors
+
+def upsert_components(rows: List[Dict]) -> BulkResult:
+    """
+    Insert or update components keyed by brand, model and type
+    An existing component only gets the fields its record gives; the others keep their
+    stored value. A key repeated within the batch keeps its last record
+    """
+    components = {}
+    for row in rows:
+        components[tuple(row[field] for field in COMPONENT_KEY_FIELDS)] = (Component(**row), set(row))
+
+    stored = Component.objects.filter(
+        brand__in={key[0] for key in components}, model__in={key[1] for key in components}
+    )
+    with transaction.atomic():
+        # Existing rows keep their id; bulk_create doesn't return it on conflict
+        previous = _stored(stored, components, COMPONENT_KEY_FIELDS, COMPONENT_UPDATE_FIELDS)
+        for key, values in previous.items():
+            components[key][0].id = values['id']
+
+        _write(Component, components.values(), COMPONENT_KEY_FIELDS, COMPONENT_UPDATE_FIELDS, ['updated_at'])
+
+        instances, created = _saved_instances(
+            components, previous, _stored(stored, components, COMPONENT_KEY_FIELDS, COMPONENT_UPDATE_FIELDS),
+            COMPONENT_UPDATE_FIELDS
+        )
+        previous = {values['id']: values for values in previous.values()}
+        # Indexes and caches only follow what was committed
+        transaction.on_commit(
+            lambda: components_bulk_saved.send(sender=Component, instances=instances, previous=previous)
+        )
+    return BulkResult(created=created, updated=len(instances) - created)
+
+def upsert_links(rows: List[Dict]) -> BulkResult:
+    """
+    Insert or update links keyed by source, target and type
+    An existing link only gets the fields its record gives; the others keep their
+    stored value. A key repeated within the batch keeps its last record
+    """
+    links = {}
+    for row in rows:
+        link = CompatibilityLink(**_link_fields(row))
+        links[(link.source_id, link.target_id, link.type)] = (link, set(row))
+
+    stored = CompatibilityLink.objects.filter(
+        source_id__in={key[0] for key in links}, target_id__in={key[1] for key in links}
+    )
+    with transaction.atomic():
+        previous = _stored(stored, links, LINK_KEY_FIELDS, LINK_UPDATE_FIELDS)
+        for key, values in previous.items():
+            links[key][0].id = values['id']
+
+        _write(CompatibilityLink, links.values(), ['source', 'target', 'type'], LINK_UPDATE_FIELDS)
+
+        instances, created = _saved_instances(
+            links, previous, _stored(stored, links, LINK_KEY_FIELDS, LINK_UPDATE_FIELDS), LINK_UPDATE_FIELDS
+        )
+        transaction.on_commit(lambda: links_bulk_saved.send(sender=CompatibilityLink, instances=instances))
+    return BulkResult(created=created, updated=len(instances) - created)
+
+def _write(model, records: Iterable[Tuple[Any, Set[str]]], unique_fields: List[str],
+           update_fields: List[str], always_updated: Sequence[str] = ()):
+    """
+    INSERT ... ON CONFLICT DO UPDATE once per set of fields the records give, so an existing
+    row is only overwritten with values its record actually carried
+    """
+    groups = defaultdict(list)
+    for obj, fields in records:
+        groups[tuple(field for field in update_fields if field in fields)].append(obj)
+
+    for fields, objs in groups.items():
+        fields = [*fields, *always_updated]
+        if fields:
+            model.objects.bulk_create(objs, batch_size=BULK_BATCH_SIZE, update_conflicts=True,
+                                      unique_fields=unique_fields, update_fields=fields)
+        else:
+            # Nothing to update: existing rows are left as they are
+            model.objects.bulk_create(objs, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+
+def _stored(queryset, keys: Iterable[Tuple], key_fields: List[str], update_fields: List[str]) -> Dict[Tuple, Dict]:
+    """Stored values of the rows holding one of the keys, by key"""
+    keys = set(keys)
+    found = {}
+    for values in queryset.values('id', 'created_at', *key_fields, *update_fields):
+        key = tuple(values[field] for field in key_fields)
+        if key in keys:
+            found[key] = values
+    return found
+
+def _saved_instances(records: Dict[Tuple, Tuple[Any, Set[str]]], previous: Dict[Tuple, Dict],
+                     saved: Dict[Tuple, Dict], update_fields: List[str]) -> Tuple[List, int]:
+    """
+    The written objects holding the values read back after the write, and how many were created
+    A row inserted by someone else since the lookup was updated rather than created, so
+    the id generated for it is replaced with the stored one
+    """
+    instances = []
+    created = 0
+    for key, (obj, _) in records.items():
+        values = saved[key]
+        if key not in previous and values['id'] == obj.id:
+            created += 1
+        obj.id = values['id']
+        obj.created_at = values['created_at']
+        for field in update_fields:
+            setattr(obj, field, values[field])
+        instances.append(obj)
+    return instances, created
+
+def _link_fields(row: Dict) -> Dict:
+    fields = dict(row)
+    fields['source_id'] = fields.pop('source')
+    fields['target_id'] = fields.pop('target')
+    return fields
+
+def _validate(serializer_class, records: List[Dict]) -> Tuple[List[Dict], Errors]:
+    serializer = serializer_class(data=records, many=True)
+    if serializer.is_valid():
+        return list(serializer.validated_data), {}
+    return [], {index: errors for index, errors in enumerate(serializer.errors) if errors}
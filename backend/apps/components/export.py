@@ -0,0 +1,74 @@
+import csv
+import json
+from typing import Dict, Iterator, List, Tuple
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Component, CompatibilityLink
+
+# Rows fetched per round trip of the server-side cursor behind QuerySet.iterator()
+EXPORT_CHUNK_SIZE = 2000
+
+COMPONENT_EXPORT_FIELDS = [
+    'id', 'brand', 'model', 'type', 'speed', 'specs', 'image_url', 'product_url',
+    'is_active', 'created_at', 'updated_at',
+]
+LINK_EXPORT_FIELDS = [
+    'id', 'source_id', 'target_id', 'type', 'status', 'adapter_required', 'notes', 'created_at',
+]
+
+# CSV columns when components and links share one file; the record column tells them apart
+COMBINED_CSV_FIELDS = ['record'] + COMPONENT_EXPORT_FIELDS + [
+    f'link_{field}' if field in COMPONENT_EXPORT_FIELDS else field for field in LINK_EXPORT_FIELDS
+]
+
+Record = Tuple[str, Dict]
+
+def iter_rows(queryset, fields: List[str], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict]:
+    """Rows as dicts, read through a server-side cursor without caching the queryset"""
+    for values in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        yield dict(zip(fields, values))
+
+def export_records(components=None, include_links: bool = False,
+                   chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Record]:
+    """
+    ('component', row) for every component in the queryset, then ('link', row) for every
+    link leaving one of them when include_links is set
+    """
+    if components is None:
+        components = Component.objects.all()
+    for row in iter_rows(components, COMPONENT_EXPORT_FIELDS, chunk_size):
+        yield 'component', row
+
+    if include_links:
+        links = CompatibilityLink.objects.filter(source__in=components.values('id')).order_by('created_at', 'id')
+        for row in iter_rows(links, LINK_EXPORT_FIELDS, chunk_size):
+            yield 'link', row
+
+def ndjson_lines(records: Iterator[Record]) -> Iterator[str]:
+    """One JSON object per line, with a record key of 'component' or 'link'"""
+    for record, row in records:
+        yield json.dumps({'record': record, **row}, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+
+class _LineBuffer:
+    """File-like target for csv.writer that hands each written line back instead of storing it"""
+
+    def write(self, value):
+        return value
+
+def csv_lines(records: Iterator[Record], include_links: bool = False) -> Iterator[str]:
+    """
+    CSV with a header row; specs are written as JSON
+    With links, components and links share the columns of COMBINED_CSV_FIELDS
+    """
+    fields = COMBINED_CSV_FIELDS if include_links else COMPONENT_EXPORT_FIELDS
+    writer = csv.DictWriter(_LineBuffer(), fieldnames=fields, extrasaction='ignore')
+    yield writer.writeheader()
+
+    for record, row in records:
+        if record == 'component':
+            row = {**row, 'specs': json.dumps(row['specs'])}
+        else:
+            row = {f'link_{field}' if field in COMPONENT_EXPORT_FIELDS else field: value
+                   for field, value in row.items()}
+        if include_links:
+            row['record'] = record
+        yield writer.writerow(row)
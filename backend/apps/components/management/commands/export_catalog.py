@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from apps.components.export import (
+    COMPONENT_EXPORT_FIELDS, EXPORT_CHUNK_SIZE, LINK_EXPORT_FIELDS, csv_lines, export_records, iter_rows,
+    ndjson_lines,
+)
+from apps.components.models import Component, CompatibilityLink
+
+class Command(BaseCommand):
+    help = (
+        "Export the component catalog, optionally with its compatibility links, as NDJSON, CSV "
+        "or Parquet; rows are streamed from a server-side cursor so memory stays flat"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-format', choices=['ndjson', 'csv', 'parquet'], default='ndjson')
+        parser.add_argument('--links', action='store_true', help='Also export compatibility links')
+        parser.add_argument('--output', help='File to write (a directory for parquet); defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Rows per round trip (and per Parquet row group)')
+
+    def handle(self, *args, **options):
+        output_format = options['output_format']
+        if output_format == 'parquet':
+            self.export_parquet(options)
+            return
+
+        records = export_records(include_links=options['links'], chunk_size=options['chunk_size'])
+        if output_format == 'csv':
+            lines = csv_lines(records, options['links'])
+        else:
+            lines = ndjson_lines(records)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                count = self.write_lines(lines, f)
+            self.stderr.write(self.style.SUCCESS(f"Exported {count} rows to {options['output']}"))
+        else:
+            self.write_lines(lines, sys.stdout)
+
+    def write_lines(self, lines, f):
+        count = 0
+        for line in lines:
+            f.write(line)
+            count += 1
+        return count
+
+    def export_parquet(self, options):
+        """components.parquet (and links.parquet) in the output directory, one row group per chunk"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError("Parquet export needs pyarrow: pip install pyarrow")
+        if not options['output']:
+            raise CommandError("Parquet export needs --output DIR")
+
+        os.makedirs(options['output'], exist_ok=True)
+        tables = [('components', Component.objects.all(), COMPONENT_EXPORT_FIELDS)]
+        if options['links']:
+            tables.append(('links', CompatibilityLink.objects.all(), LINK_EXPORT_FIELDS))
+
+        for name, queryset, fields in tables:
+            path = os.path.join(options['output'], f'{name}.parquet')
+            schema = pa.schema([(field, self.parquet_type(pa, field)) for field in fields])
+            count = 0
+            batch = []
+            with pq.ParquetWriter(path, schema) as writer:
+                for row in iter_rows(queryset, fields, options['chunk_size']):
+                    batch.append(row)
+                    if len(batch) >= options['chunk_size']:
+                        writer.write_table(self.parquet_table(pa, schema, batch))
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    writer.write_table(self.parquet_table(pa, schema, batch))
+                    count += len(batch)
+            self.stderr.write(self.style.SUCCESS(f"Exported {count} {name} to {path}"))
+
+    def parquet_type(self, pa, field):
+        if field == 'speed':
+            return pa.int32()
+        if field in ('is_active', 'adapter_required'):
+            return pa.bool_()
+        if field in ('created_at', 'updated_at'):
+            return pa.timestamp('us', tz='UTC')
+        # UUIDs and JSON specs have no portable Parquet type and are written as strings
+        return pa.string()
+
+    def parquet_table(self, pa, schema, batch):
+        columns = {}
+        for field in schema.names:
+            values = [row[field] for row in batch]
+            if field == 'specs':
+                values = [json.dumps(value) for value in values]
+            elif schema.field(field).type == pa.string():
+                values = [None if value is None else str(value) for value in values]
+            columns[field] = values
+        return pa.table(columns, schema=schema)
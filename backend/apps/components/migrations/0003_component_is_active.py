@@ -0,0 +1,18 @@
+# Generated migration for adding the is_active flag
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0002_add_url_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated migration for adding the scraped content hash
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0003_component_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
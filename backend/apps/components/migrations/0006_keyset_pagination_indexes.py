@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0005_component_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compatibilitylink',
+            index=models.Index(fields=['created_at', 'id'], name='link_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['brand', 'model', 'id'], name='component_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['created_at', 'id'], name='component_created_keyset_idx'),
+        ),
+    ]
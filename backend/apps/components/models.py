@@ -1,7 +1,13 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+# Words of brand and model, unstemmed so part numbers like "r8100" stay searchable
+COMPONENT_SEARCH_VECTOR = SearchVector('brand', 'model', config='simple')
+
 # Types de composants basés sur le schéma init.sql
 COMPONENT_TYPES = [
     ('crankset', 'Crankset'),
@@ -30,6 +36,9 @@ class Component(models.Model):
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    is_active = models.BooleanField(default=True)
+    # Hash of the last scraped payload, lets the scraper skip unchanged rewrites
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
     
     class Meta:
         db_table = 'components_component'  # Table name from init.sql
@@ -39,6 +48,14 @@ class Component(models.Model):
             models.Index(fields=['brand']),
             models.Index(fields=['type']),
             models.Index(fields=['speed']),
+            # Keyset pagination (apps.components.pagination) on the default and date orderings
+            models.Index(fields=['brand', 'model', 'id'], name='component_keyset_idx'),
+            models.Index(fields=['created_at', 'id'], name='component_created_keyset_idx'),
+            # Ranked full-text search (apps.components.search)
+            GinIndex(COMPONENT_SEARCH_VECTOR, name='component_search_idx'),
+            # Trigram indexes for the UPPER(...) LIKE '%...%' of icontains filters and SearchFilter
+            GinIndex(OpClass(Upper('brand'), name='gin_trgm_ops'), name='component_brand_trgm_idx'),
+            GinIndex(OpClass(Upper('model'), name='gin_trgm_ops'), name='component_model_trgm_idx'),
             # GIN index pour specs sera créé via migration custom
         ]
     
@@ -56,6 +73,17 @@ COMPATIBILITY_LINK_TYPES = [
     ('wheel_frame', 'Wheel to Frame'),
 ]
 
+# Component types joined by each compatibility link type
+LINK_TYPE_COMPONENTS = {
+    'cassette_driver': ('cassette', 'wheel'),
+    'shifter_derailleur': ('shifter', 'derailleur'),
+    'derailleur_cassette': ('derailleur', 'cassette'),
+    'brake_lever': ('brakes', 'shifter'),
+    'crankset_bb': ('crankset', 'frame'),
+    'chain_cassette': ('chain', 'cassette'),
+    'wheel_frame': ('wheel', 'frame'),
+}
+
 COMPATIBILITY_STATUSES = [
     ('compatible', 'Compatible'),
     ('compatible_with_adapter', 'Compatible with Adapter'),
@@ -82,6 +110,8 @@ class CompatibilityLink(models.Model):
             models.Index(fields=['source']),
             models.Index(fields=['target']),
             models.Index(fields=['status']),
+            # Keyset pagination of the newest-first listing
+            models.Index(fields=['created_at', 'id'], name='link_created_keyset_idx'),
         ]
     
     def __str__(self):
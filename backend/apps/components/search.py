@@ -0,0 +1,35 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Q
+from .models import COMPONENT_SEARCH_VECTOR
+
+# Letters and digits make up a search word; anything else separates words, so user input
+# never reaches the tsquery syntax
+SEARCH_WORD = re.compile(r'[^\W_]+')
+
+def prefix_query(text):
+    """
+    tsquery matching components with a brand or model word starting with each word of text
+    ("shim ultegra r81" finds "Shimano Ultegra R8100"); None when text has no words
+    """
+    words = SEARCH_WORD.findall(text.lower())
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config='simple')
+
+def search_components(queryset, text):
+    """
+    Components matching text, best match first
+    Prefix matches come from the full-text index. A model containing the whole text anywhere,
+    such as a part number typed without its prefix, matches through the trigram index.
+    """
+    query = prefix_query(text)
+    if query is None:
+        return queryset.none()
+
+    return queryset.annotate(
+        search=COMPONENT_SEARCH_VECTOR,
+        rank=SearchRank(COMPONENT_SEARCH_VECTOR, query),
+    ).filter(
+        Q(search=query) | Q(model__icontains=text.strip())
+    ).order_by('-rank', 'brand', 'model')
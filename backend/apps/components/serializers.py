@@ -6,7 +6,7 @@ class ComponentSerializer(serializers.ModelSerializer):
         model = Component
         fields = [
             'id', 'brand', 'model', 'type', 'speed', 
-            'specs', 'created_at', 'updated_at'
+            'specs', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -21,4 +21,26 @@ class CompatibilityLinkSerializer(serializers.ModelSerializer):
             'adapter_required', 'notes', 'created_at',
             'source_display', 'target_display'
         ]
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at']
+
+class ComponentBulkSerializer(serializers.ModelSerializer):
+    """One record of a bulk import, keyed by brand, model and type"""
+    class Meta:
+        model = Component
+        fields = [
+            'brand', 'model', 'type', 'speed', 'specs',
+            'image_url', 'product_url', 'is_active'
+        ]
+        # The upsert resolves existing rows, so no per-record uniqueness query
+        validators = []
+
+class CompatibilityLinkBulkSerializer(serializers.ModelSerializer):
+    """One record of a bulk import, keyed by source, target and type"""
+    # Plain ids, checked against the database once per batch instead of once per record
+    source = serializers.UUIDField()
+    target = serializers.UUIDField()
+    
+    class Meta:
+        model = CompatibilityLink
+        fields = ['source', 'target', 'type', 'status', 'adapter_required', 'notes']
+        validators = []
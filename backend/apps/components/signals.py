@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from .models import Component
+from .suggest import suggest_index
+
+# Sent after a bulk import (apps.components.bulk), which bypasses post_save
+# instances: the saved objects; previous: stored field values of the components that existed
+components_bulk_saved = Signal()
+# instances: the saved links
+links_bulk_saved = Signal()
+
+@receiver(post_save, sender=Component)
+def component_saved(sender, instance, **kwargs):
+    suggest_index.update_component(instance)
+
+@receiver(post_delete, sender=Component)
+def component_deleted(sender, instance, **kwargs):
+    suggest_index.remove_component(instance)
+
+
+@receiver(components_bulk_saved, sender=Component)
+def components_bulk_imported(sender, instances, **kwargs):
+    suggest_index.update_components(instances)
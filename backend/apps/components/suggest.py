@@ -0,0 +1,204 @@
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+from django.conf import settings
+from django.core.cache import cache
+from .models import Component
+
+# Shared version stamp so every worker reloads after another one changed a component
+SUGGEST_VERSION_KEY = 'component_suggest_version'
+
+# Key of the array holding every type
+ALL_TYPES = ''
+
+# Batches larger than this rebuild the index instead of updating it in place
+BATCH_REBUILD_SIZE = 500
+
+WHITESPACE = re.compile(r'\s+')
+
+class Suggestion(NamedTuple):
+    id: UUID
+    brand: str
+    model: str
+    type: str
+    speed: Optional[int]
+
+def normalize(text: str) -> str:
+    """Lowercase text with single spaces, as keys are stored and queries are matched"""
+    return WHITESPACE.sub(' ', text).strip().lower()
+
+def suggestion_keys(suggestion: Suggestion) -> List[str]:
+    """
+    "brand model" and every word-start suffix of it, so "ultegra" and "r8100" find
+    "Shimano Ultegra R8100" as well as "shimano ult" does
+    """
+    words = normalize(f"{suggestion.brand} {suggestion.model}").split(' ')
+    return list(dict.fromkeys(' '.join(words[i:]) for i in range(len(words))))
+
+class SuggestIndex:
+    """
+    In-memory typeahead index of active components over brand and model
+    Keys sit in sorted arrays, one per type plus one for all types, so a query is a binary
+    search to the first key starting with it followed by a short scan. Built on first use
+    per worker and kept up to date by model signals. Scraper writes bypass the signals, so
+    the index is also rebuilt after max_age seconds
+    """
+
+    def __init__(self, check_interval: Optional[float] = None, max_age: Optional[float] = None):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._suggestions: Optional[Dict[UUID, Suggestion]] = None
+        # type -> (sorted keys, component id of each key)
+        self._arrays: Dict[str, Tuple[List[str], List[UUID]]] = {}
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    def suggest(self, text: str, component_type: Optional[str] = None, speed: Optional[int] = None,
+                limit: int = 10) -> List[Suggestion]:
+        """Up to limit components with a brand/model key starting with text, in key order"""
+        prefix = normalize(text)
+        if not prefix or limit <= 0:
+            return []
+
+        self._ensure_fresh()
+        max_scan = getattr(settings, 'COMPONENT_SUGGEST_MAX_SCAN', 5000)
+        with self._lock:
+            keys, ids = self._arrays.get(component_type or ALL_TYPES, ((), ()))
+            results = []
+            seen = set()
+            position = bisect_left(keys, prefix)
+            end = min(len(keys), position + max_scan)
+            while position < end and keys[position].startswith(prefix):
+                suggestion = self._suggestions[ids[position]]
+                position += 1
+                if suggestion.id in seen or (speed is not None and suggestion.speed != speed):
+                    continue
+                seen.add(suggestion.id)
+                results.append(suggestion)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def rebuild(self):
+        """Reload the whole index from the database"""
+        with self._lock:
+            self._build(cache.get(SUGGEST_VERSION_KEY))
+
+    def update_component(self, component: Component):
+        """Add, replace or drop a component after it was saved"""
+        with self._lock:
+            if self._suggestions is None:
+                return
+            self._discard(component.id)
+            if component.is_active:
+                self._insert(Suggestion(component.id, component.brand, component.model,
+                                        component.type, component.speed))
+            self._publish_change()
+
+    def update_components(self, components: List[Component]):
+        """
+        update_component for a batch, announced to other workers once
+        Past BATCH_REBUILD_SIZE components one sorted rebuild beats inserting key by key
+        """
+        with self._lock:
+            if self._suggestions is None:
+                return
+            if len(components) > BATCH_REBUILD_SIZE:
+                self._publish_change()
+                self._build(cache.get(SUGGEST_VERSION_KEY))
+                return
+            for component in components:
+                self._discard(component.id)
+                if component.is_active:
+                    self._insert(Suggestion(component.id, component.brand, component.model,
+                                            component.type, component.speed))
+            self._publish_change()
+
+    def remove_component(self, component: Component):
+        """Drop a component after it was deleted"""
+        with self._lock:
+            if self._suggestions is None:
+                return
+            self._discard(component.id)
+            self._publish_change()
+
+    def _ensure_fresh(self):
+        """Build the index on first use and reload it when another worker changed it"""
+        now = time.monotonic()
+        interval = self.check_interval
+        if interval is None:
+            interval = getattr(settings, 'COMPATIBILITY_INDEX_CHECK_INTERVAL', 5.0)
+        if self._suggestions is not None and now - self._checked_at < interval:
+            return
+
+        max_age = self.max_age
+        if max_age is None:
+            max_age = getattr(settings, 'COMPONENT_SUGGEST_MAX_AGE', 300.0)
+        with self._lock:
+            shared_version = cache.get(SUGGEST_VERSION_KEY)
+            if self._suggestions is None or shared_version != self._version or now - self._loaded_at >= max_age:
+                self._build(shared_version)
+            self._checked_at = now
+
+    def _build(self, version):
+        suggestions = {}
+        entries = defaultdict(list)
+        rows = Component.objects.filter(is_active=True).values_list('id', 'brand', 'model', 'type', 'speed')
+        for row in rows.iterator(chunk_size=2000):
+            suggestion = Suggestion(*row)
+            suggestions[suggestion.id] = suggestion
+            for key in suggestion_keys(suggestion):
+                entries[suggestion.type].append((key, suggestion.id))
+                entries[ALL_TYPES].append((key, suggestion.id))
+
+        arrays = {}
+        for component_type, pairs in entries.items():
+            pairs.sort(key=lambda pair: pair[0])
+            arrays[component_type] = ([key for key, _ in pairs], [component_id for _, component_id in pairs])
+
+        self._suggestions, self._arrays = suggestions, arrays
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def _insert(self, suggestion: Suggestion):
+        self._suggestions[suggestion.id] = suggestion
+        for component_type in (ALL_TYPES, suggestion.type):
+            keys, ids = self._arrays.setdefault(component_type, ([], []))
+            for key in suggestion_keys(suggestion):
+                position = bisect_right(keys, key)
+                keys.insert(position, key)
+                ids.insert(position, suggestion.id)
+
+    def _discard(self, component_id: UUID):
+        suggestion = self._suggestions.pop(component_id, None)
+        if suggestion is None:
+            return
+        for component_type in (ALL_TYPES, suggestion.type):
+            keys, ids = self._arrays.get(component_type, ([], []))
+            for key in suggestion_keys(suggestion):
+                position = bisect_left(keys, key)
+                while position < len(keys) and keys[position] == key:
+                    if ids[position] == component_id:
+                        del keys[position]
+                        del ids[position]
+                        break
+                    position += 1
+
+    def _publish_change(self):
+        """Bump the shared version so other workers reload, without reloading this one"""
+        try:
+            new_version = cache.incr(SUGGEST_VERSION_KEY)
+        except ValueError:
+            new_version = 1
+            cache.set(SUGGEST_VERSION_KEY, new_version, None)
+
+        if self._version is None or new_version == self._version + 1:
+            self._version = new_version
+
+suggest_index = SuggestIndex()
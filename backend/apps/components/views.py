@@ -1,25 +1,137 @@
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
 from django.db.models import Q
-from .models import Component, CompatibilityLink
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from .models import Component, CompatibilityLink, COMPONENT_TYPES
+from .filters import ComponentFilter
 from .serializers import ComponentSerializer, CompatibilityLinkSerializer
+from .search import SEARCH_WORD, search_components
+from .suggest import suggest_index
+from .pagination import KeysetPagination
+from .export import csv_lines, export_records, ndjson_lines
+from .bulk import upsert_components, upsert_links, validate_components, validate_links
+from apps.compatibility.services import CompatibilityService
 
 class ComponentViewSet(viewsets.ModelViewSet):
     """ViewSet for managing bike components"""
     queryset = Component.objects.all()
     serializer_class = ComponentSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = ComponentFilter
     search_fields = ['brand', 'model']
     ordering_fields = ['brand', 'model', 'created_at', 'type']
     ordering = ['brand', 'model']
+    pagination_class = KeysetPagination
+    
+    @property
+    def paginator(self):
+        """Keyset pages for listings; ranked results have no key to resume from and keep page numbers"""
+        if not hasattr(self, '_paginator'):
+            ranked = self.action in ('search', 'compatible')
+            self._paginator = PageNumberPagination() if ranked else self.pagination_class()
+        return self._paginator
     
     @action(detail=False, methods=['get'])
     def types(self, request):
         """Get all component types"""
-        from .models import COMPONENT_TYPES
         return Response([{'value': value, 'label': label} for value, label in COMPONENT_TYPES])
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Ranked search on brand and model words, matched as prefixes; filters still apply"""
+        text = request.query_params.get('q', '')
+        if not SEARCH_WORD.search(text):
+            return Response(
+                {'error': 'A search term is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = search_components(self.filter_queryset(self.get_queryset()), text)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Typeahead: components whose brand and model start with q (or a later word of them)"""
+        component_type = request.query_params.get('type') or None
+        if component_type is not None and component_type not in dict(COMPONENT_TYPES):
+            return Response(
+                {'error': f"Unknown component type '{component_type}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            speed = request.query_params.get('speed')
+            speed = int(speed) if speed else None
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            return Response(
+                {'error': 'speed and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        suggestions = suggest_index.suggest(request.query_params.get('q', ''), component_type, speed, limit)
+        return Response([suggestion._asdict() for suggestion in suggestions])
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every component matching the filters as NDJSON (default) or CSV (?output=csv),
+        with the links leaving them when ?links=true; rows are read through a server-side cursor
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in ('ndjson', 'csv'):
+            return Response(
+                {'error': "output must be 'ndjson' or 'csv'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        include_links = request.query_params.get('links', '').lower() in ('1', 'true', 'yes')
+        
+        records = export_records(self.filter_queryset(self.get_queryset()), include_links)
+        if output == 'csv':
+            response = StreamingHttpResponse(csv_lines(records, include_links), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(ndjson_lines(records), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="components.{output}"'
+        return response
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create or update a list of components keyed by brand, model and type
+        Nothing is written unless every record is valid
+        """
+        return _bulk_import(request, validate_components, upsert_components)
+    
+    @action(detail=True, methods=['get'])
+    def compatible(self, request, pk=None):
+        """Get components of a given type that are compatible with this one, ranked by confidence"""
+        component_type = request.query_params.get('type')
+        if component_type not in dict(COMPONENT_TYPES):
+            return Response(
+                {'error': 'A valid component type is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # ?type= names the wanted type here, so the component itself is looked up unfiltered
+        component = get_object_or_404(self.get_queryset(), pk=pk)
+        self.check_object_permissions(request, component)
+        matches = CompatibilityService().find_compatible(component, component_type)
+        
+        page = self.paginate_queryset(matches)
+        results = [
+            {'component': ComponentSerializer(candidate).data, 'compatibility': result}
+            for candidate, result in (page if page is not None else matches)
+        ]
+        if page is not None:
+            return self.get_paginated_response(results)
+        return Response(results)
 
 class CompatibilityLinkViewSet(viewsets.ModelViewSet):
     """ViewSet for managing compatibility links between components"""
@@ -29,3 +141,35 @@ class CompatibilityLinkViewSet(viewsets.ModelViewSet):
     search_fields = ['source__brand', 'source__model', 'target__brand', 'target__model', 'notes']
     ordering_fields = ['created_at', 'type', 'status']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create or update a list of links keyed by source, target and type
+        Nothing is written unless every record is valid
+        """
+        return _bulk_import(request, validate_links, upsert_links)
+
+def _bulk_import(request, validate, upsert):
+    """Validate a list of records as one batch and upsert it; errors are reported by record index"""
+    records = request.data
+    max_records = getattr(settings, 'COMPONENT_BULK_MAX_RECORDS', 10000)
+    if not isinstance(records, list) or not records:
+        return Response(
+            {'error': 'A non-empty list of records is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(records) > max_records:
+        return Response(
+            {'error': f'At most {max_records} records per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    rows, errors = validate(records)
+    if errors:
+        return Response(
+            {'error': 'Invalid records', 'records': errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(upsert(rows)._asdict())
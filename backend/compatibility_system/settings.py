@@ -90,6 +90,34 @@ CACHES = {
     }
 }
 
+# How often (seconds) each worker checks whether another worker changed the compatibility index
+COMPATIBILITY_INDEX_CHECK_INTERVAL = config('COMPATIBILITY_INDEX_CHECK_INTERVAL', default=5.0, cast=float)
+
+# Compatibility results are invalidated by model signals, so they can be kept for a long time
+COMPATIBILITY_CACHE_TIMEOUT = config('COMPATIBILITY_CACHE_TIMEOUT', default=60 * 60 * 24 * 7, cast=int)
+
+# In-memory component catalog and partial-build solver
+COMPATIBILITY_CATALOG_MAX_AGE = config('COMPATIBILITY_CATALOG_MAX_AGE', default=300.0, cast=float)
+COMPATIBILITY_SOLVER_MAX_ARC_WORK = config('COMPATIBILITY_SOLVER_MAX_ARC_WORK', default=250000, cast=int)
+
+# Typeahead index behind /api/components/suggest/: rebuilt after MAX_AGE seconds to pick up
+# scraper writes, and at most MAX_SCAN prefix matches are looked at per query
+COMPONENT_SUGGEST_MAX_AGE = config('COMPONENT_SUGGEST_MAX_AGE', default=300.0, cast=float)
+COMPONENT_SUGGEST_MAX_SCAN = config('COMPONENT_SUGGEST_MAX_SCAN', default=5000, cast=int)
+
+# Most records accepted by one POST to the bulk import endpoints of components and links
+COMPONENT_BULK_MAX_RECORDS = config('COMPONENT_BULK_MAX_RECORDS', default=10000, cast=int)
+
+# Bounds of the adapter path search over compatibility links
+COMPATIBILITY_ADAPTER_MAX_HOPS = config('COMPATIBILITY_ADAPTER_MAX_HOPS', default=4, cast=int)
+COMPATIBILITY_ADAPTER_MAX_VISITED = config('COMPATIBILITY_ADAPTER_MAX_VISITED', default=10000, cast=int)
+
+# Buffered CompatibilityCheck audit logging
+COMPATIBILITY_AUDIT_ASYNC = config('COMPATIBILITY_AUDIT_ASYNC', default=True, cast=bool)
+COMPATIBILITY_AUDIT_BATCH_SIZE = config('COMPATIBILITY_AUDIT_BATCH_SIZE', default=200, cast=int)
+COMPATIBILITY_AUDIT_FLUSH_INTERVAL = config('COMPATIBILITY_AUDIT_FLUSH_INTERVAL', default=2.0, cast=float)
+COMPATIBILITY_AUDIT_MAX_QUEUE = config('COMPATIBILITY_AUDIT_MAX_QUEUE', default=10000, cast=int)
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
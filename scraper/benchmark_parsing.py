@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark of product page parsing: BeautifulSoup (html.parser) against ParsedPage (lxml)
+
+Runs the lookups the scrapers make on every saved page in fixtures/pages (or --pages DIR)
+with both parsers, checks they extract the same title, spec table, links and text, and
+reports the time per page. Usage: python benchmark_parsing.py [--pages DIR] [--rounds N]
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+from scrapers.parsing import ParsedPage
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+# Selectors the scrapers look up on a product page
+TITLE_SELECTORS = ['h1.product-title', 'h1.product-name', '.product-header h1', 'h1', '.product-name', '.title']
+BRAND_SELECTORS = ['.brand', '.manufacturer', '[data-brand]']
+SPEC_SELECTORS = ['.specifications', '.product-specs', '.tech-specs', '.details', 'table', '.spec-table']
+IMAGE_SELECTORS = ['.product-image img', '.hero-image img', '.main-image img', '.product-gallery img:first-child', 'img[alt*="product"]']
+
+def first(soup, selectors):
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if element:
+            return element
+    return None
+
+def extract_with_soup(html):
+    """What the scrapers did before: parse with html.parser, then one get_text() per extractor"""
+    soup = BeautifulSoup(html, 'html.parser')
+    title = first(soup, TITLE_SELECTORS)
+    brand = first(soup, BRAND_SELECTORS)
+    image = first(soup, IMAGE_SELECTORS)
+
+    specs = []
+    spec_element = first(soup, SPEC_SELECTORS)
+    if spec_element:
+        for row in spec_element.select('tr'):
+            cells = row.select('td, th')
+            if len(cells) >= 2:
+                specs.append((cells[0].get_text(strip=True), cells[1].get_text(strip=True)))
+        terms = spec_element.select('dt')
+        definitions = spec_element.select('dd')
+        if len(terms) == len(definitions):
+            specs.extend((dt.get_text(strip=True), dd.get_text(strip=True)) for dt, dd in zip(terms, definitions))
+
+    # Speed detection and the category spec extractor each read the whole page text
+    text = soup.get_text()
+    text_lower = soup.get_text().lower()
+
+    return {
+        'title': title.get_text(strip=True) if title else '',
+        'brand': brand.get_text(strip=True) if brand else '',
+        'image': (image.get('src') or image.get('data-src')) if image else None,
+        'specs': [(key, value) for key, value in specs if key and value],
+        'links': [link.get('href') for link in soup.find_all('a', href=True) if link.get('href')],
+        'text': text,
+        'text_lower': text_lower,
+    }
+
+def extract_with_parsed_page(html):
+    """The same lookups on a ParsedPage: one parse, one walk"""
+    page = ParsedPage(html)
+    image = page.select_one(*IMAGE_SELECTORS)
+    spec_element = page.select_one(*SPEC_SELECTORS)
+
+    return {
+        'title': page.text_of(page.select_one(*TITLE_SELECTORS)),
+        'brand': page.text_of(page.select_one(*BRAND_SELECTORS)),
+        'image': (image.get('src') or image.get('data-src')) if image is not None else None,
+        'specs': page.spec_pairs(spec_element) if spec_element is not None else [],
+        'links': page.links(),
+        'text': page.text,
+        'text_lower': page.text_lower,
+    }
+
+def time_per_page(extract, html, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        extract(html)
+    return (time.perf_counter() - start) / rounds * 1000
+
+def load_pages(directory):
+    pages = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.html'):
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                pages.append((filename, f.read()))
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark product page parsing')
+    parser.add_argument('--pages', default=FIXTURES_DIR, help='Directory of saved .html pages')
+    parser.add_argument('--rounds', type=int, default=20, help='Parses per page and parser')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print(f"❌ No .html pages found in {args.pages}")
+        return 1
+
+    print(f"{'Page':<40} {'KB':>6} {'soup ms':>9} {'lxml ms':>9} {'speedup':>8}")
+    print("-" * 76)
+
+    mismatches = 0
+    total_soup = total_lxml = 0.0
+    for filename, html in pages:
+        expected = extract_with_soup(html)
+        actual = extract_with_parsed_page(html)
+        # lxml drops the whitespace outside <html>, which no extractor depends on
+        for key in ('text', 'text_lower'):
+            expected[key] = expected[key].strip()
+            actual[key] = actual[key].strip()
+        differing = [key for key in expected if expected[key] != actual[key]]
+        if differing:
+            mismatches += 1
+            print(f"❌ {filename}: results differ in {', '.join(differing)}")
+
+        soup_ms = time_per_page(extract_with_soup, html, args.rounds)
+        lxml_ms = time_per_page(extract_with_parsed_page, html, args.rounds)
+        total_soup += soup_ms
+        total_lxml += lxml_ms
+        print(f"{filename:<40} {len(html) / 1024:>6.0f} {soup_ms:>9.2f} {lxml_ms:>9.2f} {soup_ms / lxml_ms:>7.1f}x")
+
+    print("-" * 76)
+    print(f"{'Total':<40} {'':>6} {total_soup:>9.2f} {total_lxml:>9.2f} {total_soup / total_lxml:>7.1f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} of {len(pages)} pages parsed differently")
+        return 1
+    print(f"✅ All {len(pages)} pages parsed identically")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
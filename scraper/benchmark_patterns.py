@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of spec extraction regexes on the text of the saved pages in fixtures/pages
+
+Compares running each pattern with its own re.search / re.findall call (how the extractors
+used to work) against one MultiPatternScanner pass, checks both find the same matches, and
+reports the time per page. Usage: python benchmark_patterns.py [--pages DIR] [--rounds N]
+"""
+
+import sys
+import os
+import re
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scrapers.parsing import ParsedPage
+from scrapers.patterns import PATTERNS, scanner
+from benchmark_parsing import FIXTURES_DIR, load_pages
+
+def search_each(text, names):
+    """One search per pattern; patterns are passed as strings, as the extractors did"""
+    results = {}
+    for name in names:
+        pattern = PATTERNS[name]
+        if pattern.find_all:
+            results[name] = [
+                match if isinstance(match, tuple) else (match,)
+                for match in re.findall(pattern.pattern, text)
+            ]
+        else:
+            match = re.search(pattern.pattern, text)
+            results[name] = [match.groups()] if match else []
+    return results
+
+def scan_once(text, names):
+    """One pass of the combined scanner"""
+    result = scanner(*names).scan(text)
+    return {name: result.all(name) for name in names}
+
+def time_per_page(extract, text, names, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        extract(text, names)
+    return (time.perf_counter() - start) / rounds * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark spec extraction regexes')
+    parser.add_argument('--pages', default=FIXTURES_DIR, help='Directory of saved .html pages')
+    parser.add_argument('--rounds', type=int, default=200, help='Extractions per page and method')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print(f"❌ No .html pages found in {args.pages}")
+        return 1
+
+    names = tuple(PATTERNS)
+    print(f"{'Page':<40} {'KB':>6} {'re ms':>8} {'scan ms':>8} {'speedup':>8}")
+    print("-" * 74)
+
+    mismatches = 0
+    total_search = total_scan = 0.0
+    for filename, html in pages:
+        text = ParsedPage(html).text_lower
+        expected = search_each(text, names)
+        actual = scan_once(text, names)
+        differing = [name for name in names if expected[name] != actual[name]]
+        if differing:
+            mismatches += 1
+            print(f"❌ {filename}: matches differ for {', '.join(differing)}")
+
+        search_ms = time_per_page(search_each, text, names, args.rounds)
+        scan_ms = time_per_page(scan_once, text, names, args.rounds)
+        total_search += search_ms
+        total_scan += scan_ms
+        print(f"{filename:<40} {len(text) / 1024:>6.0f} {search_ms:>8.3f} {scan_ms:>8.3f} {search_ms / scan_ms:>7.1f}x")
+
+    print("-" * 74)
+    print(f"{'Total':<40} {'':>6} {total_search:>8.3f} {total_scan:>8.3f} {total_search / total_scan:>7.1f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} of {len(pages)} pages matched differently")
+        return 1
+    print(f"✅ All {len(pages)} pages matched identically")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the fetch and parse pipeline on archived pages
+
+Replays every page in the page archive (recorded with main.py --record or
+scrape_production.py --record) through fetch_and_parse with each number of parse workers,
+so runs are repeatable and not bound by the network or the rate limits.
+Usage: python benchmark_replay.py [--archive-dir DIR] [--category CATEGORY] [--workers 1 2 4]
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scrapers.bike_components_de_scraper import BikeComponentsDEScraper
+from utils.page_archive import PageArchive
+from config import ARCHIVE_DIR
+
+def run(urls, archive_dir, category, parse_workers):
+    """Replay the pages once; returns (seconds, components extracted)"""
+    # Without a database the scraper only fetches and parses
+    scraper = BikeComponentsDEScraper(
+        None, parse_workers=parse_workers, archive_mode='replay', archive_dir=archive_dir
+    )
+    try:
+        start = time.perf_counter()
+        extracted = sum(
+            1 for url, fetched, component_data in scraper.fetch_and_parse(urls, 'parse_product', category)
+            if component_data
+        )
+        return time.perf_counter() - start, extracted
+    finally:
+        scraper.close_parse_pool()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsing of archived pages')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='Directory of the page archive')
+    parser.add_argument('--category', default='crankset', help='Category the product pages are parsed as')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Parse worker counts to compare')
+    args = parser.parse_args()
+
+    urls = [entry['url'] for entry in PageArchive(args.archive_dir).entries()]
+    if not urls:
+        print(f"❌ No archived pages found in {args.archive_dir}")
+        return 1
+
+    print(f"Replaying {len(urls)} archived pages as {args.category}")
+    print(f"{'Workers':>8} {'Seconds':>9} {'Pages/s':>9} {'Extracted':>10}")
+    print("-" * 40)
+    for parse_workers in args.workers:
+        seconds, extracted = run(urls, args.archive_dir, args.category, parse_workers)
+        print(f"{parse_workers:>8} {seconds:>9.2f} {len(urls) / seconds:>9.1f} {extracted:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,20 +8,49 @@ from decouple import config
 # Database configuration
 DATABASE_URL = config('DATABASE_URL', default='postgresql://postgres:postgres@db:5432/compatibility_system')
 
+# Connections are shared through a pool; an idle one is pinged before reuse after DB_POOL_PING_SECONDS
+DB_POOL_MIN_CONNECTIONS = config('DB_POOL_MIN_CONNECTIONS', default=1, cast=int)
+DB_POOL_MAX_CONNECTIONS = config('DB_POOL_MAX_CONNECTIONS', default=10, cast=int)
+DB_POOL_PING_SECONDS = config('DB_POOL_PING_SECONDS', default=30, cast=float)
+# Rows fetched per round trip by server-side cursors (DatabaseConnection.stream_query)
+DB_STREAM_BATCH_SIZE = config('DB_STREAM_BATCH_SIZE', default=2000, cast=int)
+
 # Scraper configuration
 BASE_URL = "https://www.bike-components.de"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
-# Rate limiting
-MIN_DELAY = 1.0  # Minimum delay between requests (seconds)
-MAX_DELAY = 3.0  # Maximum delay between requests (seconds)
-PAGE_DELAY = 2.0  # Additional delay between pages (seconds)
+# Rate limiting (token buckets, see utils/rate_limiter.py)
+REQUESTS_PER_SECOND = config('REQUESTS_PER_SECOND', default=4.0, cast=float)  # Across all hosts
+HOST_REQUESTS_PER_SECOND = config('HOST_REQUESTS_PER_SECOND', default=1.0, cast=float)  # Per host
+FETCH_WORKERS = config('FETCH_WORKERS', default=4, cast=int)  # Concurrent page fetches
+
+# Fetched pages are parsed in this many worker processes (1 parses in the fetching process),
+# fed through a queue holding at most PARSE_QUEUE_SIZE pages
+PARSE_WORKERS = config('PARSE_WORKERS', default=os.cpu_count() or 1, cast=int)
+PARSE_QUEUE_SIZE = config('PARSE_QUEUE_SIZE', default=64, cast=int)
 
 # Scraping limits (for testing and being respectful)
 MAX_PAGES_PER_CATEGORY = 10  # Increased for production scraping
 MAX_PRODUCTS_PER_PAGE = 60   # Increased for production scraping
 MAX_RETRIES = 3
 
+# Crawl frontier: how often known URLs are revisited, and how long a run's claim on a URL lasts
+PRODUCT_REVISIT_HOURS = config('PRODUCT_REVISIT_HOURS', default=72, cast=float)
+LISTING_REVISIT_HOURS = config('LISTING_REVISIT_HOURS', default=24, cast=float)
+FRONTIER_LEASE_MINUTES = config('FRONTIER_LEASE_MINUTES', default=60, cast=float)
+MAX_FAILURE_BACKOFF_HOURS = config('MAX_FAILURE_BACKOFF_HOURS', default=168, cast=float)
+
+# Validators (ETag / Last-Modified) of fetched pages, for conditional re-scrapes
+HTTP_CACHE_DIR = config('HTTP_CACHE_DIR', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'http'))
+
+# Archive of fetched pages: 'record' stores every page a live run fetches, 'replay' serves
+# pages from the archive instead of the network ('off' does neither)
+ARCHIVE_DIR = config('ARCHIVE_DIR', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive'))
+ARCHIVE_MODE = config('ARCHIVE_MODE', default='off')
+
+# Scraped components are upserted in batches of this size, one transaction each
+DB_BATCH_SIZE = config('DB_BATCH_SIZE', default=200, cast=int)
+
 # Component categories mapping
 COMPONENT_CATEGORIES = {
     'cranksets': {
@@ -0,0 +1,144 @@
+"""
+Buffered bulk upsert of scraped components
+"""
+
+import hashlib
+import json
+from utils.logger import setup_logger
+from config import DB_BATCH_SIZE
+
+# Columns written on insert, in VALUES order
+INSERT_COLUMNS = ['brand', 'model', 'type', 'speed', 'specs', 'image_url', 'product_url', 'content_hash']
+
+# Identity of a component; hashed together with the columns a scraper updates
+KEY_COLUMNS = ['brand', 'model', 'type']
+
+def component_key(component_data):
+    """(brand, model, type) of a component, the key flush() reports failures by"""
+    return tuple(component_data[column] for column in KEY_COLUMNS)
+
+class ComponentSink:
+    """
+    Gathers scraped components and writes them in batches with a single
+    INSERT ... ON CONFLICT (brand, model, type) DO UPDATE per batch, one transaction each.
+    update_columns lists what an existing component gets overwritten with. Each row carries
+    a hash of those values, and existing rows whose hash is unchanged are not rewritten.
+    """
+
+    def __init__(self, db_connection, update_columns=('speed', 'specs'), batch_size=DB_BATCH_SIZE):
+        self.db = db_connection
+        self.update_columns = list(update_columns)
+        self.batch_size = batch_size
+        self.logger = setup_logger('component_sink')
+        self.pending = {}
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        # Keys that failed in a flush triggered by add(), reported by the next flush() call
+        self.unreported_failures = []
+
+    def add(self, component_data):
+        """Queue a component for writing; returns False if it is missing a required field"""
+        for field in ['brand', 'model', 'type']:
+            if not component_data.get(field):
+                self.logger.warning(f"Missing required field '{field}' in component data")
+                return False
+
+        # A batch can't upsert the same row twice, so the latest scrape of a product wins
+        self.pending[component_key(component_data)] = component_data
+
+        if len(self.pending) >= self.batch_size:
+            self.unreported_failures.extend(self.flush())
+        return True
+
+    def flush(self):
+        """
+        Write everything queued; returns the keys of the components that could not be written,
+        including those of flushes add() triggered since the last call
+        """
+        failed, self.unreported_failures = self.unreported_failures, []
+        if not self.pending:
+            return failed
+
+        rows = [self._row(component_data) for component_data in self.pending.values()]
+        self.pending = {}
+
+        try:
+            written = self._upsert(rows)
+        except Exception as e:
+            self.logger.error(f"Batch upsert of {len(rows)} components failed, retrying one by one: {str(e)}")
+            written = 0
+            for row in rows:
+                try:
+                    written += self._upsert([row])
+                except Exception as e:
+                    self.failed += 1
+                    failed.append(component_key(row))
+                    self.logger.error(f"Error saving component {row['brand']} {row['model']}: {str(e)}")
+
+        self.logger.info(
+            f"Saved {written} components ({self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged so far)"
+        )
+        return failed
+
+    def stats(self):
+        """Counters for the end-of-run summary"""
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'pending': len(self.pending),
+        }
+
+    def _row(self, component_data):
+        specs = component_data.get('specs', {})
+        if isinstance(specs, str):
+            specs = json.loads(specs)
+        row = {
+            'brand': component_data['brand'],
+            'model': component_data['model'],
+            'type': component_data['type'],
+            'speed': component_data.get('speed'),
+            'specs': specs,
+            'image_url': component_data.get('image_url'),
+            'product_url': component_data.get('product_url'),
+        }
+        row['content_hash'] = self._content_hash(row)
+        row['specs'] = json.dumps(specs)
+        return row
+
+    def _content_hash(self, row):
+        """SHA-256 of the normalized values this sink writes to an existing row"""
+        payload = {column: row[column] for column in KEY_COLUMNS + self.update_columns}
+        normalized = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def _upsert(self, rows):
+        updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in self.update_columns)
+        query = f"""
+            INSERT INTO components_component
+            (id, {', '.join(INSERT_COLUMNS)}, is_active, created_at, updated_at)
+            VALUES %s
+            ON CONFLICT (brand, model, type) DO UPDATE
+            SET {updates}, content_hash = EXCLUDED.content_hash, updated_at = CURRENT_TIMESTAMP
+            WHERE components_component.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING (xmax = 0) AS inserted
+        """
+        template = """
+            (gen_random_uuid(), %(brand)s, %(model)s, %(type)s, %(speed)s, %(specs)s::jsonb,
+             %(image_url)s, %(product_url)s, %(content_hash)s, TRUE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """
+
+        # A pooled connection of its own, committed with the batch or rolled back if it fails
+        with self.db.transaction() as transaction:
+            results = transaction.execute_values(query, rows, template=template, page_size=len(rows))
+
+        # Rows skipped by the WHERE clause are not returned
+        inserted = sum(1 for result in results if result['inserted'])
+        self.inserted += inserted
+        self.updated += len(results) - inserted
+        self.unchanged += len(rows) - len(results)
+        return len(results)
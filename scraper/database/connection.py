@@ -1,75 +1,284 @@
-import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+import psycopg2.pool
 from psycopg2.extras import RealDictCursor
-from decouple import config
+from config import (
+    DATABASE_URL, DB_POOL_MIN_CONNECTIONS, DB_POOL_MAX_CONNECTIONS, DB_POOL_PING_SECONDS,
+    DB_STREAM_BATCH_SIZE,
+)
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections to one database
+    Connections are checked before they are handed out: closed ones are replaced, and
+    ones idle for longer than ping_seconds must answer a SELECT 1 first.
+    """
+
+    def __init__(self, dsn=DATABASE_URL, minconn=DB_POOL_MIN_CONNECTIONS,
+                 maxconn=DB_POOL_MAX_CONNECTIONS, ping_seconds=DB_POOL_PING_SECONDS):
+        self.pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, dsn)
+        self.maxconn = maxconn
+        self.ping_seconds = ping_seconds
+        self.last_used = {}
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        """Check out a healthy connection; raises psycopg2.pool.PoolError when all are in use"""
+        # Each broken connection found is discarded, so this ends within maxconn + 1 tries
+        for _ in range(self.maxconn + 1):
+            conn = self.pool.getconn()
+            if self._healthy(conn):
+                conn.autocommit = False
+                with self._lock:
+                    self.in_use += 1
+                return conn
+            self.pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("No healthy database connection available")
+
+    def putconn(self, conn, close=False):
+        """Return a connection; an open transaction on it is rolled back"""
+        close = close or bool(conn.closed)
+        with self._lock:
+            self.in_use -= 1
+            if close:
+                self.last_used.pop(id(conn), None)
+            else:
+                self.last_used[id(conn)] = time.monotonic()
+        self.pool.putconn(conn, close=close)
+
+    def ping(self, conn):
+        """Round trip to the server; returns the latency in milliseconds"""
+        idle = conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        finally:
+            cursor.close()
+        # Leave an idle connection idle, not inside the transaction the SELECT opened
+        if idle:
+            conn.rollback()
+        return (time.perf_counter() - start) * 1000
+
+    def stats(self):
+        """Connections handed out and the pool's limit"""
+        with self._lock:
+            return {'in_use': self.in_use, 'max': self.maxconn}
+
+    def closeall(self):
+        self.pool.closeall()
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        # Connections the pool has just opened have not been returned yet
+        last_used = self.last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.ping_seconds:
+            return True
+        try:
+            self.ping(conn)
+            return True
+        except psycopg2.Error:
+            return False
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(dsn=DATABASE_URL):
+    """The process-wide pool for a database, created on first use"""
+    with _pools_lock:
+        if dsn not in _pools:
+            _pools[dsn] = ConnectionPool(dsn)
+        return _pools[dsn]
+
+class Transaction:
+    """Queries on one pooled connection, committed or rolled back together"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute_query(self, query, params=None, fetch=True):
+        """Execute a query and return results"""
+        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            cursor.execute(query, params or {})
+            return cursor.fetchall() if fetch else None
+        finally:
+            cursor.close()
+
+    def execute_values(self, query, rows, template=None, page_size=100, fetch=True):
+        """Execute a multi-row statement (VALUES %s) for a list of rows"""
+        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            return psycopg2.extras.execute_values(
+                cursor, query, rows, template=template, page_size=page_size, fetch=fetch
+            )
+        finally:
+            cursor.close()
+
+    def stream_query(self, query, params=None, batch_size=DB_STREAM_BATCH_SIZE):
+        """
+        Yield the rows of a large result from a server-side cursor, batch_size rows per
+        round trip, so the whole result is never held in memory at once
+        The cursor lives in this transaction: don't commit until iteration is finished
+        """
+        cursor = self.conn.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=RealDictCursor)
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(query, params or {})
+            yield from cursor
+        finally:
+            cursor.close()
 
 class DatabaseConnection:
-    """Database connection manager for the scraper"""
-    
-    def __init__(self):
+    """
+    Database connection manager for the scraper
+    Connections come from the process-wide pool. Each thread using this object gets its
+    own connection for execute_query / execute_values / commit / rollback, kept until
+    close(), so a thread's statements and commits stay on one session as before.
+    transaction() checks out a separate connection for a unit of work, for code running
+    in worker threads.
+    """
+
+    def __init__(self, dsn=DATABASE_URL):
         """Initialize database connection"""
-        self.conn = None
+        self.pool = None
+        self.dsn = dsn
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
         self.connect()
-    
+
     def connect(self):
-        """Connect to PostgreSQL database"""
+        """Connect to PostgreSQL database, checking out this thread's connection"""
         try:
-            # Get connection parameters from environment or config
-            db_url = config('DATABASE_URL', default='postgresql://postgres:postgres@db:5432/compatibility_system')
-            
-            # Connect to database
-            self.conn = psycopg2.connect(db_url)
-            self.conn.autocommit = False
-            
-            # Test connection
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT 1')
-            cursor.close()
-            
+            if self.pool is None:
+                self.pool = get_pool(self.dsn)
+            self._session()
             print("Database connection established successfully")
-            
+
         except Exception as e:
             print(f"Error connecting to database: {str(e)}")
             raise
-    
+
+    @property
+    def conn(self):
+        """This thread's connection, checked out from the pool on first use"""
+        return self._session().conn
+
     def execute_query(self, query, params=None, fetch=True):
         """Execute a query and return results"""
-        if not self.conn:
-            self.connect()
-        
+        session = self._session()
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute(query, params or {})
-            
-            if fetch:
-                results = cursor.fetchall()
-                cursor.close()
-                return results
-            else:
-                cursor.close()
-                return None
-                
+            return session.execute_query(query, params, fetch)
         except Exception as e:
-            self.conn.rollback()
+            session.conn.rollback()
             print(f"Error executing query: {str(e)}")
             raise
-    
+
+    def execute_values(self, query, rows, template=None, page_size=100, fetch=True):
+        """Execute a multi-row statement (VALUES %s) for a list of rows"""
+        session = self._session()
+        try:
+            return session.execute_values(query, rows, template, page_size, fetch)
+        except Exception as e:
+            session.conn.rollback()
+            print(f"Error executing batch query: {str(e)}")
+            raise
+
+    def stream_query(self, query, params=None, batch_size=DB_STREAM_BATCH_SIZE):
+        """
+        Yield the rows of a large read from a server-side cursor on a connection of its own,
+        so commits made on this thread's connection while iterating don't close the cursor
+        """
+        with self.transaction() as transaction:
+            yield from transaction.stream_query(query, params, batch_size)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a unit of work on a pooled connection of its own:
+        committed when the block ends, rolled back if it raises
+        """
+        if self.pool is None:
+            self.connect()
+        conn = self.pool.getconn()
+        try:
+            yield Transaction(conn)
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def health_check(self):
+        """Round-trip latency and pool usage, for health_check.py and monitoring"""
+        session = self._session()
+        return {
+            'latency_ms': self.pool.ping(session.conn),
+            'server_version': session.conn.server_version,
+            **self.pool.stats(),
+        }
+
     def commit(self):
         """Commit current transaction"""
-        if self.conn:
-            self.conn.commit()
-    
+        session = getattr(self._local, 'session', None)
+        if session:
+            session.conn.commit()
+
     def rollback(self):
         """Rollback current transaction"""
-        if self.conn:
-            self.conn.rollback()
-    
+        session = getattr(self._local, 'session', None)
+        if session:
+            session.conn.rollback()
+
+    def release(self):
+        """Return this thread's connection to the pool, e.g. when a worker thread is done"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            return
+        self._local.session = None
+        with self._sessions_lock:
+            self._sessions.remove(session)
+        self.pool.putconn(session.conn)
+
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-    
+        """Return the connections of every thread to the pool"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            try:
+                self.pool.putconn(session.conn)
+            except Exception as e:
+                print(f"Error returning database connection: {str(e)}")
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None or session.conn.closed:
+            if session is not None:
+                # The server dropped it; discard it and start a fresh session
+                with self._sessions_lock:
+                    self._sessions.remove(session)
+                self.pool.putconn(session.conn, close=True)
+            session = Transaction(self.pool.getconn())
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
     def __del__(self):
-        """Ensure connection is closed when object is destroyed"""
-        self.close()
\ No newline at end of file
+        """Ensure connections are returned when object is destroyed"""
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,167 @@
+"""
+Persistent crawl frontier: every known URL with its fetch state and next due time
+"""
+
+from datetime import timedelta
+from utils.logger import setup_logger
+from config import (
+    PRODUCT_REVISIT_HOURS, LISTING_REVISIT_HOURS, FRONTIER_LEASE_MINUTES, MAX_FAILURE_BACKOFF_HOURS
+)
+
+# 2 ** 16 hours is far past any MAX_FAILURE_BACKOFF_HOURS
+FAILURE_BACKOFF_MAX_EXPONENT = 16
+
+CREATE_TABLE = """
+    CREATE {temporary} TABLE IF NOT EXISTS crawl_frontier (
+        url TEXT PRIMARY KEY,
+        kind VARCHAR(20) NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        discovered_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        claimed_at TIMESTAMPTZ,
+        last_fetched TIMESTAMPTZ,
+        next_due TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        failure_count INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS crawl_frontier_due_idx ON crawl_frontier (category, kind, next_due);
+"""
+
+class CrawlFrontier:
+    """
+    URLs to crawl with their status (pending, in_progress, done, failed), last fetch,
+    next due time and failure count. Runs claim the URLs that are due, so an interrupted
+    run resumes where it stopped and a scheduled run only fetches what needs a revisit.
+    Claims expire after FRONTIER_LEASE_MINUTES in case a run died without releasing them.
+    With temporary=True the frontier is a temporary table of this connection that hides
+    the persistent one, so every URL is due and the real schedule is left alone (replays).
+    """
+
+    def __init__(self, db_connection, temporary=False):
+        self.db = db_connection
+        self.logger = setup_logger('crawl_frontier')
+        self.marks = {}
+        self.db.execute_query(CREATE_TABLE.format(temporary='TEMPORARY' if temporary else ''), fetch=False)
+        self.db.commit()
+
+    def add(self, urls, kind, category):
+        """Register URLs; ones already known keep their state"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+
+        self.db.execute_values("""
+            INSERT INTO crawl_frontier (url, kind, category)
+            VALUES %s
+            ON CONFLICT (url) DO NOTHING
+        """, [(url, kind, category) for url in urls], page_size=len(urls), fetch=False)
+        self.db.commit()
+        return len(urls)
+
+    def claim_due(self, kind, category, limit):
+        """Claim up to limit URLs that are due, oldest first"""
+        results = self.db.execute_query("""
+            UPDATE crawl_frontier
+            SET status = 'in_progress', claimed_at = CURRENT_TIMESTAMP
+            WHERE url IN (
+                SELECT url FROM crawl_frontier
+                WHERE kind = %(kind)s AND category = %(category)s
+                  AND next_due <= CURRENT_TIMESTAMP
+                  AND (status <> 'in_progress' OR claimed_at < CURRENT_TIMESTAMP - %(lease)s)
+                ORDER BY next_due
+                LIMIT %(limit)s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING url, next_due
+        """, {
+            'kind': kind,
+            'category': category,
+            'lease': timedelta(minutes=FRONTIER_LEASE_MINUTES),
+            'limit': limit,
+        })
+        self.db.commit()
+        return [result['url'] for result in sorted(results, key=lambda result: result['next_due'])]
+
+    def mark_done(self, url, kind='product'):
+        """Record a successful (or not modified) fetch and schedule the revisit"""
+        hours = PRODUCT_REVISIT_HOURS if kind == 'product' else LISTING_REVISIT_HOURS
+        self.marks[url] = ('done', timedelta(hours=hours), None)
+
+    def mark_failed(self, url, error):
+        """Record a failed fetch; the retry is pushed back exponentially with the failure count"""
+        self.marks[url] = ('failed', None, str(error)[:1000])
+
+    def release(self, urls):
+        """Hand claimed URLs that were not processed back to the next run"""
+        for url in urls:
+            self.marks.setdefault(url, ('pending', None, None))
+
+    def flush(self):
+        """
+        Write the buffered marks in one statement
+        If it fails the marks are retried one by one; those that still fail stay buffered
+        for the next flush
+        """
+        if not self.marks:
+            return 0
+
+        rows = [
+            (url, status, delay, error)
+            for url, (status, delay, error) in self.marks.items()
+        ]
+        self.marks = {}
+
+        try:
+            self._update(rows)
+            return len(rows)
+        except Exception as e:
+            self.logger.error(f"Error updating crawl frontier for {len(rows)} URLs, retrying one by one: {str(e)}")
+
+        written = 0
+        for row in rows:
+            try:
+                self._update([row])
+                written += 1
+            except Exception as e:
+                self.logger.error(f"Error updating crawl frontier for {row[0]}: {str(e)}")
+                # Marks made since then are newer and win
+                self.marks.setdefault(row[0], row[1:])
+        return written
+
+    def _update(self, rows):
+        try:
+            self.db.execute_values(f"""
+                UPDATE crawl_frontier AS f
+                SET status = v.status,
+                    claimed_at = NULL,
+                    last_fetched = CASE WHEN v.status = 'pending' THEN f.last_fetched ELSE CURRENT_TIMESTAMP END,
+                    failure_count = CASE
+                        WHEN v.status = 'failed' THEN f.failure_count + 1
+                        WHEN v.status = 'done' THEN 0
+                        ELSE f.failure_count END,
+                    last_error = CASE WHEN v.status = 'pending' THEN f.last_error ELSE v.error END,
+                    next_due = CASE
+                        WHEN v.status = 'done' THEN CURRENT_TIMESTAMP + v.delay
+                        -- The exponent is clamped so the interval can't overflow before LEAST applies
+                        WHEN v.status = 'failed' THEN CURRENT_TIMESTAMP + LEAST(
+                            interval '1 hour' * power(2, LEAST(f.failure_count, {FAILURE_BACKOFF_MAX_EXPONENT})),
+                            interval '{int(MAX_FAILURE_BACKOFF_HOURS)} hours')
+                        ELSE f.next_due END
+                FROM (VALUES %s) AS v(url, status, delay, error)
+                WHERE f.url = v.url
+            """, rows, template='(%s, %s, %s::interval, %s)', page_size=len(rows), fetch=False)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def stats(self, category=None):
+        """URL counts per kind and status, plus how many are due now"""
+        return self.db.execute_query("""
+            SELECT kind, status, COUNT(*) AS count,
+                   COUNT(*) FILTER (WHERE next_due <= CURRENT_TIMESTAMP) AS due
+            FROM crawl_frontier
+            WHERE %(category)s IS NULL OR category = %(category)s
+            GROUP BY kind, status
+            ORDER BY kind, status
+        """, {'category': category})
@@ -33,9 +33,10 @@ def check_database():
     try:
         from database.connection import DatabaseConnection
         db = DatabaseConnection()
-        db.execute_query("SELECT 1")
+        health = db.health_check()
         db.close()
-        print("✅ Database check successful")
+        print(f"✅ Database check successful: {health['latency_ms']:.1f} ms round trip, "
+              f"server {health['server_version']}, {health['in_use']}/{health['max']} pooled connections in use")
         return True
     except Exception as e:
         print(f"❌ Database check failed: {e}")
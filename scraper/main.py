@@ -14,13 +14,17 @@ from datetime import datetime
 from scrapers.bike_components_de_scraper import BikeComponentsDEScraper
 from database.connection import DatabaseConnection
 from utils.logger import setup_logger
+from config import ARCHIVE_DIR, ARCHIVE_MODE
 
-def main(test_mode=False):
+def main(test_mode=False, conditional=True, archive_mode=ARCHIVE_MODE, archive_dir=ARCHIVE_DIR):
     """
     Main scraping function
     
     Args:
         test_mode: If True, limits scraping for testing purposes
+        conditional: If True, product pages unchanged since the last run are skipped
+        archive_mode: 'record' archives every fetched page, 'replay' reads pages from the archive
+        archive_dir: Directory of the page archive
     """
     logger = setup_logger('scraper_main')
     logger.info("Starting bike-components.de scraping session")
@@ -30,7 +34,9 @@ def main(test_mode=False):
         db = DatabaseConnection()
         
         # Initialize scraper
-        scraper = BikeComponentsDEScraper(db)
+        scraper = BikeComponentsDEScraper(
+            db, conditional=conditional, archive_mode=archive_mode, archive_dir=archive_dir
+        )
         
         # Run scraper
         logger.info("Running BikeComponentsDEScraper")
@@ -91,13 +97,26 @@ if __name__ == "__main__":
     parser.add_argument('--run-once', action='store_true', help='Run scraper once and exit')
     parser.add_argument('--interactive', action='store_true', help='Run in interactive mode')
     parser.add_argument('--test', action='store_true', help='Run in test mode (limited scraping)')
+    parser.add_argument('--full-refresh', action='store_true', help='Re-download every page, even unchanged ones')
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', action='store_const', const='record', dest='archive_mode',
+                         help='Keep every fetched page in the page archive')
+    archive.add_argument('--replay', action='store_const', const='replay', dest='archive_mode',
+                         help='Serve pages from the page archive instead of the network')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='Directory of the page archive')
+    parser.set_defaults(archive_mode=ARCHIVE_MODE)
     
     args = parser.parse_args()
     
     if args.interactive:
         run_interactive()
     elif args.run_once:
-        main(test_mode=args.test)
+        main(
+            test_mode=args.test,
+            conditional=not args.full_refresh,
+            archive_mode=args.archive_mode,
+            archive_dir=args.archive_dir,
+        )
     else:
         # Run on schedule
         run_scheduled()
\ No newline at end of file
@@ -24,9 +24,9 @@ class ProductionScheduler:
         """Run daily update scraping (lighter load)"""
         self.logger.info("=== DAILY UPDATE SCRAPING ===")
         try:
-            # Run bike-components.de scraper (limited pages for updates)
+            # Run bike-components.de scraper; unchanged product pages answer 304 and are skipped
             self.logger.info("Running daily bike-components update")
-            run_bike_components_scraper(test_mode=False)
+            run_bike_components_scraper(test_mode=False, conditional=True)
             
             self.last_update_scrape = datetime.now()
             self.logger.info("Daily update completed successfully")
@@ -40,7 +40,7 @@ class ProductionScheduler:
         try:
             # Run bike-components.de full scraper
             self.logger.info("Running weekly full bike-components scrape")
-            run_bike_components_scraper(test_mode=False)
+            run_bike_components_scraper(test_mode=False, conditional=False)
             
             # Wait between different scrapers
             time.sleep(300)  # 5 minutes pause
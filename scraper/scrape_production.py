@@ -7,22 +7,25 @@ import sys
 import os
 import time
 import json
+import argparse
 from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scrapers.bike_components_de_scraper import BikeComponentsDEScraper
 from database.connection import DatabaseConnection
 from utils.logger import setup_logger
-from config import COMPONENT_CATEGORIES
+from config import ARCHIVE_DIR, ARCHIVE_MODE, COMPONENT_CATEGORIES
 
 class ProductionScraper:
     """Production scraper for collecting large amounts of component data"""
     
-    def __init__(self, target_count=200):
+    def __init__(self, target_count=200, conditional=False, archive_mode=ARCHIVE_MODE, archive_dir=ARCHIVE_DIR):
         self.target_count = target_count
         self.logger = setup_logger('production_scraper')
         self.db = DatabaseConnection()
-        self.scraper = BikeComponentsDEScraper(self.db)
+        self.scraper = BikeComponentsDEScraper(
+            self.db, conditional=conditional, archive_mode=archive_mode, archive_dir=archive_dir
+        )
         self.scraped_count = 0
         self.failed_count = 0
         self.start_time = time.time()
@@ -59,11 +62,9 @@ class ProductionScraper:
             
             try:
                 category_scraped = self.scrape_category(category, products_per_category)
+                self.scraper.flush_components()
                 self.logger.info(f"Category {category['name']} completed: {category_scraped} components scraped")
                 
-                # Add delay between categories
-                time.sleep(3)
-                
             except Exception as e:
                 self.logger.error(f"Error scraping category {category['name']}: {e}")
                 continue
@@ -88,45 +89,21 @@ class ProductionScraper:
         category_scraped = 0
         
         try:
-            # Get category page
-            html_content = self.scraper.get_page(category['url'])
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Extract product links
-            product_links = self.scraper.extract_product_links(soup)
-            self.logger.info(f"Found {len(product_links)} product links in {category['name']}")
-            
-            if not product_links:
-                self.logger.warning(f"No product links found for {category['name']}")
-                return 0
+            # Pick up products from due listing pages, then fetch the products due for a revisit
+            discovered = self.scraper.discover_products(category)
+            self.logger.info(f"Found {discovered} product links in {category['name']}")
             
-            # Scrape products
-            products_to_scrape = min(len(product_links), max_products)
-            self.logger.info(f"Scraping {products_to_scrape} products from {category['name']}")
-            
-            for i, product_link in enumerate(product_links[:products_to_scrape]):
-                if self.scraped_count >= self.target_count:
-                    self.logger.info(f"Target reached, stopping category scraping")
-                    break
-                
+            # Products left unread when the target is reached stay due for the next run
+            products = self.scraper.crawl_due_products(category, max_products)
+            for i, (product_url, component_data) in enumerate(products):
                 try:
-                    # Construct full URL
-                    if product_link.startswith('/'):
-                        product_url = f"https://www.bike-components.de{product_link}"
-                    else:
-                        product_url = product_link
-                    
-                    self.logger.info(f"  [{i+1}/{products_to_scrape}] Scraping: {product_url}")
-                    
-                    # Scrape product data
-                    component_data = self.scraper.scrape_product(product_url, category['category'])
+                    self.logger.info(f"  [{i+1}/{max_products}] Scraped: {product_url}")
                     
                     if component_data:
-                        # Save to database
-                        component_id = self.scraper.save_component(component_data)
+                        # Queue for the next batch write
+                        queued = self.scraper.save_component(component_data)
                         
-                        if component_id:
+                        if queued:
                             category_scraped += 1
                             self.scraped_count += 1
                             
@@ -147,13 +124,15 @@ class ProductionScraper:
                         self.failed_count += 1
                         self.logger.warning(f"    ❌ Failed to extract component data")
                     
-                    # Add delay between products (be respectful)
-                    time.sleep(2)
-                    
                 except Exception as e:
                     self.failed_count += 1
                     self.logger.error(f"    ❌ Error scraping product {i+1}: {str(e)}")
-                    continue
+                
+                # Stop only after the product in hand is queued; it is marked done once written
+                if self.scraped_count >= self.target_count:
+                    self.logger.info(f"Target reached, stopping category scraping")
+                    break
+            products.close()
             
             return category_scraped
             
@@ -164,13 +143,13 @@ class ProductionScraper:
     def get_scraping_stats(self):
         """Get detailed scraping statistics"""
         try:
-            # Components by type
-            type_stats = self.db.execute_query("""
+            # Components by type, read through a server-side cursor
+            type_stats = list(self.db.stream_query("""
                 SELECT type, COUNT(*) as count 
                 FROM components_component 
                 GROUP BY type 
                 ORDER BY count DESC
-            """)
+            """))
             
             # Components by brand
             brand_stats = self.db.execute_query("""
@@ -222,20 +201,47 @@ class ProductionScraper:
         for item in stats['recent']:
             print(f"  {item['brand']} {item['model']} ({item['type']})")
         
+        fetch_stats = self.scraper.fetch_stats
+        print(f"\nPage Fetches:")
+        print(f"  Fetched: {fetch_stats['fetched']}, Not modified: {fetch_stats['not_modified']}, Failed: {fetch_stats['failed']}")
+        
+        print(f"\nCrawl Frontier:")
+        for stat in self.scraper.frontier.stats():
+            print(f"  {stat['kind']} {stat['status']}: {stat['count']} ({stat['due']} due)")
+        
+        sink_stats = self.scraper.sink.stats()
+        print(f"\nDatabase Writes:")
+        print(f"  Inserted: {sink_stats['inserted']}, Updated: {sink_stats['updated']}, "
+              f"Skipped (unchanged): {sink_stats['unchanged']}, Failed: {sink_stats['failed']}")
+        
         print(f"{'='*60}")
     
     def close(self):
-        """Close database connection"""
+        """Write queued components, stop the parse workers and close database connection"""
+        self.scraper.close_parse_pool()
         if self.db:
+            self.scraper.flush_components()
             self.db.close()
 
 def main():
     """Main production scraping function"""
+    parser = argparse.ArgumentParser(description='Production scraper for bike-components.de')
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', action='store_const', const='record', dest='archive_mode',
+                         help='Keep every fetched page in the page archive')
+    archive.add_argument('--replay', action='store_const', const='replay', dest='archive_mode',
+                         help='Re-run extraction on the archived pages instead of crawling')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='Directory of the page archive')
+    parser.set_defaults(archive_mode=ARCHIVE_MODE)
+    args = parser.parse_args()
+    
     print("🚀 Starting Production Scraping for 200+ Components")
+    if args.archive_mode == 'replay':
+        print(f"📼 Replaying pages from {args.archive_dir}")
     print("=" * 60)
     
     # Create scraper instance
-    scraper = ProductionScraper(target_count=200)
+    scraper = ProductionScraper(target_count=200, archive_mode=args.archive_mode, archive_dir=args.archive_dir)
     
     try:
         # Start scraping
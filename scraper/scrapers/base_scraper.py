@@ -2,21 +2,70 @@
 Base scraper class for bike component data collection
 """
 
+import multiprocessing
+import queue
+import threading
 import time
-import random
-import json
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
 import requests
+from requests.adapters import HTTPAdapter
 from fake_useragent import UserAgent
 from utils.logger import setup_logger
-from config import MIN_DELAY, MAX_DELAY, MAX_RETRIES
+from utils.rate_limiter import rate_limiter
+from utils.http_cache import HttpCache, PageNotModified
+from utils.page_archive import ARCHIVE_MODES, PageArchive, PageNotArchived
+from database.component_sink import ComponentSink, component_key
+from .patterns import PRICE_PATTERNS
+from config import ARCHIVE_DIR, ARCHIVE_MODE, FETCH_WORKERS, MAX_RETRIES, PARSE_QUEUE_SIZE, PARSE_WORKERS
+
+# Marks the end of the fetched pages in the parse queue
+_FETCH_DONE = object()
+
+# Scraper instance of a parse worker process, see fetch_and_parse
+_worker_parser = None
+
+def _init_parse_worker(scraper_class):
+    global _worker_parser
+    _worker_parser = scraper_class(None, parse_workers=1)
+
+def _parse_in_worker(parse, html_content, url, args):
+    return getattr(_worker_parser, parse)(html_content, url, *args)
 
 class BaseScraper(ABC):
     """Base class for all scrapers"""
     
-    def __init__(self, db_connection):
-        """Initialize base scraper with database connection"""
+    # Columns overwritten when a scraped component already exists
+    UPDATE_COLUMNS = ('speed', 'specs')
+    
+    def __init__(self, db_connection, conditional=False, parse_workers=PARSE_WORKERS,
+                 archive_mode=ARCHIVE_MODE, archive_dir=ARCHIVE_DIR):
+        """
+        Initialize base scraper with database connection (None for an instance that only parses)
+        With conditional=True, product pages unchanged since the last run are skipped.
+        archive_mode 'record' keeps every fetched page in the archive at archive_dir,
+        'replay' serves pages from there instead of the network
+        """
+        if archive_mode not in ARCHIVE_MODES:
+            raise ValueError(f"Unknown archive mode {archive_mode!r}, expected one of {', '.join(ARCHIVE_MODES)}")
+        
         self.db = db_connection
+        # A replayed page is always served in full
+        self.conditional = conditional and archive_mode != 'replay'
+        self.archive_mode = archive_mode
+        self.archive = PageArchive(archive_dir)
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+        self.http_cache = HttpCache()
+        # Validators of fetched pages, stored only once the page's data is saved (see page_saved)
+        self.unsaved_validators = {}
+        self._validators_lock = threading.Lock()
+        # Page URL -> key of the component queued from it, until flush_components
+        self.page_keys = {}
+        self.fetch_stats = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+        self.sink = ComponentSink(db_connection, update_columns=self.UPDATE_COLUMNS)
         self.logger = setup_logger(self.__class__.__name__)
         self.user_agent = UserAgent()
         self.session = requests.Session()
@@ -29,28 +78,59 @@ class BaseScraper(ABC):
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
+        
+        # One pooled connection per fetch worker
+        adapter = HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     @abstractmethod
     def scrape(self):
         """Main scraping method to be implemented by subclasses"""
         pass
     
-    def get_page(self, url, params=None, retry_count=MAX_RETRIES):
-        """Get page content with retry logic and rate limiting"""
+    def get_page(self, url, params=None, retry_count=MAX_RETRIES, if_modified=False):
+        """
+        Get page content with retry logic and rate limiting
+        With if_modified=True the request is conditional and PageNotModified is raised on a 304.
+        In replay mode the page comes from the archive, without requests or rate limiting
+        """
+        cache_url = self._cache_url(url, params)
+        
+        if self.archive_mode == 'replay':
+            try:
+                html_content = self.archive.replay(cache_url)
+            except PageNotArchived:
+                self._count('failed')
+                raise
+            self._count('fetched')
+            return html_content
+        
         for attempt in range(retry_count):
             try:
-                # Randomize user agent for each request
-                self.session.headers.update({'User-Agent': self.user_agent.random})
+                # Wait for the global and per-host request budgets
+                rate_limiter.acquire(url)
                 
                 self.logger.debug(f"Fetching: {url} (attempt {attempt + 1})")
                 
-                response = self.session.get(url, params=params, timeout=30)
-                response.raise_for_status()
+                # Randomize user agent for each request; per-request headers are safe across threads
+                headers = {'User-Agent': self.user_agent.random}
+                if if_modified:
+                    headers.update(self.http_cache.conditional_headers(cache_url))
                 
-                # Add random delay to avoid rate limiting
-                delay = random.uniform(MIN_DELAY, MAX_DELAY)
-                time.sleep(delay)
+                response = self.session.get(url, params=params, timeout=30, headers=headers)
+                if response.status_code == 304:
+                    self._count('not_modified')
+                    raise PageNotModified(url)
+                response.raise_for_status()
                 
+                validators = self.http_cache.validators(response)
+                if validators:
+                    with self._validators_lock:
+                        self.unsaved_validators[cache_url] = validators
+                if self.archive_mode == 'record':
+                    self.archive.record(cache_url, response)
+                self._count('fetched')
                 return response.text
                 
             except requests.exceptions.RequestException as e:
@@ -62,93 +142,202 @@ class BaseScraper(ABC):
                     time.sleep(sleep_time)
                 else:
                     self.logger.error(f"Failed to fetch {url} after {retry_count} attempts")
+                    self._count('failed')
                     raise
     
-    def save_component(self, component_data):
-        """Save component data to database as a node in the compatibility graph"""
+    def fetch_many(self, urls, max_workers=FETCH_WORKERS, if_modified=None):
+        """
+        Fetch pages concurrently within the rate limits
+        Yields (url, html) as pages complete; html is None when a page could not be fetched.
+        Pages that were not modified since the last run are not yielded at all
+        """
+        if if_modified is None:
+            if_modified = self.conditional
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
         try:
-            # Validate required fields for node-based model
-            required_fields = ['brand', 'model', 'type']
-            for field in required_fields:
-                if not component_data.get(field):
-                    self.logger.warning(f"Missing required field '{field}' in component data")
-                    return False
-            
-            # Prepare specs as JSON string if it's not already
-            specs = component_data.get('specs', {})
-            if isinstance(specs, dict):
-                import json
-                specs_json = json.dumps(specs)
-            else:
-                specs_json = specs
-            
-            # Check if component node already exists
-            check_query = """
-                SELECT id FROM components_component 
-                WHERE brand = %(brand)s AND model = %(model)s AND type = %(type)s
-            """
-            
-            existing = self.db.execute_query(check_query, {
-                'brand': component_data['brand'],
-                'model': component_data['model'],
-                'type': component_data['type']
-            })
-            
-            if existing:
-                # Update existing component node
-                component_id = existing[0]['id']
-                self.logger.info(f"Updating existing component node: {component_data['brand']} {component_data['model']}")
-                
-                update_query = """
-                    UPDATE components_component
-                    SET speed = %(speed)s,
-                        specs = %(specs)s::jsonb,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %(id)s
-                    RETURNING id
-                """
-                
-                update_data = {
-                    'id': component_id,
-                    'speed': component_data.get('speed'),
-                    'specs': specs_json
-                }
-                
-                result = self.db.execute_query(update_query, update_data)
-                component_id = result[0]['id'] if result else component_id
+            futures = {
+                executor.submit(self.get_page, url, if_modified=if_modified): url
+                for url in dict.fromkeys(urls)
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    html_content = future.result()
+                except PageNotModified:
+                    self.logger.debug(f"Not modified since last run: {url}")
+                    continue
+                except Exception as e:
+                    self.logger.error(f"Error fetching {url}: {str(e)}")
+                    html_content = None
+                yield url, html_content
+        finally:
+            # Don't start fetches nobody will read when the caller stops early
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def fetch_and_parse(self, urls, parse, *args, max_workers=FETCH_WORKERS, if_modified=None):
+        """
+        Fetch pages in threads and parse them in worker processes, so downloads and parsing overlap
+        parse names a method called as parse(html, url, *args) on a scraper instance in each worker.
+        Fetched pages wait in a bounded queue, so fetching pauses when parsing falls behind.
+        Yields (url, fetched, result) as pages are parsed; fetched is False when the page could not
+        be downloaded. Pages not modified since the last run are skipped, as in fetch_many
+        """
+        if self.parse_workers <= 1:
+            for url, html_content in self.fetch_many(urls, max_workers, if_modified):
+                if html_content is None:
+                    yield url, False, None
+                else:
+                    yield url, True, getattr(self, parse)(html_content, url, *args)
+            return
+        
+        pages = queue.Queue(maxsize=PARSE_QUEUE_SIZE)
+        stop = threading.Event()
+        feeder = threading.Thread(
+            target=self._feed_pages, args=(urls, max_workers, if_modified, pages, stop), daemon=True
+        )
+        feeder.start()
+        
+        pool = self._parse_pool()
+        in_flight = {}
+        fetching = True
+        try:
+            while fetching or in_flight:
+                # Keep every worker busy with one page queued behind it
+                while fetching and len(in_flight) < self.parse_workers * 2:
+                    try:
+                        item = pages.get(block=not in_flight)
+                    except queue.Empty:
+                        break
+                    if item is _FETCH_DONE:
+                        fetching = False
+                        break
+                    
+                    url, html_content = item
+                    if html_content is None:
+                        yield url, False, None
+                        continue
+                    try:
+                        in_flight[pool.submit(_parse_in_worker, parse, html_content, url, args)] = url
+                    except BrokenProcessPool:
+                        # A worker died; parse here and start a fresh pool for the next call
+                        self.logger.error("Parse worker pool broke, parsing in this process")
+                        self.parse_pool = None
+                        yield url, True, getattr(self, parse)(html_content, url, *args)
                 
+                if not in_flight:
+                    continue
+                done, _ = wait(in_flight, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error parsing {url}: {str(e)}")
+                        result = None
+                    yield url, True, result
+        finally:
+            # Stop fetching when the caller stops early; parses already running are discarded
+            stop.set()
+            for future in in_flight:
+                future.cancel()
+            feeder.join()
+    
+    def _feed_pages(self, urls, max_workers, if_modified, pages, stop):
+        """Fetch thread of fetch_and_parse: puts (url, html) on the queue, then _FETCH_DONE"""
+        try:
+            for item in self.fetch_many(urls, max_workers, if_modified):
+                if not self._put_page(pages, item, stop):
+                    break
+        finally:
+            self._put_page(pages, _FETCH_DONE, stop)
+    
+    def _put_page(self, pages, item, stop):
+        """Wait for room in the queue unless the consumer has stopped; returns False if it has"""
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _parse_pool(self):
+        if self.parse_pool is None:
+            # Spawned, not forked: the fetch threads are already running
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_parse_worker,
+                initargs=(type(self),),
+            )
+        return self.parse_pool
+    
+    def close_parse_pool(self):
+        """Stop the parse worker processes; the next fetch_and_parse starts new ones"""
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown(wait=True, cancel_futures=True)
+            self.parse_pool = None
+    
+    def log_summary(self):
+        """Log fetch and database write counters for this run"""
+        sink_stats = self.sink.stats()
+        self.logger.info(
+            f"Pages fetched: {self.fetch_stats['fetched']}, not modified: {self.fetch_stats['not_modified']}, "
+            f"failed: {self.fetch_stats['failed']} - components inserted: {sink_stats['inserted']}, "
+            f"updated: {sink_stats['updated']}, unchanged: {sink_stats['unchanged']}, failed: {sink_stats['failed']}"
+        )
+    
+    def page_saved(self, url):
+        """Store the validators of a page once its data is committed, so the next fetch can get a 304"""
+        cache_url = self._cache_url(url)
+        with self._validators_lock:
+            validators = self.unsaved_validators.pop(cache_url, None)
+        if validators:
+            self.http_cache.store(cache_url, validators)
+    
+    def forget_page(self, url):
+        """Make the next conditional fetch of a page download it again, e.g. after it failed to parse"""
+        cache_url = self._cache_url(url)
+        with self._validators_lock:
+            self.unsaved_validators.pop(cache_url, None)
+        self.http_cache.forget(cache_url)
+    
+    def _cache_url(self, url, params=None):
+        return requests.Request('GET', url, params=params).prepare().url
+    
+    def _count(self, counter):
+        with self._stats_lock:
+            self.fetch_stats[counter] += 1
+    
+    def save_component(self, component_data, page_url=None):
+        """
+        Queue component data for the next batch write to the compatibility graph
+        page_url (by default the data's source_url or product_url) is the page it was parsed
+        from, whose validators are stored once the component is written
+        """
+        queued = self.sink.add(component_data)
+        page_url = page_url or component_data.get('source_url') or component_data.get('product_url')
+        if queued and page_url:
+            self.page_keys[page_url] = component_key(component_data)
+        return queued
+    
+    def flush_components(self):
+        """
+        Write every queued component to the database
+        Returns the URLs of the pages whose component could not be written; those pages are
+        fetched in full next time, the others can get a 304
+        """
+        failed_keys = set(self.sink.flush())
+        page_keys, self.page_keys = self.page_keys, {}
+        failed_urls = []
+        for page_url, key in page_keys.items():
+            if key in failed_keys:
+                failed_urls.append(page_url)
+                self.forget_page(page_url)
             else:
-                # Insert new component node
-                self.logger.info(f"Inserting new component node: {component_data['brand']} {component_data['model']}")
-                
-                insert_query = """
-                    INSERT INTO components_component
-                    (id, brand, model, type, speed, specs, created_at, updated_at)
-                    VALUES
-                    (gen_random_uuid(), %(brand)s, %(model)s, %(type)s, %(speed)s, %(specs)s::jsonb, 
-                     CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                    RETURNING id
-                """
-                
-                insert_data = {
-                    'brand': component_data['brand'],
-                    'model': component_data['model'],
-                    'type': component_data['type'],
-                    'speed': component_data.get('speed'),
-                    'specs': specs_json
-                }
-                
-                result = self.db.execute_query(insert_query, insert_data)
-                component_id = result[0]['id'] if result else None
-            
-            self.db.commit()
-            self.logger.info(f"Successfully saved component node with ID: {component_id}")
-            return component_id
-            
-        except Exception as e:
-            self.db.rollback()
-            self.logger.error(f"Error saving component node {component_data.get('model', 'Unknown')}: {str(e)}")
-            return False
+                self.page_saved(page_url)
+        return failed_urls
     
     def clean_text(self, text):
         """Clean and normalize text"""
@@ -164,16 +353,8 @@ class BaseScraper(ABC):
         if not price_text:
             return ""
         
-        import re
-        # Look for price patterns like €123.45, 123,45 €, etc.
-        price_patterns = [
-            r'€\s*(\d+(?:[.,]\d{2})?)',
-            r'(\d+(?:[.,]\d{2})?)\s*€',
-            r'(\d+(?:[.,]\d{2})?)\s*EUR'
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, price_text)
+        for pattern in PRICE_PATTERNS:
+            match = pattern.search(price_text)
             if match:
                 price = match.group(1).replace(',', '.')
                 return f"€{price}"
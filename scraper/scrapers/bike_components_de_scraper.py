@@ -3,20 +3,34 @@ Bike Components DE Scraper
 Specialized scraper for https://www.bike-components.de
 """
 
-import re
 import json
-import time
-import random
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .parsing import ParsedPage
+from .patterns import NON_WORD, PRICE_NUMBER, SPEED_PATTERNS, WHITESPACE, brand_prefix, scanner
+from database.crawl_frontier import CrawlFrontier
+from config import DB_BATCH_SIZE, MAX_PRODUCTS_PER_PAGE
+
+# Registered patterns each category's spec extractor reads from the page text
+CATEGORY_PATTERNS = {
+    'crankset': ('chainring_sizes', 'crank_length'),
+    'cassette': ('speeds', 'cog_range'),
+    'derailleur': ('speeds', 'max_cog_size'),
+    'brakes': ('rotor_sizes',),
+}
 
 class BikeComponentsDEScraper(BaseScraper):
     """Scraper for bike-components.de"""
     
-    def __init__(self, db_connection):
-        super().__init__(db_connection)
+    def __init__(self, db_connection, **kwargs):
+        super().__init__(db_connection, **kwargs)
         self.base_url = "https://www.bike-components.de"
+        # Parse worker instances have no database and no frontier
+        self.frontier = None
+        # Products parsed since the last checkpoint, marked done once their component is written
+        self.parsed_products = []
+        if db_connection is not None:
+            self.frontier = CrawlFrontier(db_connection, temporary=self.archive_mode == 'replay')
         self.session.headers.update({
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -33,15 +47,17 @@ class BikeComponentsDEScraper(BaseScraper):
             for category in categories:
                 self.logger.info(f"Scraping category: {category['name']}")
                 self.scrape_category(category)
-                
-                # Add delay between categories to be respectful
-                time.sleep(random.uniform(2.0, 5.0))
             
             self.logger.info("bike-components.de scraping completed successfully")
             
         except Exception as e:
             self.logger.error(f"Error in bike-components.de scraper: {str(e)}")
             raise
+        finally:
+            # Write whatever is still queued, even after a failure
+            self.flush_components()
+            self.close_parse_pool()
+            self.log_summary()
     
     def get_component_categories(self):
         """Define component categories to scrape from bike-components.de"""
@@ -59,50 +75,129 @@ class BikeComponentsDEScraper(BaseScraper):
         return categories
     
     def scrape_category(self, category):
-        """Scrape all products from a category"""
+        """Scrape the products of a category that are due for a (re)visit"""
         try:
-            page = 1
-            max_pages = category.get('max_pages', 3)
+            self.discover_products(category)
             
-            while page <= max_pages:
-                self.logger.info(f"Scraping {category['name']} - Page {page}")
-                
-                # Construct page URL
-                page_url = f"{category['url']}?page={page}"
-                
-                # Get page content
-                html_content = self.get_page(page_url)
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # Find product links on the page
-                product_links = self.extract_product_links(soup)
+            limit = category.get('max_pages', 3) * MAX_PRODUCTS_PER_PAGE
+            for product_url, component_data in self.crawl_due_products(category, limit):
+                if component_data:
+                    self.save_component(component_data)
                 
-                if not product_links:
-                    self.logger.info(f"No more products found on page {page}")
-                    break
+        except Exception as e:
+            self.logger.error(f"Error scraping category {category['name']}: {str(e)}")
+    
+    def discover_products(self, category):
+        """Fetch the category's due listing pages and add the products on them to the frontier"""
+        listing_urls = [
+            f"{category['url']}?page={page}"
+            for page in range(1, category.get('max_pages', 3) + 1)
+        ]
+        self.frontier.add(listing_urls, 'listing', category['category'])
+        
+        due = self.frontier.claim_due('listing', category['category'], len(listing_urls))
+        self.logger.info(f"{len(due)} of {len(listing_urls)} {category['name']} listing pages due")
+        
+        discovered = 0
+        pages = self._fetch_claimed(due, 'listing', 'parse_listing')
+        try:
+            for page_url, fetched, product_links in pages:
+                if not fetched:
+                    self.frontier.mark_failed(page_url, 'Fetch failed')
+                    continue
                 
-                # Scrape each product
-                for product_link in product_links[:10]:  # Limit to 10 products per page for testing
-                    try:
-                        product_url = urljoin(self.base_url, product_link)
-                        component_data = self.scrape_product(product_url, category['category'])
-                        
-                        if component_data:
-                            self.save_component(component_data)
-                            
-                        # Add delay between products
-                        time.sleep(random.uniform(1.0, 3.0))
-                        
-                    except Exception as e:
-                        self.logger.error(f"Error scraping product {product_link}: {str(e)}")
-                        continue
+                discovered += self.frontier.add(
+                    [urljoin(self.base_url, product_link) for product_link in product_links],
+                    'product', category['category']
+                )
+                self.frontier.mark_done(page_url, 'listing')
+                # The links are committed, so a 304 next time loses nothing
+                self.page_saved(page_url)
+        finally:
+            pages.close()
+            self.frontier.flush()
+        
+        self.logger.info(f"Found {discovered} product links on {category['name']} listing pages")
+        return discovered
+    
+    def crawl_due_products(self, category, limit):
+        """
+        Fetch and parse up to limit products of a category whose revisit interval has passed
+        Yields (url, component_data), with component_data None when the product failed.
+        The caller queues the component with save_component; the product is marked done only
+        once that write is committed. Products the caller doesn't get to are handed back to
+        the frontier for the next run
+        """
+        due = self.frontier.claim_due('product', category['category'], limit)
+        self.logger.info(f"{len(due)} {category['name']} products due")
+        
+        # Pages are parsed in worker processes while the next ones download
+        products = self._fetch_claimed(due, 'product', 'parse_product', category['category'])
+        try:
+            for product_url, fetched, component_data in products:
+                if component_data:
+                    self.parsed_products.append(product_url)
+                elif not fetched:
+                    self.frontier.mark_failed(product_url, 'Fetch failed')
+                else:
+                    self.frontier.mark_failed(product_url, 'No component data extracted')
+                    # Fetch it in full next time instead of getting a 304
+                    self.forget_page(product_url)
                 
-                page += 1
+                yield product_url, component_data
                 
-        except Exception as e:
-            self.logger.error(f"Error scraping category {category['name']}: {str(e)}")
+                if len(self.frontier.marks) + len(self.parsed_products) >= DB_BATCH_SIZE:
+                    self._checkpoint()
+        finally:
+            # Close the fetch first so the products never reached are released in this checkpoint
+            products.close()
+            self._checkpoint()
+    
+    def _fetch_claimed(self, urls, kind, parse, *args):
+        """
+        fetch_and_parse over claimed frontier URLs
+        Pages not modified since the last run are marked done; when the caller stops early
+        the URLs it never received are released
+        """
+        unread = set(urls)
+        finished = False
+        pages = self.fetch_and_parse(urls, parse, *args)
+        try:
+            for url, fetched, result in pages:
+                unread.discard(url)
+                yield url, fetched, result
+            finished = True
+        finally:
+            pages.close()
+            if finished:
+                for url in unread:
+                    self.frontier.mark_done(url, kind)
+            else:
+                self.frontier.release(unread)
     
-    def extract_product_links(self, soup):
+    def _checkpoint(self):
+        """
+        Save queued components, then record their products in the frontier: done when the
+        component was committed, failed (and fetched in full next time) when it was not
+        """
+        queued = set(self.page_keys)
+        failed = set(self.flush_components())
+        for product_url in self.parsed_products:
+            if product_url in failed:
+                self.frontier.mark_failed(product_url, 'Database write failed')
+            elif product_url not in queued:
+                self.frontier.mark_failed(product_url, 'Component not saved')
+                self.forget_page(product_url)
+            else:
+                self.frontier.mark_done(product_url)
+        self.parsed_products = []
+        self.frontier.flush()
+    
+    def parse_listing(self, html_content, page_url):
+        """Parse a fetched category listing page into its product links"""
+        return self.extract_product_links(ParsedPage(html_content))
+    
+    def extract_product_links(self, page):
         """Extract product links from category page"""
         product_links = []
         
@@ -110,28 +205,23 @@ class BikeComponentsDEScraper(BaseScraper):
         # and product links have format like /en/BRAND/PRODUCT-NAME-p12345/
         
         # Primary selector: .item elements containing product links
-        item_elements = soup.select('.item')
+        item_elements = page.select('.item')
         self.logger.info(f"Found {len(item_elements)} .item elements")
         
         for item in item_elements:
             # Look for links within each item
-            links = item.find_all('a', href=True)
-            for link in links:
-                href = link.get('href')
-                if href:
-                    # Check if it's a product link (contains -p followed by numbers)
-                    if '/en/' in href and '-p' in href and href.endswith('/'):
-                        product_links.append(href)
+            for href in page.links(item):
+                # Check if it's a product link (contains -p followed by numbers)
+                if '/en/' in href and '-p' in href and href.endswith('/'):
+                    product_links.append(href)
         
         # Fallback: look for direct product links with the pattern
         if not product_links:
             self.logger.info("No links found in .item elements, trying direct selectors")
             
             # Look for links that match the product URL pattern
-            all_links = soup.find_all('a', href=True)
-            for link in all_links:
-                href = link.get('href')
-                if href and '/en/' in href and '-p' in href and any(brand.lower() in href.lower() for brand in ['shimano', 'sram', 'campagnolo', 'fsa', 'race-face']):
+            for href in page.links():
+                if '/en/' in href and '-p' in href and any(brand.lower() in href.lower() for brand in ['shimano', 'sram', 'campagnolo', 'fsa', 'race-face']):
                     product_links.append(href)
         
         # Remove duplicates while preserving order
@@ -158,16 +248,26 @@ class BikeComponentsDEScraper(BaseScraper):
             self.logger.info(f"Scraping product: {product_url}")
             
             html_content = self.get_page(product_url)
-            soup = BeautifulSoup(html_content, 'html.parser')
+            return self.parse_product(html_content, product_url, category)
+            
+        except Exception as e:
+            self.logger.error(f"Error scraping product {product_url}: {str(e)}")
+            return None
+    
+    def parse_product(self, html_content, product_url, category):
+        """Parse a fetched product page into node data"""
+        try:
+            # Parse once; every extractor below reads the same page
+            page = ParsedPage(html_content)
             
             # Extract basic product information for node
-            node_data = self.extract_basic_info(soup, category)
+            node_data = self.extract_basic_info(page, category)
             
             if not node_data:
                 return None
             
             # Extract specifications for node specs field
-            specifications = self.extract_specifications(soup, category)
+            specifications = self.extract_specifications(page, category)
             node_data['specs'] = json.dumps(specifications)
             
             # Add source URL for reference
@@ -179,7 +279,7 @@ class BikeComponentsDEScraper(BaseScraper):
             self.logger.error(f"Error scraping product {product_url}: {str(e)}")
             return None
     
-    def extract_basic_info(self, soup, category):
+    def extract_basic_info(self, page, category):
         """Extract basic product information for node-based model"""
         try:
             # Extract product name - try multiple selectors
@@ -190,25 +290,20 @@ class BikeComponentsDEScraper(BaseScraper):
                 '.title'
             ]
             
-            name = None
-            for selector in name_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    name = element.get_text(strip=True)
-                    break
+            name = page.text_of(page.select_one(*name_selectors))
             
             if not name:
                 self.logger.warning("Could not extract product name")
                 return None
             
             # Extract brand from name or separate element
-            brand = self.extract_brand(name, soup)
+            brand = self.extract_brand(name, page)
             
             # Clean up the model name
             model = self.clean_model_name(name, brand)
             
             # Extract speed information for node model
-            speed = self.extract_speed_from_text(name + " " + soup.get_text())
+            speed = self.extract_speed(name, page, category)
             
             return {
                 'brand': brand,
@@ -222,7 +317,7 @@ class BikeComponentsDEScraper(BaseScraper):
             self.logger.error(f"Error extracting basic info: {str(e)}")
             return None
     
-    def extract_brand(self, product_name, soup):
+    def extract_brand(self, product_name, page):
         """Extract brand from product name or page"""
         # Common bike component brands
         brands = [
@@ -246,9 +341,9 @@ class BikeComponentsDEScraper(BaseScraper):
         ]
         
         for selector in brand_selectors:
-            element = soup.select_one(selector)
-            if element:
-                brand_text = element.get_text(strip=True)
+            element = page.select_one(selector)
+            if element is not None:
+                brand_text = page.text_of(element)
                 for brand in brands:
                     if brand.lower() in brand_text.lower():
                         return brand
@@ -260,11 +355,11 @@ class BikeComponentsDEScraper(BaseScraper):
         """Clean model name by removing brand"""
         if brand and brand.lower() in full_name.lower():
             # Remove brand from the beginning of the name
-            model = re.sub(rf'^{re.escape(brand)}\s*', '', full_name, flags=re.IGNORECASE)
+            model = brand_prefix(brand).sub('', full_name)
             return model.strip()
         return full_name
     
-    def extract_specifications(self, soup, category):
+    def extract_specifications(self, page, category):
         """Extract specifications for node-based model specs field"""
         specs = {}
         
@@ -279,100 +374,81 @@ class BikeComponentsDEScraper(BaseScraper):
         ]
         
         for selector in spec_selectors:
-            spec_element = soup.select_one(selector)
-            if spec_element:
-                specs.update(self.parse_spec_table(spec_element))
+            spec_element = page.select_one(selector)
+            if spec_element is not None:
+                specs.update(self.parse_spec_table(page, spec_element))
                 break
         
         # Category-specific specification extraction for node model
         if category == 'crankset':
-            specs.update(self.extract_crankset_specs(soup))
+            specs.update(self.extract_crankset_specs(page))
         elif category == 'cassette':
-            specs.update(self.extract_cassette_specs(soup))
+            specs.update(self.extract_cassette_specs(page))
         elif category == 'derailleur':
-            specs.update(self.extract_derailleur_specs(soup))
+            specs.update(self.extract_derailleur_specs(page))
         elif category == 'brakes':
-            specs.update(self.extract_brakes_specs(soup))
+            specs.update(self.extract_brakes_specs(page))
         elif category == 'frame':
-            specs.update(self.extract_frame_specs(soup))
+            specs.update(self.extract_frame_specs(page))
         
         return specs
     
+    def spec_matches(self, page, category):
+        """Matches of the speed patterns and the category's spec patterns, from one scan of the page text"""
+        return page.scan(scanner(*SPEED_PATTERNS, *CATEGORY_PATTERNS.get(category, ())))
+    
+    def extract_speed(self, name, page, category):
+        """Extract speed information from the product name, then the page text"""
+        name_matches = scanner(*SPEED_PATTERNS).scan(name.lower())
+        return self.speed_from_matches(name_matches, self.spec_matches(page, category))
+    
     def extract_speed_from_text(self, text):
         """Extract speed information from text for node model"""
-        import re
-        
-        # Look for speed patterns like "11-speed", "12 speed", "11s", etc.
-        speed_patterns = [
-            r'(\d+)[-\s]*speed',
-            r'(\d+)s\b',
-            r'(\d+)[-\s]*fach',  # German
-            r'(\d+)[-\s]*gang'   # German
-        ]
-        
-        text_lower = text.lower()
-        for pattern in speed_patterns:
-            match = re.search(pattern, text_lower)
+        return self.speed_from_matches(scanner(*SPEED_PATTERNS).scan(text.lower()))
+    
+    def speed_from_matches(self, *scans):
+        """First speed pattern found, in pattern order; scans are searched in order for each pattern"""
+        for name in SPEED_PATTERNS:
+            match = next((scan.first(name) for scan in scans if scan.first(name)), None)
             if match:
-                speed = int(match.group(1))
+                speed = int(match[0])
                 # Validate reasonable speed range for bike components
                 if 1 <= speed <= 15:
                     return speed
         
         return None
     
-    def parse_spec_table(self, spec_element):
-        """Parse specification table or list"""
-        specs = {}
-        
-        # Try to parse as table
-        rows = spec_element.select('tr')
-        if rows:
-            for row in rows:
-                cells = row.select('td, th')
-                if len(cells) >= 2:
-                    key = cells[0].get_text(strip=True)
-                    value = cells[1].get_text(strip=True)
-                    if key and value:
-                        specs[self.normalize_spec_key(key)] = value
-        
-        # Try to parse as definition list
-        dt_elements = spec_element.select('dt')
-        dd_elements = spec_element.select('dd')
-        if len(dt_elements) == len(dd_elements):
-            for dt, dd in zip(dt_elements, dd_elements):
-                key = dt.get_text(strip=True)
-                value = dd.get_text(strip=True)
-                if key and value:
-                    specs[self.normalize_spec_key(key)] = value
-        
-        return specs
+    def parse_spec_table(self, page, spec_element):
+        """Parse specification table rows and definition lists"""
+        return {
+            self.normalize_spec_key(key): value
+            for key, value in page.spec_pairs(spec_element)
+        }
     
     def normalize_spec_key(self, key):
         """Normalize specification key"""
         # Convert to lowercase and replace spaces with underscores
-        normalized = re.sub(r'[^\w\s]', '', key.lower())
-        normalized = re.sub(r'\s+', '_', normalized)
+        normalized = NON_WORD.sub('', key.lower())
+        normalized = WHITESPACE.sub('_', normalized)
         return normalized
     
-    def extract_crankset_specs(self, soup):
+    def extract_crankset_specs(self, page):
         """Extract crankset-specific specifications"""
         specs = {}
         
         # Look for common crankset specifications in the text
-        text_content = soup.get_text().lower()
+        text_content = page.text_lower
+        matches = self.spec_matches(page, 'crankset')
         
         # Extract chainring sizes
-        chainring_pattern = r'(\d+)t?\s*[/x]\s*(\d+)t?'
-        chainring_match = re.search(chainring_pattern, text_content)
+        chainring_match = matches.first('chainring_sizes')
         if chainring_match:
-            specs['chainring_sizes'] = [int(chainring_match.group(1)), int(chainring_match.group(2))]
+            specs['chainring_sizes'] = [int(chainring_match[0]), int(chainring_match[1])]
         
         # Extract crank length
-        length_pattern = r'(\d+(?:\.\d+)?)\s*mm.*crank'
-        length_match = re.search(length_pattern, text_content)
+        length_match = matches.first('crank_length')
         if length_match:
-            specs['crank_length'] = float(length_match.group(1))
+            specs['crank_length'] = float(length_match[0])
         
         # Extract spindle type
         if 'hollowtech' in text_content:
@@ -384,25 +460,24 @@ class BikeComponentsDEScraper(BaseScraper):
         
         return specs
     
-    def extract_cassette_specs(self, soup):
+    def extract_cassette_specs(self, page):
         """Extract cassette-specific specifications for node model"""
         specs = {}
         
-        text_content = soup.get_text().lower()
+        text_content = page.text_lower
+        matches = self.spec_matches(page, 'cassette')
         
         # Extract speed count
-        speed_pattern = r'(\d+)\s*speed'
-        speed_match = re.search(speed_pattern, text_content)
+        speed_match = matches.first('speeds')
         if speed_match:
-            specs['speeds'] = int(speed_match.group(1))
+            specs['speeds'] = int(speed_match[0])
         
         # Extract cassette range
-        range_pattern = r'(\d+)\s*-\s*(\d+)t?'
-        range_match = re.search(range_pattern, text_content)
+        range_match = matches.first('cog_range')
         if range_match:
-            specs['range'] = f"{range_match.group(1)}-{range_match.group(2)}T"
-            specs['min_cog'] = int(range_match.group(1))
-            specs['max_cog'] = int(range_match.group(2))
+            specs['range'] = f"{range_match[0]}-{range_match[1]}T"
+            specs['min_cog'] = int(range_match[0])
+            specs['max_cog'] = int(range_match[1])
         
         # Extract driver body type (critical for compatibility edges)
         if 'xd' in text_content:
@@ -422,23 +497,22 @@ class BikeComponentsDEScraper(BaseScraper):
         
         return specs
     
-    def extract_derailleur_specs(self, soup):
+    def extract_derailleur_specs(self, page):
         """Extract derailleur-specific specifications"""
         specs = {}
         
-        text_content = soup.get_text().lower()
+        text_content = page.text_lower
+        matches = self.spec_matches(page, 'derailleur')
         
         # Extract speed count
-        speed_pattern = r'(\d+)\s*speed'
-        speed_match = re.search(speed_pattern, text_content)
+        speed_match = matches.first('speeds')
         if speed_match:
-            specs['speeds'] = int(speed_match.group(1))
+            specs['speeds'] = int(speed_match[0])
         
         # Extract max cog size
-        cog_pattern = r'max.*?(\d+)t'
-        cog_match = re.search(cog_pattern, text_content)
+        cog_match = matches.first('max_cog_size')
         if cog_match:
-            specs['max_cog_size'] = int(cog_match.group(1))
+            specs['max_cog_size'] = int(cog_match[0])
         
         # Determine type
         if 'rear' in text_content:
@@ -448,11 +522,11 @@ class BikeComponentsDEScraper(BaseScraper):
         
         return specs
     
-    def extract_brakes_specs(self, soup):
+    def extract_brakes_specs(self, page):
         """Extract brakes-specific specifications"""
         specs = {}
         
-        text_content = soup.get_text().lower()
+        text_content = page.text_lower
         
         # Extract brake type
         if 'hydraulic' in text_content:
@@ -469,18 +543,17 @@ class BikeComponentsDEScraper(BaseScraper):
             specs['mount_type'] = 'post_mount'
         
         # Extract rotor sizes
-        rotor_pattern = r'(\d+)mm.*rotor'
-        rotor_matches = re.findall(rotor_pattern, text_content)
+        rotor_matches = self.spec_matches(page, 'brakes').all('rotor_sizes')
         if rotor_matches:
-            specs['rotor_size_compatibility'] = [int(size) for size in rotor_matches]
+            specs['rotor_size_compatibility'] = [int(size) for size, in rotor_matches]
         
         return specs
     
-    def extract_frame_specs(self, soup):
+    def extract_frame_specs(self, page):
         """Extract frame-specific specifications"""
         specs = {}
         
-        text_content = soup.get_text().lower()
+        text_content = page.text_lower
         
         # Extract frame type
         if 'road' in text_content:
@@ -500,7 +573,7 @@ class BikeComponentsDEScraper(BaseScraper):
         
         return specs
     
-    def extract_additional_details(self, soup):
+    def extract_additional_details(self, page):
         """Extract additional product details"""
         details = {}
         
@@ -513,11 +586,11 @@ class BikeComponentsDEScraper(BaseScraper):
         ]
         
         for selector in price_selectors:
-            price_element = soup.select_one(selector)
-            if price_element:
-                price_text = price_element.get_text(strip=True)
+            price_element = page.select_one(selector)
+            if price_element is not None:
+                price_text = page.text_of(price_element)
                 # Extract numeric price
-                price_match = re.search(r'[\d,]+\.?\d*', price_text)
+                price_match = PRICE_NUMBER.search(price_text)
                 if price_match:
                     details['price_range'] = f"€{price_match.group()}"
                 break
@@ -531,9 +604,9 @@ class BikeComponentsDEScraper(BaseScraper):
         ]
         
         for selector in desc_selectors:
-            desc_element = soup.select_one(selector)
-            if desc_element:
-                description = desc_element.get_text(strip=True)
+            desc_element = page.select_one(selector)
+            if desc_element is not None:
+                description = page.text_of(desc_element)
                 if len(description) > 50:  # Only use substantial descriptions
                     details['description'] = description[:500]  # Limit length
                 break
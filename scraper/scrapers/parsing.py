@@ -0,0 +1,190 @@
+"""
+Single-pass HTML parsing for scraped pages
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+import lxml.html
+from lxml import etree
+
+# Elements whose text is not page content (BeautifulSoup's get_text() skips them too)
+SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+
+_STEP_PATTERN = re.compile(
+    r'^(?P<tag>[a-z][a-z0-9]*)?'
+    r'(?P<classes>(?:\.[\w-]+)*)'
+    r'(?:\[(?P<attr>[\w-]+)(?:(?P<op>\*?=)"(?P<value>[^"]*)")?\])?'
+    r'(?P<first_child>:first-child)?$'
+)
+
+class SelectorStep:
+    """One compound selector: tag, classes, an optional [attr], [attr="v"] or [attr*="v"] and :first-child"""
+
+    def __init__(self, text):
+        match = _STEP_PATTERN.match(text)
+        if not match or not text:
+            raise ValueError(f"Unsupported selector: {text!r}")
+        self.tag = match.group('tag')
+        self.classes = [cls for cls in match.group('classes').split('.') if cls]
+        self.attr = match.group('attr')
+        self.op = match.group('op')
+        self.value = match.group('value')
+        self.first_child = bool(match.group('first_child'))
+
+    def matches(self, element):
+        if self.tag and element.tag != self.tag:
+            return False
+        if self.classes:
+            element_classes = element.get('class', '').split()
+            if any(cls not in element_classes for cls in self.classes):
+                return False
+        if self.attr:
+            value = element.get(self.attr)
+            if value is None:
+                return False
+            if self.op == '=' and value != self.value:
+                return False
+            if self.op == '*=' and self.value not in value:
+                return False
+        if self.first_child:
+            previous = element.getprevious()
+            while previous is not None and not isinstance(previous.tag, str):
+                previous = previous.getprevious()
+            if previous is not None:
+                return False
+        return True
+
+@lru_cache(maxsize=None)
+def compile_selector(selector):
+    """Split a selector into its descendant-combinator steps, compiled once per process"""
+    return tuple(SelectorStep(part) for part in selector.split())
+
+def _has_ancestors(element, steps):
+    if not steps:
+        return True
+    parent = element.getparent()
+    while parent is not None:
+        if steps[-1].matches(parent) and _has_ancestors(parent, steps[:-1]):
+            return True
+        parent = parent.getparent()
+    return False
+
+def _parse(html):
+    if not html or not html.strip():
+        return lxml.html.document_fromstring('<html></html>')
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml.html.document_fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        return lxml.html.document_fromstring('<html></html>')
+
+class ParsedPage:
+    """
+    An HTML page parsed once with lxml
+    A single walk over the tree builds the page text and an index of elements by tag and
+    class, so title, brand and spec table lookups and the text regexes never walk the
+    document again. select() supports the selector subset the scrapers use: descendant
+    combinators of tag, .class, [attr], [attr="v"], [attr*="v"] and :first-child.
+    """
+
+    def __init__(self, html):
+        self.root = _parse(html)
+        self.elements = []
+        self.by_tag = defaultdict(list)
+        self.by_class = defaultdict(list)
+        self.scans = {}
+
+        strings = []
+        skipped = 0
+        for event, element in etree.iterwalk(self.root, events=('start', 'end')):
+            is_element = isinstance(element.tag, str)
+            if event == 'start':
+                if not is_element:
+                    continue
+                self.elements.append(element)
+                self.by_tag[element.tag].append(element)
+                for cls in element.get('class', '').split():
+                    self.by_class[cls].append(element)
+                if element.tag in SKIPPED_TEXT_TAGS:
+                    skipped += 1
+                elif element.text and not skipped:
+                    strings.append(element.text)
+            else:
+                if is_element and element.tag in SKIPPED_TEXT_TAGS:
+                    skipped -= 1
+                if element.tail and not skipped and element is not self.root:
+                    strings.append(element.tail)
+
+        self.text = ''.join(strings)
+        self.text_lower = self.text.lower()
+
+    def select(self, selector):
+        """All elements matching selector, in document order"""
+        steps = compile_selector(selector)
+        target = steps[-1]
+        if target.classes:
+            candidates = self.by_class.get(target.classes[0], [])
+        elif target.tag:
+            candidates = self.by_tag.get(target.tag, [])
+        else:
+            candidates = self.elements
+        return [
+            element for element in candidates
+            if target.matches(element) and _has_ancestors(element, steps[:-1])
+        ]
+
+    def select_one(self, *selectors):
+        """First element matching the first selector, in order, that matches anything"""
+        for selector in selectors:
+            matches = self.select(selector)
+            if matches:
+                return matches[0]
+        return None
+
+    def scan(self, scanner):
+        """Result of scanner.scan() over the lowercased page text, scanned once per scanner"""
+        if scanner not in self.scans:
+            self.scans[scanner] = scanner.scan(self.text_lower)
+        return self.scans[scanner]
+
+    def text_of(self, element):
+        """Stripped text of an element; same result as BeautifulSoup's get_text(strip=True)"""
+        if element is None:
+            return ''
+        return ''.join(string.strip() for string in _strings(element))
+
+    def links(self, element=None):
+        """href of every <a href> in the page or below element, in document order"""
+        anchors = self.by_tag.get('a', []) if element is None else element.iter('a')
+        return [anchor.get('href') for anchor in anchors if anchor.get('href')]
+
+    def spec_pairs(self, element):
+        """(key, value) pairs from the table rows and dt/dd lists below element"""
+        pairs = []
+        for row in element.iter('tr'):
+            cells = list(row.iter('td', 'th'))
+            if len(cells) >= 2:
+                pairs.append((self.text_of(cells[0]), self.text_of(cells[1])))
+
+        terms = list(element.iter('dt'))
+        definitions = list(element.iter('dd'))
+        if len(terms) == len(definitions):
+            pairs.extend(
+                (self.text_of(term), self.text_of(definition))
+                for term, definition in zip(terms, definitions)
+            )
+        return [(key, value) for key, value in pairs if key and value]
+
+def _strings(element):
+    """Text strings below element (not its tail), skipping comments, scripts and styles"""
+    if not isinstance(element.tag, str) or element.tag in SKIPPED_TEXT_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _strings(child)
+        if child.tail:
+            yield child.tail
@@ -0,0 +1,133 @@
+"""
+Compiled extraction patterns shared by the scrapers
+"""
+
+import re
+from functools import lru_cache
+
+# Where a pattern can begin, as (first character class, guard at that position).
+# Patterns starting with (\d+ match from the start of a digit run or not at all
+DIGIT_RUN = (r'\d', r'(?<!\d)')
+
+WHITESPACE = re.compile(r'\s+')
+NON_WORD = re.compile(r'[^\w\s]')
+
+# Look for price patterns like €123.45, 123,45 €, etc.; tried in order
+PRICE_PATTERNS = [
+    re.compile(r'€\s*(\d+(?:[.,]\d{2})?)'),
+    re.compile(r'(\d+(?:[.,]\d{2})?)\s*€'),
+    re.compile(r'(\d+(?:[.,]\d{2})?)\s*EUR'),
+]
+PRICE_NUMBER = re.compile(r'[\d,]+\.?\d*')
+
+class ExtractionPattern:
+    """
+    A named spec pattern, matched against lowercased page text
+    start says where a match can begin (see DIGIT_RUN); find_all collects every
+    non-overlapping match like re.findall instead of only the first like re.search
+    """
+
+    def __init__(self, name, pattern, start=DIGIT_RUN, find_all=False):
+        self.name = name
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.start = start
+        self.find_all = find_all
+
+PATTERNS = {pattern.name: pattern for pattern in [
+    # Speed: "11-speed", "12 speed", "11s", German "12-fach" / "12 gang"
+    ExtractionPattern('speed', r'(\d+)[-\s]*speed'),
+    ExtractionPattern('speed_suffix', r'(\d+)s\b'),
+    ExtractionPattern('speed_fach', r'(\d+)[-\s]*fach'),
+    ExtractionPattern('speed_gang', r'(\d+)[-\s]*gang'),
+    ExtractionPattern('speeds', r'(\d+)\s*speed'),
+    # Drivetrain
+    ExtractionPattern('chainring_sizes', r'(\d+)t?\s*[/x]\s*(\d+)t?'),
+    ExtractionPattern('crank_length', r'(\d+(?:\.\d+)?)\s*mm.*crank'),
+    ExtractionPattern('cog_range', r'(\d+)\s*-\s*(\d+)t?'),
+    ExtractionPattern('max_cog_size', r'max.*?(\d+)t', start=('m', '(?=max)')),
+    # Brakes
+    ExtractionPattern('rotor_sizes', r'(\d+)mm.*rotor', find_all=True),
+]}
+
+# Tried in this order; the first one found decides the speed
+SPEED_PATTERNS = ('speed', 'speed_suffix', 'speed_fach', 'speed_gang')
+
+class ScanResult:
+    """Groups of the matches a scan found, per pattern name"""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    def first(self, name):
+        """Groups of the first match, as re.search(pattern).groups() would return them"""
+        matches = self.matches.get(name)
+        return matches[0] if matches else None
+
+    def all(self, name):
+        """Groups of every non-overlapping match, like re.findall"""
+        return self.matches.get(name, [])
+
+class MultiPatternScanner:
+    """
+    Finds the first (or, for find_all patterns, every) match of several patterns in one scan
+    All patterns become optional lookaheads of a single regex that is tried only where one
+    of them can start and at least one matches, so the regex engine does the scanning and
+    each hit reports every pattern matching there. Patterns may use unnamed groups only.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        starts = list(dict.fromkeys(pattern.start for pattern in self.patterns))
+        first_chars = ''.join(dict.fromkeys(chars for chars, guard in starts))
+        guards = '|'.join(dict.fromkeys(guard for chars, guard in starts))
+        any_pattern = '|'.join(f'(?:{pattern.pattern})' for pattern in self.patterns)
+
+        self.slots = []
+        lookaheads = []
+        # The groups of any_pattern come first and are not read
+        index = sum(pattern.regex.groups for pattern in self.patterns)
+        for pattern in self.patterns:
+            # Index of the whole-match group in match.groups(), then the pattern's own groups
+            self.slots.append((pattern, index, index + 1, index + 1 + pattern.regex.groups))
+            lookaheads.append(f'(?:(?=({pattern.pattern}))|)')
+            index += 1 + pattern.regex.groups
+
+        # The leading character class lets the engine skip to candidates quickly
+        self.regex = re.compile(f'(?=[{first_chars}])(?:{guards})(?={any_pattern})' + ''.join(lookaheads))
+        self.find_all = any(pattern.find_all for pattern in self.patterns)
+
+    def scan(self, text):
+        matches = {pattern.name: [] for pattern in self.patterns}
+        ends = {}
+        remaining = sum(1 for pattern in self.patterns if not pattern.find_all)
+
+        for match in self.regex.finditer(text):
+            groups = match.groups()
+            for pattern, whole, first_group, last_group in self.slots:
+                if groups[whole] is None:
+                    continue
+                found = matches[pattern.name]
+                if not pattern.find_all:
+                    if not found:
+                        found.append(groups[first_group:last_group])
+                        remaining -= 1
+                elif match.start() >= ends.get(pattern.name, 0):
+                    found.append(groups[first_group:last_group])
+                    ends[pattern.name] = match.start() + len(groups[whole])
+
+            # Nothing left to look for
+            if not remaining and not self.find_all:
+                break
+
+        return ScanResult(matches)
+
+@lru_cache(maxsize=None)
+def scanner(*names):
+    """Scanner for the registered patterns with these names, built once per combination"""
+    return MultiPatternScanner(PATTERNS[name] for name in names)
+
+@lru_cache(maxsize=256)
+def brand_prefix(brand):
+    """Brand at the start of a product name, with the whitespace after it"""
+    return re.compile(rf'^{re.escape(brand)}\s*', re.IGNORECASE)
@@ -3,19 +3,20 @@ Shimano Official Website Scraper
 Scrapes component data from https://bike.shimano.com
 """
 
-import re
 import json
-import time
-import random
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .parsing import ParsedPage
+from .patterns import WHITESPACE
 
 class ShimanoScraper(BaseScraper):
     """Scraper for Shimano official website"""
     
-    def __init__(self, db_connection):
-        super().__init__(db_connection)
+    # Official sites only provide links and images; specs come from retailers
+    UPDATE_COLUMNS = ('image_url', 'product_url')
+    
+    def __init__(self, db_connection, **kwargs):
+        super().__init__(db_connection, **kwargs)
         self.base_url = "https://bike.shimano.com"
         self.session.headers.update({
             'Accept-Language': 'en-US,en;q=0.9',
@@ -33,15 +34,17 @@ class ShimanoScraper(BaseScraper):
             for category in categories:
                 self.logger.info(f"Scraping Shimano category: {category['name']}")
                 self.scrape_category(category)
-                
-                # Add delay between categories to be respectful
-                time.sleep(random.uniform(3.0, 6.0))
             
             self.logger.info("Shimano scraping completed successfully")
             
         except Exception as e:
             self.logger.error(f"Error in Shimano scraper: {str(e)}")
             raise
+        finally:
+            # Write whatever is still queued, even after a failure
+            self.flush_components()
+            self.close_parse_pool()
+            self.log_summary()
     
     def get_component_categories(self):
         """Define component categories to scrape from Shimano"""
@@ -75,35 +78,39 @@ class ShimanoScraper(BaseScraper):
             
             # Get category page content
             html_content = self.get_page(category['url'])
-            soup = BeautifulSoup(html_content, 'html.parser')
+            page = ParsedPage(html_content)
             
             # Find product links on the page
-            product_links = self.extract_shimano_product_links(soup)
+            product_links = self.extract_shimano_product_links(page)
             
             if not product_links:
                 self.logger.info(f"No products found in category {category['name']}")
                 return
             
-            # Scrape each product
-            for product_link in product_links[:20]:  # Limit to 20 products per category
+            # Fetch products concurrently and parse them in worker processes; the rate limiter keeps us polite
+            product_urls = [
+                urljoin(self.base_url, product_link)
+                for product_link in product_links[:20]  # Limit to 20 products per category
+            ]
+            for product_url, fetched, component_data in self.fetch_and_parse(product_urls, 'parse_shimano_product'):
                 try:
-                    product_url = urljoin(self.base_url, product_link)
-                    component_data = self.scrape_shimano_product(product_url)
+                    if not fetched:
+                        continue
                     
                     if component_data:
                         self.save_basic_component(component_data)
-                        
-                    # Add delay between products
-                    time.sleep(random.uniform(2.0, 4.0))
+                    else:
+                        # Fetch it in full next time instead of getting a 304
+                        self.forget_page(product_url)
                     
                 except Exception as e:
-                    self.logger.error(f"Error scraping Shimano product {product_link}: {str(e)}")
+                    self.logger.error(f"Error scraping Shimano product {product_url}: {str(e)}")
                     continue
                     
         except Exception as e:
             self.logger.error(f"Error scraping Shimano category {category['name']}: {str(e)}")
     
-    def extract_shimano_product_links(self, soup):
+    def extract_shimano_product_links(self, page):
         """Extract product links from Shimano category page"""
         product_links = []
         
@@ -118,7 +125,7 @@ class ShimanoScraper(BaseScraper):
         ]
         
         for selector in product_selectors:
-            links = soup.select(selector)
+            links = page.select(selector)
             for link in links:
                 href = link.get('href')
                 if href and href not in product_links:
@@ -131,14 +138,24 @@ class ShimanoScraper(BaseScraper):
         """Scrape individual Shimano product"""
         try:
             html_content = self.get_page(product_url)
-            soup = BeautifulSoup(html_content, 'html.parser')
+            return self.parse_shimano_product(html_content, product_url)
+            
+        except Exception as e:
+            self.logger.error(f"Error scraping Shimano product {product_url}: {str(e)}")
+            return None
+    
+    def parse_shimano_product(self, html_content, product_url):
+        """Parse a fetched Shimano product page"""
+        try:
+            # Parse once; every extractor below reads the same page
+            page = ParsedPage(html_content)
             
             # Extract basic product information
             component_data = {
                 'brand': 'Shimano',
-                'model': self.extract_shimano_model(soup),
-                'type': self.extract_shimano_type(soup),
-                'image_url': self.extract_shimano_image(soup),
+                'model': self.extract_shimano_model(page),
+                'type': self.extract_shimano_type(page),
+                'image_url': self.extract_shimano_image(page),
                 'product_url': product_url,
                 'specs': {}  # Empty for now as requested
             }
@@ -155,7 +172,7 @@ class ShimanoScraper(BaseScraper):
             self.logger.error(f"Error scraping Shimano product {product_url}: {str(e)}")
             return None
     
-    def extract_shimano_model(self, soup):
+    def extract_shimano_model(self, page):
         """Extract model name from Shimano product page"""
         # Try multiple selectors for product name
         selectors = [
@@ -168,18 +185,18 @@ class ShimanoScraper(BaseScraper):
         ]
         
         for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                model = element.get_text(strip=True)
+            element = page.select_one(selector)
+            if element is not None:
+                model = page.text_of(element)
                 # Clean up the model name
-                model = re.sub(r'\s+', ' ', model)
+                model = WHITESPACE.sub(' ', model)
                 model = model.replace('Shimano', '').strip()
                 if model:
                     return model
         
         return "Unknown Model"
     
-    def extract_shimano_type(self, soup):
+    def extract_shimano_type(self, page):
         """Extract component type from Shimano product page"""
         # Map common Shimano terms to our component types
         type_mapping = {
@@ -194,7 +211,7 @@ class ShimanoScraper(BaseScraper):
         }
         
         # Look in various places for type information
-        text_content = soup.get_text().lower()
+        text_content = page.text_lower
         
         # Check breadcrumbs, categories, or product descriptions
         for keyword, component_type in type_mapping.items():
@@ -202,8 +219,8 @@ class ShimanoScraper(BaseScraper):
                 return component_type
         
         # Try to extract from URL
-        url_parts = soup.find('link', {'rel': 'canonical'})
-        if url_parts:
+        url_parts = page.select_one('link[rel="canonical"]')
+        if url_parts is not None:
             url = url_parts.get('href', '').lower()
             for keyword, component_type in type_mapping.items():
                 if keyword in url:
@@ -211,7 +228,7 @@ class ShimanoScraper(BaseScraper):
         
         return 'unknown'
     
-    def extract_shimano_image(self, soup):
+    def extract_shimano_image(self, page):
         """Extract main product image URL from Shimano product page"""
         # Try multiple selectors for product images
         selectors = [
@@ -224,8 +241,8 @@ class ShimanoScraper(BaseScraper):
         ]
         
         for selector in selectors:
-            img = soup.select_one(selector)
-            if img:
+            img = page.select_one(selector)
+            if img is not None:
                 src = img.get('src') or img.get('data-src')
                 if src:
                     # Convert relative URLs to absolute
@@ -236,65 +253,5 @@ class ShimanoScraper(BaseScraper):
         return None
     
     def save_basic_component(self, component_data):
-        """Save basic component data to database"""
-        try:
-            # Check if component already exists
-            check_query = """
-                SELECT id FROM components_component 
-                WHERE brand = %(brand)s AND model = %(model)s AND type = %(type)s
-            """
-            
-            existing = self.db.execute_query(check_query, {
-                'brand': component_data['brand'],
-                'model': component_data['model'],
-                'type': component_data['type']
-            })
-            
-            if existing:
-                # Update existing component
-                component_id = existing[0]['id']
-                self.logger.info(f"Updating existing component: {component_data['brand']} {component_data['model']}")
-                
-                update_query = """
-                    UPDATE components_component
-                    SET image_url = %(image_url)s,
-                        product_url = %(product_url)s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %(id)s
-                """
-                
-                self.db.execute_query(update_query, {
-                    'id': component_id,
-                    'image_url': component_data.get('image_url'),
-                    'product_url': component_data.get('product_url')
-                }, fetch=False)
-                
-            else:
-                # Insert new component
-                self.logger.info(f"Inserting new component: {component_data['brand']} {component_data['model']}")
-                
-                insert_query = """
-                    INSERT INTO components_component
-                    (id, brand, model, type, specs, image_url, product_url, created_at, updated_at)
-                    VALUES (gen_random_uuid(), %(brand)s, %(model)s, %(type)s, %(specs)s, %(image_url)s, %(product_url)s, 
-                            CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                """
-                
-                import json
-                self.db.execute_query(insert_query, {
-                    'brand': component_data['brand'],
-                    'model': component_data['model'],
-                    'type': component_data['type'],
-                    'specs': json.dumps(component_data.get('specs', {})),
-                    'image_url': component_data.get('image_url'),
-                    'product_url': component_data.get('product_url')
-                }, fetch=False)
-            
-            # Commit the transaction
-            self.db.commit()
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error saving component to database: {str(e)}")
-            self.db.rollback()
-            return False
+        """Queue basic component data for the next batch write"""
+        return self.save_component(component_data)
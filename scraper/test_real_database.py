@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scrapers.bike_components_de_scraper import BikeComponentsDEScraper
+from scrapers.parsing import ParsedPage
 from database.connection import DatabaseConnection
 from utils.logger import setup_logger
 
@@ -94,11 +95,8 @@ def scrape_and_save_real_data(max_products_per_category=5):
             try:
                 # Get category page
                 html_content = scraper.get_page(category['url'])
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
                 # Extract product links
-                product_links = scraper.extract_product_links(soup)
+                product_links = scraper.extract_product_links(ParsedPage(html_content))
                 print(f"Found {len(product_links)} product links")
                 
                 if not product_links:
@@ -121,11 +119,10 @@ def scrape_and_save_real_data(max_products_per_category=5):
                         
                         if component_data:
                             # Save to database
-                            component_id = scraper.save_component(component_data)
+                            queued = scraper.save_component(component_data)
                             
-                            if component_id:
-                                print(f"    ✅ Saved: {component_data['brand']} {component_data['model']}")
-                                print(f"       ID: {component_id}")
+                            if queued:
+                                print(f"    ✅ Queued: {component_data['brand']} {component_data['model']}")
                                 print(f"       Type: {component_data['type']}")
                                 print(f"       Speed: {component_data.get('speed', 'N/A')}")
                                 
@@ -161,6 +158,9 @@ def scrape_and_save_real_data(max_products_per_category=5):
                         print(f"    ❌ Error scraping product {i+1}: {str(e)}")
                         continue
                 
+                # Write the category's components in one batch
+                scraper.flush_components()
+                
                 print(f"\n--- {category['name']} Summary ---")
                 print(f"Successfully scraped: {scraped_count}/{max_products_per_category} products")
                 
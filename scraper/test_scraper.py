@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scrapers.bike_components_de_scraper import BikeComponentsDEScraper
+from scrapers.parsing import ParsedPage
 from database.connection import DatabaseConnection
 from utils.logger import setup_logger
 
@@ -60,8 +61,6 @@ def test_product_parsing():
     """Test parsing a single product in node format"""
     print("\nTesting product parsing for node-based model...")
     try:
-        from bs4 import BeautifulSoup
-        
         # Mock HTML for testing different component types
         test_cases = [
             {
@@ -117,12 +116,12 @@ def test_product_parsing():
         
         for test_case in test_cases:
             print(f"\n--- Testing {test_case['name']} ---")
-            soup = BeautifulSoup(test_case['html'], 'html.parser')
+            page = ParsedPage(test_case['html'])
             
             # Extract node data
-            node_data = scraper.extract_basic_info(soup, test_case['category'])
+            node_data = scraper.extract_basic_info(page, test_case['category'])
             if node_data:
-                specs = scraper.extract_specifications(soup, test_case['category'])
+                specs = scraper.extract_specifications(page, test_case['category'])
                 node_data['specs'] = specs
                 
                 # Print node in the format expected by the graph model
@@ -567,7 +566,6 @@ def test_node_data_extraction():
     
     try:
         import requests
-        from bs4 import BeautifulSoup
         from fake_useragent import UserAgent
         
         session = requests.Session()
@@ -603,10 +601,8 @@ def test_node_data_extraction():
                     print(f"❌ Failed to fetch category page: HTTP {response.status_code}")
                     continue
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
                 # Find product links
-                product_links = scraper.extract_product_links(soup)
+                product_links = scraper.extract_product_links(ParsedPage(response.text))
                 
                 if not product_links:
                     print(f"❌ No product links found")
@@ -630,12 +626,12 @@ def test_node_data_extraction():
                             print(f"    ❌ Failed to fetch product: HTTP {product_response.status_code}")
                             continue
                         
-                        product_soup = BeautifulSoup(product_response.text, 'html.parser')
+                        product_page = ParsedPage(product_response.text)
                         
                         # Extract node data
-                        node_data = scraper.extract_basic_info(product_soup, category_type)
+                        node_data = scraper.extract_basic_info(product_page, category_type)
                         if node_data:
-                            specs = scraper.extract_specifications(product_soup, category_type)
+                            specs = scraper.extract_specifications(product_page, category_type)
                             node_data['specs'] = specs
                             node_data['source_url'] = product_url
                             
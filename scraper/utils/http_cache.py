@@ -0,0 +1,85 @@
+"""
+On-disk store of HTTP validators (ETag / Last-Modified) for conditional re-scrapes
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from config import HTTP_CACHE_DIR
+
+class PageNotModified(Exception):
+    """Raised by a conditional fetch when the server answered 304 Not Modified"""
+
+    def __init__(self, url):
+        super().__init__(f"Not modified: {url}")
+        self.url = url
+
+class HttpCache:
+    """
+    One small JSON file per URL holding the validators of its last full response
+    Only validators are stored: a 304 means the page was already parsed and saved, so the
+    scraper stores them once the page's data is committed, never straight after the fetch
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR):
+        self.directory = directory
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a URL, empty when it was never fetched"""
+        entry = self._read(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def validators(self, response):
+        """Validators of a full (200) response, None when the server sent none"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return None
+
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': datetime.now().isoformat(),
+        }
+
+    def store(self, url, validators):
+        """Remember the validators of a page whose data was saved"""
+        self._write(url, {'url': url, **validators})
+
+    def forget(self, url):
+        """Drop a URL so its next conditional fetch downloads it again (e.g. after a parse failure)"""
+        try:
+            os.remove(self._path(url))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def _read(self, url):
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, url, entry):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file and rename so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
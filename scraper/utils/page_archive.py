@@ -0,0 +1,101 @@
+"""
+Content-addressed archive of fetched pages, for replaying scraper runs offline
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from config import ARCHIVE_DIR
+
+# What BaseScraper.get_page does with the archive
+ARCHIVE_MODES = ('off', 'record', 'replay')
+
+class PageNotArchived(Exception):
+    """Raised in replay mode for a URL the archive has no page for"""
+
+    def __init__(self, url):
+        super().__init__(f"Not archived: {url}")
+        self.url = url
+
+class PageArchive:
+    """
+    Page bodies stored gzipped under the SHA-256 of their content, so a page that did
+    not change between recorded runs is kept once, plus one small JSON index file per
+    URL pointing at the body of its latest full response:
+
+        pages/ab/<sha256 of body>.html.gz
+        urls/cd/<sha256 of url>.json
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+
+    def record(self, url, response):
+        """Store the body of a full (200) response and point the URL at it"""
+        body = response.text.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            self._write(body_path, gzip.compress(body))
+
+        entry = {
+            'url': url,
+            'sha256': digest,
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type'),
+            'fetched_at': datetime.now().isoformat(),
+        }
+        self._write(self._index_path(url), json.dumps(entry).encode('utf-8'))
+
+    def replay(self, url):
+        """Archived HTML of a URL; raises PageNotArchived if it was never recorded"""
+        entry = self.entry(url)
+        if not entry:
+            raise PageNotArchived(url)
+
+        try:
+            with open(self._body_path(entry['sha256']), 'rb') as f:
+                return gzip.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            raise PageNotArchived(url)
+
+    def entry(self, url):
+        """Index entry of a URL, None when it was never recorded"""
+        try:
+            with open(self._index_path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def entries(self):
+        """Index entries of every archived URL"""
+        index_dir = os.path.join(self.directory, 'urls')
+        for dirpath, dirnames, filenames in os.walk(index_dir):
+            for filename in sorted(filenames):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(dirpath, filename), encoding='utf-8') as f:
+                        yield json.load(f)
+                except ValueError:
+                    continue
+
+    def _index_path(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, 'urls', digest[:2], f"{digest}.json")
+
+    def _body_path(self, digest):
+        return os.path.join(self.directory, 'pages', digest[:2], f"{digest}.html.gz")
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file and rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,60 @@
+"""
+Token-bucket rate limiting for scraper requests
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+from config import REQUESTS_PER_SECOND, HOST_REQUESTS_PER_SECOND
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before it may be used"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # Tokens may go negative: each caller then waits for its own turn, in arrival order
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class HostRateLimiter:
+    """
+    Global requests-per-second budget plus one per host
+    Callers only wait while a budget is exhausted, so requests within budget
+    (or to other hosts) go out in parallel
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, host_rate=HOST_REQUESTS_PER_SECOND):
+        self.host_rate = host_rate
+        self.global_bucket = TokenBucket(rate)
+        self.host_buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        """Block until a request to url fits the global and per-host budgets; returns the time waited"""
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self.host_buckets.get(host)
+            if bucket is None:
+                bucket = self.host_buckets[host] = TokenBucket(self.host_rate)
+
+        wait = max(self.global_bucket.reserve(), bucket.reserve())
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+# Shared by every scraper in the process so the budgets hold across scrapers
+rate_limiter = HostRateLimiter()